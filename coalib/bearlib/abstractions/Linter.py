@@ -16,6 +16,7 @@ from coala_utils.ContextManagers import make_temp
 from coala_utils.decorators import assert_right_type, enforce_signature
 from coalib.misc.Shell import run_shell_command
 from coalib.results.Diff import Diff
+from coalib.results.DiffEngine import get_section_diff_engine
 from coalib.results.Result import Result
 from coalib.results.SourceRange import SourceRange
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
@@ -415,10 +416,12 @@ def _create_linter(klass, options):
                 An iterator returning results containing patches for the
                 file to correct.
             """
+            # Users can choose the diff engine with a section setting
             return self.process_diff(
                 Diff.from_string_arrays(
                     file,
-                    output.splitlines(keepends=True)),
+                    output.splitlines(keepends=True),
+                    engine=get_section_diff_engine(self.section)),
                 filename,
                 diff_severity,
                 result_message,
@@ -4,6 +4,7 @@ import pdb
 import collections
 import traceback
 import logging
+from copy import copy
 from functools import partial
 from os import makedirs, getcwd
 from os.path import join, abspath, exists, isdir
@@ -42,13 +43,14 @@ def _setting_is_enabled(bear, key):
     if key is None:
         raise ValueError('No setting key passed.')
 
-    if key not in bear.section:
+    section = bear.section.resolve()
+    if key not in section:
         return False
     try:
-        return bool(bear.section[key])
+        return bool(section[key])
     except ValueError:
         pass
-    return bear.section[key]
+    return section[key]
 
 
 def _is_debugged(bear):
@@ -358,6 +360,7 @@ class Bear(Printer, LogPrinterMixin, metaclass=bearclass):
         self.section = section
         self.message_queue = message_queue
         self.timeout = timeout
+        self.section_params = None
         self.debugger = _is_debugged(bear=self)
         self.profile = _is_profiled(bear=self)
 
@@ -415,15 +418,38 @@ class Bear(Printer, LogPrinterMixin, metaclass=bearclass):
         self._dump_bear_profile_data(profiler)
         return results
 
+    def get_section_params(self):
+        """
+        Creates the keyword arguments for ``run`` from the section. They are
+        created once and reused as long as the section and its language don't
+        change, see ``Section.mark_changed``.
+
+        :raises ValueError: If a setting can't be converted to the type of its
+                            parameter.
+        :return:            A dictionary with the keyword arguments.
+        """
+        section = self.section
+        key = (section, section.version, section.language)
+        cached = getattr(self, 'section_params', None)
+        if (cached is None or cached[0][0] is not section or
+                cached[0][1] != key[1] or cached[0][2] is not key[2]):
+            metadata = self.get_metadata()
+            params = {}
+            # Don't get `language` setting from `section.contents`
+            if section.language and (
+                    'language' in metadata._optional_params or
+                    'language' in metadata._non_optional_params):
+                params['language'] = section.language
+            params.update(
+                metadata.create_params_from_section(section.resolve()))
+            cached = self.section_params = (key, params)
+
+        # Bears may modify the values they get
+        return {name: copy(value) for name, value in cached[1].items()}
+
     def run_bear_from_section(self, args, kwargs):
         try:
-            # Don't get `language` setting from `section.contents`
-            if self.section.language and (
-                    'language' in self.get_metadata()._optional_params or
-                    'language' in self.get_metadata()._non_optional_params):
-                kwargs['language'] = self.section.language
-            kwargs.update(
-                self.get_metadata().create_params_from_section(self.section))
+            kwargs.update(self.get_section_params())
         except ValueError as err:
             self.warn(f'The bear {self.name} cannot be executed.', str(err))
             return
@@ -46,7 +46,8 @@ def main(debug=False):
 
         # Defer imports so if e.g. --help is called they won't be run
         from coalib.coala_modes import (
-            mode_format, mode_json, mode_non_interactive, mode_normal)
+            mode_format, mode_json, mode_ndjson, mode_non_interactive,
+            mode_normal)
         from coalib.output.ConsoleInteraction import (
             show_bears, show_language_bears_capabilities)
 
@@ -98,6 +99,8 @@ def main(debug=False):
             return 0
 
         if args.json:
+            if args.ndjson:
+                return mode_ndjson(args, debug=debug)
             return mode_json(args, debug=debug)
 
     except BaseException as exception:  # pylint: disable=broad-except
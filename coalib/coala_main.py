@@ -4,10 +4,14 @@ import os
 import platform
 
 from coalib import VERSION
+from coalib.collecting.FileSystemSnapshot import FileSystemSnapshot
 from coalib.misc.Exceptions import get_exitcode
 from coalib.output.Interactions import fail_acquire_settings
 from coalib.output.Logging import CounterHandler
-from coalib.processes.Processing import execute_section, simplify_section_result
+from coalib.processes.Processing import (
+    execute_section, execute_sections, get_debug_bears,
+    simplify_section_result)
+from coalib.processes.WorkerPool import WorkerPool
 from coalib.settings.ConfigurationGathering import gather_configuration
 from coalib.results.result_actions.DoNothingAction import DoNothingAction
 from coalib.results.result_actions.ShowPatchAction import ShowPatchAction
@@ -64,7 +68,9 @@ def run_coala(console_printer=None,
               arg_list=None,
               args=None,
               debug=False,
-              cache=None):
+              cache=None,
+              worker_pool=None,
+              keep_results=True):
     """
     This is a main method that should be usable for almost all purposes and
     reduces executing coala to one function call.
@@ -100,6 +106,15 @@ def run_coala(console_printer=None,
                                     multiprocessing, and not catching any
                                     exceptions.
     :param cache:                   Instance of a FileCache instance.
+    :param worker_pool:             A ``WorkerPool`` to run the bears on. If
+                                    not given, a pool is created for this run
+                                    and closed when it's done.
+    :param keep_results:            Whether the results are returned. If set
+                                    to ``False``, results are dropped once
+                                    they are printed, so they don't stay in
+                                    memory until all sections are done. The
+                                    exit code doesn't tell whether unfixed
+                                    results were yielded then.
     :return:                        A dictionary containing a list of results
                                     for all analyzed sections as key.
     """
@@ -137,6 +152,10 @@ def run_coala(console_printer=None,
     sections = {}
     results = {}
     file_dicts = {}
+    own_worker_pool = worker_pool is None
+    if own_worker_pool:
+        # Processes are only started once bears are run
+        worker_pool = WorkerPool()
     try:
         yielded_results = yielded_unfixed_results = False
         did_nothing = True
@@ -156,6 +175,13 @@ def run_coala(console_printer=None,
 
         if cache is None and not sections['cli'].get('disable_caching', False):
             cache = FileDictFileCache(None, os.getcwd(), flush_cache)
+        # The files of all sections are collected from one snapshot, so each
+        # directory is read once in a run
+        snapshot = (FileSystemSnapshot() if cache is None
+                    else cache.get_snapshot())
+
+        concurrent_sections = bool(
+            sections['cli'].get('concurrent_sections', False))
 
         if targets:
             sections = OrderedDict(
@@ -173,6 +199,7 @@ def run_coala(console_printer=None,
             except (InvalidFilterException, NotImplementedError) as ex:
                 console_printer.print(ex)
 
+        enabled_sections = []
         for section_name, section in sections.items():
             if not section.is_enabled(targets):
                 continue
@@ -183,19 +210,53 @@ def run_coala(console_printer=None,
                 section['default_actions'] = '*: ShowPatchAction'
                 section['show_result_on_top'] = 'yeah'
 
-            print_section_beginning(section)
-            section_result = execute_section(
-                section=section,
-                global_bear_list=global_bears[section_name],
-                local_bear_list=local_bears[section_name],
+            enabled_sections.append(section_name)
+
+        debug_mode = bool(debug or args and args.debug)
+        apply_single = apply_single if apply_single is not None else False
+        concurrent_sections = (
+            concurrent_sections and
+            not debug_mode and
+            not any(get_debug_bears(sections[section_name])
+                    for section_name in enabled_sections))
+
+        if concurrent_sections:
+            section_results = execute_sections(
+                [(sections[section_name],
+                  global_bears[section_name],
+                  local_bears[section_name])
+                 for section_name in enabled_sections],
                 print_results=print_results,
                 cache=cache,
-                log_printer=None,
                 console_printer=console_printer,
-                debug=debug or args and args.debug,
-                apply_single=(apply_single
-                              if apply_single is not None else
-                              False))
+                print_section_beginning=print_section_beginning,
+                # Settings are only acquired if the user can interact
+                interactive=acquire_settings is not fail_acquire_settings,
+                apply_single=apply_single,
+                worker_pool=worker_pool,
+                keep_results=keep_results,
+                snapshot=snapshot)
+        else:
+            def execute(section_name):
+                print_section_beginning(sections[section_name])
+                return execute_section(
+                    section=sections[section_name],
+                    global_bear_list=global_bears[section_name],
+                    local_bear_list=local_bears[section_name],
+                    print_results=print_results,
+                    cache=cache,
+                    log_printer=None,
+                    console_printer=console_printer,
+                    debug=debug_mode,
+                    apply_single=apply_single,
+                    worker_pool=worker_pool,
+                    keep_results=keep_results,
+                    snapshot=snapshot)
+
+            section_results = map(execute, enabled_sections)
+
+        for section_name, section_result in zip(enabled_sections,
+                                                section_results):
             yielded, yielded_unfixed, results[section_name] = (
                 simplify_section_result(section_result))
 
@@ -232,5 +293,8 @@ def run_coala(console_printer=None,
                 raise
 
         exitcode = exitcode or get_exitcode(exception)
+    finally:
+        if own_worker_pool:
+            worker_pool.close()
 
     return results, exitcode, file_dicts
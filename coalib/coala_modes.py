@@ -92,6 +92,55 @@ def mode_json(args, debug=False):
     return 0 if args.show_bears else exitcode
 
 
+def mode_ndjson(args, debug=False):
+    """
+    Like ``mode_json``, but every result is written as a JSON object on its
+    own line as soon as it is processed, e.g.
+    ``{"result": {...}, "section": "python"}``. Logs are written the same way
+    with ``--log-json``. Results aren't kept once they are written, so they
+    don't pile up in memory on large projects.
+
+    :param args:  Alternative pre-parsed CLI arguments.
+    :param debug: Run in debug mode, bypassing multiprocessing,
+                  and not catching any exceptions.
+    """
+    import sys
+
+    from coalib.coala_main import run_coala
+    from coalib.output.Logging import JSONLinesWriter, configure_json_logging
+    from coalib.output.JSONEncoder import create_json_encoder
+
+    JSONEncoder = create_json_encoder(use_relpath=args.relpath)
+    output = open(str(args.output[0]), 'w') if args.output else sys.stdout
+    results_written = 0
+
+    try:
+        writer = JSONLinesWriter(output, JSONEncoder)
+        if args.log_json:
+            configure_json_logging(writer)
+
+        def print_results(log_printer, section, result_list, *args):
+            nonlocal results_written
+            for result in result_list:
+                writer.write({'section': section.name.lower(),
+                              'result': result})
+            results_written += len(result_list)
+
+        _, exitcode, _ = run_coala(print_results=print_results,
+                                   args=args,
+                                   debug=debug,
+                                   keep_results=False)
+    finally:
+        if args.output:
+            output.close()
+
+    if exitcode == 5 and results_written:
+        # Only results that weren't fixed automatically are written
+        exitcode = 1
+
+    return 0 if args.show_bears else exitcode
+
+
 def mode_format(args, debug=False):
     from coalib.coala_main import run_coala
     from coalib.output.ConsoleInteraction import print_results_formatted
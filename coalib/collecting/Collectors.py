@@ -3,16 +3,16 @@ import logging
 import os
 import pkg_resources
 import itertools
-import re
 from types import ModuleType
 
 from coalib.bears.BEAR_KIND import BEAR_KIND
+from coalib.collecting.FileSystemSnapshot import FileSystemSnapshot
 from coalib.collecting.Importers import iimport_objects
-from coala_utils.decorators import yield_once
 from coalib.misc.Exceptions import log_exception
-from coalib.misc.IterUtilities import partition
+from coalib.misc.IterUtilities import yield_once
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
-from coalib.parsing.Globbing import fnmatch, iglob, glob_escape, has_wildcard
+from coalib.parsing.Globbing import (
+    compile_ignore_globs, fnmatch, iglob, glob_escape, has_wildcard)
 from coalib.bearlib.languages.Language import Languages
 from coalib.bearlib.languages import definitions
 
@@ -56,7 +56,8 @@ def _sort_bears(bears, key=lambda x: x.name.lower(), reverse=False):
 
 @yield_once
 def icollect(file_paths, ignored_globs=None, match_cache={},
-             match_function=fnmatch):
+             match_function=fnmatch, prune_function=None, snapshot=None,
+             ignore_function=None):
     """
     Evaluate globs in file paths and return all matching files.
 
@@ -64,6 +65,16 @@ def icollect(file_paths, ignored_globs=None, match_cache={},
     :param ignored_globs:   List of globs to ignore when matching files
     :param match_cache:     Dictionary to use for caching results
     :param match_function:  The function to use for glob matching
+    :param prune_function:  A function telling if a directory and everything
+                            in it is ignored, so it isn't descended into. It
+                            takes the same arguments as ``match_function``.
+    :param snapshot:        A ``FileSystemSnapshot`` to expand the globs in
+                            instead of the disk.
+    :param ignore_function: A function telling if a path is ignored apart
+                            from the ignored globs, like
+                            ``GitIgnore.ignores``. Directories it ignores
+                            aren't descended into if there's a
+                            ``prune_function``.
     :return:                Iterator that yields tuple of path of a matching
                             file, the glob where it was found
     """
@@ -80,37 +91,63 @@ def icollect(file_paths, ignored_globs=None, match_cache={},
                             "Please remove the unnecessary '**' from its end.")
             ignored_globs[index] = glob.rstrip('*')
 
+    prune = None
+    if prune_function is not None and (ignored_globs or
+                                       ignore_function is not None):
+        ignored_globs = tuple(ignored_globs)
+
+        def prune_ignored(path):
+            return ((ignored_globs and
+                     prune_function(path, ignored_globs)) or
+                    (ignore_function is not None and ignore_function(path)))
+        prune = prune_ignored
+
     for file_path in file_paths:
-        if file_path not in match_cache:
-            match_cache[file_path] = list(iglob(file_path))
+        # The matches of a pruned walk depend on what is ignored
+        key = (file_path if prune is None
+               else (file_path, prune_function, ignored_globs,
+                     ignore_function))
+        if key not in match_cache:
+            match_cache[key] = list(iglob(file_path, prune, snapshot))
 
-        for match in match_cache[file_path]:
-            if not ignored_globs or not match_function(match, ignored_globs):
-                yield match, file_path
+        for match in match_cache[key]:
+            if ignored_globs and match_function(match, ignored_globs):
+                continue
+            if ignore_function is not None and ignore_function(match):
+                continue
+            yield match, file_path
 
 
 def match_dir_or_file_pattern(path, ignore_patterns=None):
     """
-    Tries to match the given path with the directory (substring match) or file
-    (enforced full match) patterns.
+    Tries to match the given path with the directory or file patterns: it's
+    matched if one of the patterns matches it or a directory it is in.
+
+    The patterns are compiled once into one regular expression, see
+    ``compile_ignore_globs``, rather than being expanded on the filesystem.
 
     :param path:                Valid file path
-    :param ignore_patterns:     List of regex patterns that match a file or a
+    :param ignore_patterns:     List of globs that match a file or a
                                 directory
     :return:                    True if any of the given pattern match
     """
-    def escape(pattern):
-        return pattern.replace('\\', '\\\\')
+    pattern = (compile_ignore_globs(tuple(ignore_patterns))
+               if ignore_patterns else None)
+    return (pattern is not None and
+            pattern.match(os.path.normcase(path)) is not None)
 
-    expanded_ignores = list_glob_results(ignore_patterns)
 
-    file_patterns, dir_patterns = partition(
-        expanded_ignores,
-        os.path.isfile)
+def match_dir_pattern(path, ignore_patterns=None):
+    """
+    Tells whether everything in the given directory is matched by the
+    directory or file patterns, see ``match_dir_or_file_pattern``.
 
-    return (
-        any((re.match(escape(pattern), path) for pattern in dir_patterns)) or
-        any((re.fullmatch(escape(pattern), path) for pattern in file_patterns)))
+    :param path:                Valid directory path
+    :param ignore_patterns:     List of globs that match a file or a
+                                directory
+    :return:                    True if all paths in the directory are matched
+    """
+    return match_dir_or_file_pattern(os.path.join(path, ''), ignore_patterns)
 
 
 def list_glob_results(values=None):
@@ -127,7 +164,8 @@ def list_glob_results(values=None):
 
 
 def collect_files(file_paths, log_printer=None, ignored_file_paths=None,
-                  limit_file_paths=None, section_name=''):
+                  limit_file_paths=None, section_name='', snapshot=None,
+                  use_gitignore=False):
     """
     Evaluate globs in file paths and return all matching files
 
@@ -135,16 +173,33 @@ def collect_files(file_paths, log_printer=None, ignored_file_paths=None,
     :param ignored_file_paths: List of globs that match to-be-ignored files
     :param limit_file_paths:   List of globs that the files are limited to
     :param section_name:       Name of currently executing section
+    :param snapshot:           A ``FileSystemSnapshot`` to collect the files
+                               from. The files of many sections are collected
+                               with one snapshot, so the same directories and
+                               globs aren't read and expanded for each one.
+    :param use_gitignore:      Whether the files git ignores are ignored too,
+                               see ``GitIgnore``. Directories git ignores
+                               aren't read.
     :return:                   List of paths of all matching files
     """
     limit_fnmatch = (functools.partial(fnmatch, globs=limit_file_paths)
                      if limit_file_paths else lambda fname: True)
+    if use_gitignore and snapshot is None:
+        snapshot = FileSystemSnapshot()
+    isfile = os.path.isfile if snapshot is None else snapshot.isfile
+    extra_args = ({} if snapshot is None
+                  else {'match_cache': snapshot.match_cache,
+                        'snapshot': snapshot})
+    if use_gitignore:
+        extra_args['ignore_function'] = snapshot.get_git_ignore().ignores
 
     valid_files = list(
-        filter(lambda fname: os.path.isfile(fname[0]),
+        filter(lambda fname: isfile(fname[0]),
                icollect(file_paths,
                         ignored_file_paths,
-                        match_function=match_dir_or_file_pattern)))
+                        match_function=match_dir_or_file_pattern,
+                        prune_function=match_dir_pattern,
+                        **extra_args)))
 
     # Find globs that gave no files and warn the user
     if valid_files:
@@ -0,0 +1,260 @@
+import errno
+import os
+import time
+
+from coalib.collecting.GitIgnore import GitIgnore
+
+# The kinds of entries of a directory
+DIRECTORY, FILE, OTHER = range(3)
+
+# Directories modified this many nanoseconds before they were read may be
+# modified again without a new modification time, as timestamps are coarse
+# on some filesystems. Their listings aren't reused.
+RACY_INTERVAL = 2 * 10**9
+
+
+def get_path_kind(path):
+    """
+    :param path: A path.
+    :return:     The kind of the path as found on the disk, see
+                 ``get_entry_kind``.
+    """
+    return (DIRECTORY if os.path.isdir(path)
+            else FILE if os.path.isfile(path)
+            else OTHER if os.path.exists(path)
+            else None)
+
+
+def get_entry_kind(entry):
+    """
+    :param entry: A ``os.DirEntry``.
+    :return:      Whether it's a directory, a file or something else, like
+                  ``os.path.isdir`` and ``os.path.isfile`` tell, following
+                  symlinks. ``None`` if it doesn't exist, like a broken
+                  symlink.
+    """
+    try:
+        if entry.is_dir():
+            return DIRECTORY
+        if entry.is_file():
+            return FILE
+        entry.stat()
+        return OTHER
+    except OSError:
+        return None
+
+
+def read_directory(path):
+    """
+    :param path: The path of a directory.
+    :return:     The entries of the directory, see
+                 ``FileSystemSnapshot.scan``, or the error listing it raised.
+    """
+    try:
+        with os.scandir(path) as directory:
+            return {os.path.normcase(entry.name):
+                    (entry.name, get_entry_kind(entry))
+                    for entry in directory}
+    except OSError as exception:
+        return exception
+
+
+class FileSystemSnapshot:
+    """
+    The contents of the directories needed to collect the files of a run.
+    Each directory is read with ``os.scandir`` when it's needed first, which
+    tells the kinds of its entries as well. Globs of all sections are looked
+    up in one snapshot, so a directory is read once per run no matter how
+    many sections or globs cover it.
+
+    The snapshot can be given to ``Globbing.iglob`` and ``collect_files``
+    instead of reading the disk:
+
+    >>> from coalib.parsing.Globbing import glob
+    >>> snapshot = FileSystemSnapshot()
+    >>> directory = os.path.dirname(__file__)
+    >>> __file__ in glob(os.path.join(directory, '*.py'), snapshot=snapshot)
+    True
+    >>> snapshot.isfile(__file__), snapshot.isdir(__file__)
+    (True, False)
+
+    Changes on the disk after a directory was read aren't seen.
+
+    The listings of directories can be kept for later runs, which then only
+    read the directories modified since:
+
+    >>> listings = {}
+    >>> _ = FileSystemSnapshot(listings).listdir(directory)
+    >>> snapshot = FileSystemSnapshot({}, listings)
+    >>> __file__ in glob(os.path.join(directory, '*.py'), snapshot=snapshot)
+    True
+
+    Only the modification times of the directories are compared, so
+    changes a directory's modification time doesn't tell of aren't seen,
+    like a changed target of a symlink in it.
+    """
+
+    def __init__(self, listings=None, previous_listings=None):
+        """
+        :param listings:          A dictionary to store the listings of the
+                                  directories read in, so they can be reused
+                                  in later runs. It maps the normalized
+                                  absolute paths of directories to tuples of
+                                  their modification times and the times
+                                  they were read at in nanoseconds and their
+                                  entries, see ``scan``. Directories aren't
+                                  stated if not given.
+        :param previous_listings: Such a dictionary of an earlier run. The
+                                  listings of the directories that weren't
+                                  modified since are reused.
+        """
+        self.listings = listings
+        self.previous_listings = ({} if previous_listings is None
+                                  else previous_listings)
+        # Maps the paths of directories, as given and normalized, to
+        # dictionaries of the ``os.path.normcase`` of the names of their
+        # entries and tuples of the names and their kinds, or to the error
+        # listing them raised
+        self.directories = {}
+        # The expanded globs of the run, see ``icollect``
+        self.match_cache = {}
+        self.git_ignore = None
+
+    def get_git_ignore(self):
+        """
+        :return: The ``GitIgnore`` reading the ignore files from this
+                 snapshot, which caches what it ignores for the run.
+        """
+        if self.git_ignore is None:
+            self.git_ignore = GitIgnore(self)
+        return self.git_ignore
+
+    def scan(self, path):
+        """
+        :param path: The path of a directory.
+        :return:     A dictionary of the ``os.path.normcase`` of the names of
+                     the entries of the directory and tuples of the names and
+                     their kinds.
+        :raises OSError: If the directory can't be listed.
+        """
+        entries = self._get_entries(path)
+        if isinstance(entries, OSError):
+            # The cached error gets a fresh traceback each time
+            raise entries.with_traceback(None)
+        return entries
+
+    def _get_entries(self, path):
+        """
+        :param path: The path of a directory.
+        :return:     The entries of the directory, see ``scan``, or the error
+                     listing it raised.
+        """
+        entries = self.directories.get(path)
+        if entries is None:
+            normalized_path = os.path.normcase(os.path.normpath(path))
+            entries = self.directories.get(normalized_path)
+            if entries is None:
+                entries = self._read(normalized_path)
+                self.directories[normalized_path] = entries
+            # Paths are mostly looked up as they were given before
+            self.directories[path] = entries
+        return entries
+
+    def _read(self, path):
+        """
+        :param path: The normalized path of a directory.
+        :return:     The entries of the directory, see ``scan``, or the error
+                     listing it raised.
+        """
+        parent, name = os.path.split(path)
+        siblings = self.directories.get(parent)
+        if name and isinstance(siblings, dict):
+            # Paths known not to be directories aren't read, as globs look
+            # for files in each path they match.
+            kind = siblings.get(name, (None, None))[1]
+            if kind is None:
+                return FileNotFoundError(
+                    errno.ENOENT, os.strerror(errno.ENOENT), path)
+            if kind != DIRECTORY:
+                return NotADirectoryError(
+                    errno.ENOTDIR, os.strerror(errno.ENOTDIR), path)
+
+        if self.listings is None or not os.path.isabs(path):
+            return read_directory(path)
+
+        try:
+            # The modification time is taken before the directory is read,
+            # so changes while reading it change it again
+            modified = os.stat(path).st_mtime_ns
+        except OSError as exception:
+            return exception
+
+        listing = (self.listings.get(path) or
+                   self.previous_listings.get(path))
+        if (listing is None or listing[0] != modified or
+                modified + RACY_INTERVAL > listing[1]):
+            read = int(time.time() * 10**9)
+            entries = read_directory(path)
+            if isinstance(entries, OSError):
+                return entries
+            listing = (modified, read, entries)
+
+        self.listings[path] = listing
+        return listing[2]
+
+    def listdir(self, path):
+        """
+        Lists a directory like ``os.listdir``.
+        """
+        return [name for name, _ in self.scan(path).values()]
+
+    def list_entries(self, path):
+        """
+        Lists a directory along with which entries are directories.
+
+        :param path: The path of a directory.
+        :return:     A list of tuples of the names of the entries and whether
+                     they're directories.
+        """
+        return [(name, kind == DIRECTORY)
+                for name, kind in self.scan(path).values()]
+
+    def get_kind(self, path):
+        """
+        :param path: A path.
+        :return:     The kind of the path, see ``get_entry_kind``.
+        """
+        dirname, basename = os.path.split(path)
+        if basename in ('', os.curdir, os.pardir):
+            dirname, basename = os.path.split(os.path.normpath(path))
+            if basename in ('', os.curdir, os.pardir):
+                # Roots and relative paths like '..' aren't entries of a
+                # listed directory
+                return get_path_kind(path)
+        basename = os.path.normcase(basename)
+
+        entries = self._get_entries(dirname or os.curdir)
+        if isinstance(entries, (FileNotFoundError, NotADirectoryError)):
+            return None
+        if isinstance(entries, OSError):
+            # Directories may be searchable without being readable
+            return get_path_kind(path)
+        return entries.get(basename, (None, None))[1]
+
+    def exists(self, path):
+        """
+        Tells if a path exists like ``os.path.exists``.
+        """
+        return self.get_kind(path) is not None
+
+    def isdir(self, path):
+        """
+        Tells if a path is a directory like ``os.path.isdir``.
+        """
+        return self.get_kind(path) == DIRECTORY
+
+    def isfile(self, path):
+        """
+        Tells if a path is a file like ``os.path.isfile``.
+        """
+        return self.get_kind(path) == FILE
@@ -0,0 +1,282 @@
+import logging
+import os
+import re
+
+
+def translate_gitignore_pattern(pattern):
+    """
+    Translates a pattern of a ``.gitignore`` file into a regular expression
+    matching the paths relative to the directory of the file, with ``'/'``
+    as separator:
+
+    >>> bool(re.match(translate_gitignore_pattern('*.pyc'), 'a/b.pyc'))
+    True
+    >>> bool(re.match(translate_gitignore_pattern('/a/**/c'), 'a/b/b/c'))
+    True
+    >>> bool(re.match(translate_gitignore_pattern('/a/*'), 'a/b/c'))
+    False
+
+    :param pattern: A pattern without leading ``'!'`` and trailing ``'/'``.
+    :return:        The regular expression as a string.
+    """
+    # Patterns with a separator are relative to the directory of the file,
+    # the others match a name at any depth
+    if '/' in pattern:
+        regex = ''
+        if pattern.startswith('/'):
+            pattern = pattern[1:]
+    else:
+        regex = '(?:.*/)?'
+
+    index, length = 0, len(pattern)
+    while index < length:
+        char = pattern[index]
+        index += 1
+        if char == '*':
+            if (pattern.startswith('*', index) and
+                    (index == 1 or pattern[index - 2] == '/') and
+                    (index + 1 == length or pattern[index + 1] == '/')):
+                # '**' as a whole part of the path matches any parts
+                if index + 1 == length:
+                    regex += '.*'
+                    index += 1
+                else:
+                    regex += '(?:.*/)?'
+                    index += 2
+            else:
+                while pattern.startswith('*', index):
+                    index += 1
+                regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[':
+            closing_index = pattern.find(']', index + 1)
+            if closing_index == -1:
+                regex += '\\['
+            else:
+                sequence = pattern[index:closing_index]
+                index = closing_index + 1
+                negated = sequence[0] in '!^'
+                if negated:
+                    sequence = sequence[1:]
+                sequence = ''.join('\\' + char if char in '\\[]^' else char
+                                   for char in sequence)
+                regex += ('[^/' if negated else '[') + sequence + ']'
+        elif char == '\\' and index < length:
+            regex += re.escape(pattern[index])
+            index += 1
+        else:
+            regex += re.escape(char)
+
+    return regex + '\\Z'
+
+
+class GitIgnoreRules:
+    """
+    The rules of one ``.gitignore`` or ``info/exclude`` file. All rules are
+    compiled into one regular expression, tried from the last rule to the
+    first, so it tells the last matching rule at once, which is the one
+    deciding.
+
+    >>> rules = GitIgnoreRules(['*.log', '!keep.log', 'build/'])
+    >>> [rules.match(path, lambda: False)
+    ...  for path in ('a.log', 'a/keep.log', 'build', 'a.py')]
+    [True, False, None, None]
+    >>> rules.match('a/build', lambda: True)
+    True
+    """
+
+    def __init__(self, lines):
+        """
+        :param lines: The lines of the file.
+        """
+        # Tuples of the regular expression of each rule, whether it's
+        # negated and whether it only matches directories
+        self.rules = []
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line or line.startswith('#'):
+                continue
+            # Trailing spaces are dropped unless they're escaped
+            while line.endswith(' ') and not line.endswith('\\ '):
+                line = line[:-1]
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            directory_only = line.endswith('/')
+            line = line.rstrip('/')
+            if line:
+                self.rules.append((translate_gitignore_pattern(line),
+                                   negated,
+                                   directory_only))
+
+        self.pattern = self.compile(self.rules)
+        # Rules only matching directories can't decide on other paths
+        self.file_pattern = (
+            self.compile([rule for rule in self.rules if not rule[2]])
+            if any(directory_only for _, _, directory_only in self.rules)
+            else self.pattern)
+
+    @staticmethod
+    def compile(rules):
+        """
+        :param rules: A list of rules, see ``rules``.
+        :return:      A tuple of a regular expression matching the rules
+                      with one group per rule, from the last to the first
+                      one, and the rules of the groups. ``None`` if there are
+                      no rules.
+        """
+        if not rules:
+            return None
+        rules = rules[::-1]
+        return (re.compile('(?s)' + '|'.join('(' + regex + ')'
+                                             for regex, _, _ in rules)),
+                [None] + rules)
+
+    def match(self, path, is_dir):
+        """
+        :param path:   The path relative to the directory of the file, with
+                       ``'/'`` as separator.
+        :param is_dir: A function telling whether the path is a directory,
+                       only called if it matters.
+        :return:       Whether the path is ignored, ``None`` if no rule
+                       matches.
+        """
+        for pattern in (self.pattern, self.file_pattern):
+            if pattern is None:
+                return None
+            match = pattern[0].match(path)
+            if match is None:
+                return None
+            _, negated, directory_only = pattern[1][match.lastindex]
+            if not directory_only or is_dir():
+                return not negated
+
+
+class GitIgnore:
+    """
+    Tells which paths git ignores, as given by the ``.gitignore`` files of a
+    repository and its ``.git/info/exclude`` file. The files are parsed
+    natively, git isn't run. Paths outside of repositories aren't ignored,
+    ``.git`` directories always are.
+
+    The directories and the ignore files are looked up in a
+    ``FileSystemSnapshot``. Decisions are cached for each path, so
+    directories are looked at once, no matter how many files they contain.
+
+    >>> from coalib.collecting.FileSystemSnapshot import FileSystemSnapshot
+    >>> git_ignore = GitIgnore(FileSystemSnapshot())
+    >>> git_ignore.ignores(os.path.join(os.getcwd(), '.git', 'config'))
+    True
+    """
+
+    def __init__(self, snapshot):
+        """
+        :param snapshot: The ``FileSystemSnapshot`` to look paths up in.
+        """
+        self.snapshot = snapshot
+        # Maps absolute paths to whether they're ignored
+        self.ignored = {}
+        # Maps directories to the rules applying to their entries, a list of
+        # tuples of the directory of each ignore file and its rules, the
+        # deciding ones first. ``None`` for directories not in a repository.
+        self.levels = {}
+
+    def ignores(self, path):
+        """
+        :param path: A path.
+        :return:     Whether git ignores the path or a directory it is in.
+        """
+        if not os.path.isabs(path):
+            path = os.path.abspath(path)
+        ignored = self.ignored.get(path)
+        if ignored is None:
+            ignored = self.ignored[path] = self._ignores(path)
+        return ignored
+
+    def _ignores(self, path):
+        directory, name = os.path.split(path)
+        if not name:
+            return False
+        if name == '.git':
+            return True
+        if os.path.split(directory)[1] and self.ignores(directory):
+            # Nothing in an ignored directory can be included again
+            return True
+
+        levels = self.get_levels(directory)
+        if not levels:
+            return False
+
+        def is_dir():
+            return self.snapshot.isdir(path)
+
+        for level_directory, rules in levels:
+            relative_path = path[len(os.path.join(level_directory, '')):]
+            if os.sep != '/':  # pragma posix: no cover
+                relative_path = relative_path.replace(os.sep, '/')
+            ignored = rules.match(relative_path, is_dir)
+            if ignored is not None:
+                return ignored
+
+        return False
+
+    def get_levels(self, directory):
+        """
+        :param directory: The absolute path of a directory.
+        :return:          The rules applying to its entries, see ``levels``.
+        """
+        if directory not in self.levels:
+            levels = []
+            rules = self.read_rules(os.path.join(directory, '.gitignore'))
+            if rules is not None:
+                levels.append((directory, rules))
+
+            git_path = os.path.join(directory, '.git')
+            if self.snapshot.exists(git_path):
+                rules = self.read_rules(os.path.join(
+                    self.get_git_dir(git_path), 'info', 'exclude'))
+                if rules is not None:
+                    levels.append((directory, rules))
+            else:
+                parent = os.path.dirname(directory)
+                parent_levels = (None if parent == directory
+                                 else self.get_levels(parent))
+                levels = (None if parent_levels is None
+                          else levels + parent_levels)
+
+            self.levels[directory] = levels
+        return self.levels[directory]
+
+    def get_git_dir(self, git_path):
+        """
+        :param git_path: The path of the ``.git`` entry of a repository.
+        :return:         The path of the git directory, which the entry is
+                         or refers to for submodules and worktrees.
+        """
+        if self.snapshot.isdir(git_path):
+            return git_path
+        try:
+            with open(git_path) as file:
+                line = file.readline().strip()
+        except OSError:
+            return git_path
+        if line.startswith('gitdir:'):
+            return os.path.join(os.path.dirname(git_path),
+                                line[len('gitdir:'):].strip())
+        return git_path
+
+    def read_rules(self, path):
+        """
+        :param path: The path of an ignore file.
+        :return:     Its ``GitIgnoreRules``, ``None`` if it doesn't exist.
+        """
+        if not self.snapshot.isfile(path):
+            return None
+        try:
+            with open(path, encoding='utf-8', errors='replace') as file:
+                return GitIgnoreRules(file)
+        except OSError as exception:
+            logging.warning(f'Failed to read the ignore file {path!r}: '
+                            f'{exception}')
+            return None
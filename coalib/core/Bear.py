@@ -437,7 +437,18 @@ class Bear:
         :return:
             A list of results from the bear.
         """
-        return list(self.analyze(*args, **kwargs))
+        # The diffs of dependency results sent to another process come
+        # without their files
+        for results in self.dependency_results.values():
+            for result in results:
+                if isinstance(result, Result):
+                    result.resolve_diffs(self.file_dict)
+
+        results = list(self.analyze(*args, **kwargs))
+        for result in results:
+            if isinstance(result, Result):
+                result.share_diffs(self.file_dict)
+        return results
 
     def analyze(self, *args, **kwargs):
         """
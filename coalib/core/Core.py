@@ -7,6 +7,7 @@ from coalib.core.DependencyTracker import DependencyTracker
 from coalib.core.Graphs import traverse_graph
 from coalib.core.PersistentHash import persistent_hash
 from coalib.misc.Compatibility import run_coroutine_threadsafe
+from coalib.results.Result import Result
 
 
 def group(iterable, key=lambda x: x):
@@ -367,6 +368,10 @@ class Session:
         """
         try:
             results = future.result()
+            # Diffs are sent without their files, they're looked up here
+            for result in results:
+                if isinstance(result, Result):
+                    result.resolve_diffs(bear.file_dict)
 
             for dependant in self.dependency_tracker.get_dependants(bear):
                 dependant.dependency_results[type(bear)] += results
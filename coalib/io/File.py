@@ -3,6 +3,9 @@ import os
 from coala_utils.decorators import generate_eq
 from cached_property import cached_property
 
+#: Files with a NUL byte in this many bytes at their start are binary.
+BINARY_SNIFF_SIZE = 8192
+
 
 @generate_eq('name', 'timestamp')
 class File:
@@ -92,8 +95,7 @@ class File:
         """
         lines = self.string.splitlines()
         if self._newline:
-            return tuple(line + '\n'
-                         for line in lines)
+            return tuple([line + '\n' for line in lines])
         else:
             return tuple(lines)
 
@@ -106,6 +108,20 @@ class File:
         with open(self._filename, 'rb') as fp:
             return fp.read()
 
+    @cached_property
+    def binary(self):
+        """
+        :return:
+            Whether the file is binary, i.e. contains a NUL byte in its first
+            ``BINARY_SNIFF_SIZE`` bytes. Only those bytes are read if the
+            file wasn't read yet.
+        """
+        if 'raw' in self.__dict__:
+            return b'\0' in self.raw[:BINARY_SNIFF_SIZE]
+
+        with open(self._filename, 'rb') as fp:
+            return b'\0' in fp.read(BINARY_SNIFF_SIZE)
+
     @cached_property
     def string(self):
         """
@@ -149,3 +165,13 @@ class File:
         DEPRECATED.
         """
         return self.lines[item]
+
+    def __getstate__(self):
+        """
+        :return:
+            The state of the file without its contents, which are read
+            again when they are accessed after unpickling.
+        """
+        return {'_filename': self._filename,
+                '_timestamp': self._timestamp,
+                '_newline': self._newline}
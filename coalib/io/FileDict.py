@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+from coalib.misc.Exceptions import log_exception
+from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
+
+
+#: The number of threads to read files with. Reading files is mostly waiting
+#: for the file system, which is done best by more threads than processors.
+LOAD_THREAD_COUNT = 8
+
+
+def read_files(files):
+    """
+    Reads the given files unless they are binary. Errors are ignored, they
+    are raised again once the contents of the files are accessed.
+
+    :param files: The ``File`` objects to read.
+    """
+    for file in files:
+        try:
+            if not file.binary:
+                file.raw
+        except OSError:
+            pass
+
+
+class FileDict(dict):
+    """
+    Acts as a middleware to provide the bears with the
+    actual file contents instead of the `File`
+    objects.
+
+    Files are only read once their contents are accessed. Accessing a file
+    that can't be read or decoded raises a ``KeyError``, it's left out of the
+    dictionary once it's loaded, see ``load``. If raw files are allowed,
+    files that can't be decoded are kept with ``None`` as contents instead.
+
+    >>> import os
+    >>> import tempfile
+    >>> from coalib.io.File import File
+    >>> temp = tempfile.NamedTemporaryFile(delete=False)
+    >>> temp.write(b'\\xff')
+    1
+    >>> temp.close()
+    >>> file_dict = FileDict({temp.name: File(temp.name)}, allow_raw_files=True)
+    >>> file_dict[temp.name] is None
+    True
+    >>> os.remove(temp.name)
+    """
+
+    def __init__(self, *args, allow_raw_files=False, **kwargs):
+        """
+        :param allow_raw_files: Whether files that can't be decoded are kept
+                                with ``None`` as contents.
+        """
+        dict.__init__(self, *args, **kwargs)
+        self.allow_raw_files = allow_raw_files
+        self.loaded = False
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.loaded = False
+
+    def __getitem__(self, key):
+        val = super().__getitem__(key)
+        if val is None:
+            return val
+
+        try:
+            # Binary files are left out without reading them completely
+            if not val.binary:
+                return val.lines
+        except UnicodeDecodeError:
+            pass
+        except OSError as exception:
+            log_exception(f"Failed to read file '{key}' because of an "
+                          'unknown error. Leaving it out.',
+                          exception,
+                          log_level=LOG_LEVEL.WARNING)
+            raise KeyError(key)
+
+        if self.allow_raw_files:
+            super().__setitem__(key, None)
+            return None
+
+        logging.warning(f"Failed to read file '{key}'. It seems to "
+                        'contain non-unicode characters. Leaving it out.')
+        raise KeyError(key)
+
+    def load(self, thread_count=LOAD_THREAD_COUNT):
+        """
+        Reads all files that weren't read yet and removes those that can't be
+        read from the dictionary, so iterating it afterwards only gives files
+        that can be read.
+
+        Reading files mostly waits for the file system, so the files are read
+        by a pool of threads first. Decoding them needs the interpreter and is
+        done afterwards. Binary files are only read as far as needed to tell
+        they are binary.
+
+        :param thread_count: The number of threads to read the files with.
+        """
+        if self.loaded:
+            return
+
+        files = [file for file in self.values() if file is not None]
+
+        start_time = time.perf_counter()
+        # Every thread gets an equal share of the files at once, handing out
+        # single files costs more than reading most of them.
+        chunks = [files[i::thread_count] for i in range(thread_count)]
+        with ThreadPoolExecutor(thread_count) as executor:
+            list(executor.map(read_files, chunks))
+        read_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for filename in list(self.keys()):
+            try:
+                self[filename]
+            except KeyError:
+                super().__delitem__(filename)
+        decode_time = time.perf_counter() - start_time
+
+        logging.debug(f'Read {len(files)} files in {read_time:.3f}s, decoded '
+                      f'them in {decode_time:.3f}s.')
+        self.loaded = True
+
+    def subset(self, filenames):
+        """
+        :param filenames: The files to keep.
+        :return:          A ``FileDict`` with the given files only. The files
+                          are shared with this dictionary, so each of them is
+                          read only once.
+        """
+        return FileDict(((filename, dict.__getitem__(self, filename))
+                         for filename in filenames
+                         if filename in self),
+                        allow_raw_files=self.allow_raw_files)
@@ -1,10 +1,15 @@
+import hashlib
 import logging
-import time
 import os
+import pickle
+import shutil
+import tempfile
+import time
 
 from coala_utils.decorators import enforce_signature
+from coalib.collecting.FileSystemSnapshot import FileSystemSnapshot
 from coalib.misc.CachingUtilities import (
-    pickle_load, pickle_dump, delete_files)
+    pickle_load, pickle_dump, delete_files, get_data_path, hash_id)
 from coalib.misc.Exceptions import log_exception
 from coalib.processes.Processing import get_file_dict
 from coalib.io.FileProxy import (
@@ -12,6 +17,262 @@ from coalib.io.FileProxy import (
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
 
 
+class ResultCache:
+    """
+    This object is a persistent store for the results of local bears. Results
+    are stored per file and per bear, keyed by the file name, the file
+    contents, the bear class and the effective settings of the bear, so
+    results can be replayed for files whose contents did not change since
+    they were analyzed.
+
+    >>> import logging
+    >>> from queue import Queue
+    >>> from coalib.bears.LocalBear import LocalBear
+    >>> from coalib.results.Result import Result
+    >>> from coalib.settings.Section import Section
+    >>> logging.getLogger().setLevel(logging.CRITICAL)
+
+    >>> class SomeBear(LocalBear):
+    ...     def run(self, filename, file, max_length: int = 80):
+    ...         yield Result.from_values(self, 'Too long.', filename, 1)
+
+    >>> result_cache = ResultCache('test', flush_cache=True)
+    >>> bear = SomeBear(Section('test'), Queue())
+    >>> result_cache.get_results('a.py', ('a = 1\\n',), bear) is None
+    True
+
+    Results are stored for a file and a bear:
+
+    >>> result_cache.store_results(
+    ...     'a.py', ('a = 1\\n',), bear, [Result('SomeBear', 'Too long.')])
+    >>> result_cache.get_results('a.py', ('a = 1\\n',), bear)
+    [<Result object(id=..., origin='SomeBear', ...>]
+
+    Once the file contents change, the stored results are not valid anymore:
+
+    >>> result_cache.get_results('a.py', ('a = 2\\n',), bear) is None
+    True
+
+    The same holds for changed settings:
+
+    >>> bear.section['max_length'] = '100'
+    >>> result_cache = ResultCache('test')
+    >>> result_cache.get_results('a.py', ('a = 1\\n',), bear) is None
+    True
+    """
+
+    #: Stored results not used for this many seconds are removed by
+    #: ``prune``.
+    MAX_AGE = 30 * 24 * 60 * 60
+
+    def __init__(self, project_dir: str, flush_cache: bool = False):
+        """
+        Initialize ResultCache.
+
+        :param project_dir: The root directory of the project to be used
+                            as a key identifier.
+        :param flush_cache: Flush the stored results.
+        """
+        self.directory = get_data_path(None, project_dir + ':results')
+        self._bear_keys = {}
+        # Maps files to their size, modification time in nanoseconds and
+        # content digest as known to the ``FileCache``, see ``add_digests``.
+        self.digests = {}
+        # Maps files to the lines their key digest was last computed for
+        # and the digest, so files are hashed once for all bears.
+        self._file_digests = {}
+        if flush_cache:
+            self.flush_cache()
+
+    def __getstate__(self):
+        # The bear keys are cached by section identity which isn't kept when
+        # the cache is sent to another process.
+        state = self.__dict__.copy()
+        state['_bear_keys'] = {}
+        state['_file_digests'] = {}
+        return state
+
+    def add_digests(self, digests):
+        """
+        Adds content digests of files computed by the ``FileCache``, which
+        are used to look results up instead of hashing the lines of the
+        files. A digest is only used if the stat data of the file is still
+        the same once its lines were read, so the files must be read after
+        the digests were computed.
+
+        :param digests: A dict mapping files to a tuple of their size,
+                        modification time in nanoseconds and content digest.
+        """
+        self.digests.update(digests)
+
+    def flush_cache(self):
+        """
+        Deletes all stored results.
+        """
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        logging.debug('The result cache was successfully flushed.')
+
+    def get_bear_key(self, bear_class, section):
+        """
+        Computes a key identifying a bear and its effective settings. The
+        settings of the dependencies of the bear are taken into account too,
+        as they influence the dependency results the bear gets.
+
+        :param bear_class: The bear class.
+        :param section:    The section the bear is run in.
+        :return:           A hash unique to the bear and its settings.
+        """
+        cache_key = (bear_class, id(section))
+        if cache_key not in self._bear_keys:
+            metadata = bear_class.get_metadata()
+            settings = [bear_class.__module__,
+                        bear_class.__qualname__,
+                        str(section.language)]
+            try:
+                source = bear_class.source_location
+                settings += [source, str(os.path.getmtime(source))]
+            except (OSError, TypeError):
+                pass
+
+            for param in sorted(list(metadata.non_optional_params) +
+                                list(metadata.optional_params)):
+                if param in section:
+                    settings.append(param + '=' + str(section[param]))
+
+            settings += sorted(self.get_bear_key(dependency, section)
+                               for dependency in bear_class.BEAR_DEPS)
+            self._bear_keys[cache_key] = hash_id(repr(settings))
+
+        return self._bear_keys[cache_key]
+
+    def _get_path(self, filename, file, bear):
+        if self.directory is None:
+            return None
+
+        key = hash_id(filename + ':' + self._get_digest(filename, file) +
+                      ':' + self.get_bear_key(type(bear), bear.section))
+        return os.path.join(self.directory, key[:2], key)
+
+    def _get_digest(self, filename, file):
+        known = self._file_digests.get(filename)
+        if known is not None and known[0] is file:
+            return known[1]
+
+        digest = None
+        stat = self.digests.get(filename)
+        if stat is not None:
+            try:
+                current = os.stat(filename)
+                if (current.st_size, current.st_mtime_ns) == stat[:2]:
+                    digest = stat[2]
+            except OSError:
+                pass
+
+        if digest is None:
+            # The lines are hashed if the file changed since the digest was
+            # computed, as they may have been read before or after it
+            lines_digest = hashlib.md5()
+            for line in file:
+                lines_digest.update(line.encode('utf-8', 'surrogateescape'))
+            digest = 'lines:' + lines_digest.hexdigest()
+
+        self._file_digests[filename] = (file, digest)
+        return digest
+
+    def get_results(self, filename, file, bear):
+        """
+        Retrieves the stored results of a bear for a file.
+
+        :param filename: The name of the file.
+        :param file:     The lines of the file.
+        :param bear:     The bear instance.
+        :return:         The list of stored results or ``None`` if no
+                         results are stored for the given file contents and
+                         bear settings.
+        """
+        path = self._get_path(filename, file, bear)
+        if path is None or not os.path.isfile(path):
+            return None
+
+        try:
+            with open(path, 'rb') as fp:
+                results = pickle.load(fp)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, TypeError, ValueError):
+            # The store may be corrupt or from a coala version that pickled
+            # results differently
+            return None
+
+        try:
+            # The modification time tells when the results were last used
+            os.utime(path)
+        except OSError:
+            pass
+
+        # Diffs are stored without their files
+        for result in results:
+            result.resolve_diffs({filename: file})
+        return results
+
+    def store_results(self, filename, file, bear, results):
+        """
+        Stores the results of a bear for a file. The store is written
+        atomically, so concurrent workers never see partial entries.
+
+        :param filename: The name of the file.
+        :param file:     The lines of the file.
+        :param bear:     The bear instance.
+        :param results:  The list of results the bear yielded.
+        """
+        path = self._get_path(filename, file, bear)
+        if path is None:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Diffs of the file are stored without it
+            for result in results:
+                result.share_diffs({filename: file})
+            data = pickle.dumps(results)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(data)
+            os.replace(temp_path, path)
+        except (OSError, pickle.PicklingError, TypeError,
+                AttributeError) as exception:
+            logging.debug(f'Unable to cache the results of {bear.name} on '
+                          f'{filename!r}: {exception}')
+
+    def prune(self, max_age=MAX_AGE):
+        """
+        Removes the stored results that weren't stored or used in the given
+        time, so results of old file contents and settings don't pile up.
+
+        :param max_age: The time in seconds.
+        """
+        if self.directory is None:
+            return
+
+        oldest = time.time() - max_age
+        try:
+            subdirectories = [entry.path
+                              for entry in os.scandir(self.directory)
+                              if entry.is_dir()]
+        except OSError:
+            return
+
+        for subdirectory in subdirectories:
+            try:
+                with os.scandir(subdirectory) as entries:
+                    for entry in entries:
+                        if entry.stat().st_mtime < oldest:
+                            os.remove(entry.path)
+            except OSError as exception:
+                logging.debug('Unable to remove old results from '
+                              f'{subdirectory!r}: {exception}')
+
+
 class FileCache:
     """
     This object is a file cache that helps in collecting only the changed
@@ -96,6 +357,26 @@ class FileCache:
             flush_cache = True
 
         self.data = cache_data.get('files', {})
+        # Maps files to their size, modification time in nanoseconds and
+        # content digest as recorded at the end of the last run.
+        self.stats = cache_data.get('stats', {})
+        # The size and modification time of the files as observed when
+        # checking them for changes in this run.
+        self._observed_stats = {}
+        # The size, modification time and content digest of files whose
+        # digest was computed in this run, so it's computed once.
+        self._observed_digests = {}
+        # Maps files to a dict of the time in seconds each local bear needed
+        # to analyze them in previous runs, along with the estimated size
+        # the file had then.
+        self.timings = cache_data.get('timings', {})
+        # The time old results were last removed from the result cache
+        self.results_pruned = cache_data.get('results_pruned', -1)
+        # The listings of the directories read when collecting the files of
+        # the last run and of this one, see ``FileSystemSnapshot``.
+        self.directories = cache_data.get('directories', {})
+        self._new_directories = {}
+        self.result_cache = ResultCache(project_dir)
         if flush_cache:
             self.flush_cache()
 
@@ -110,7 +391,13 @@ class FileCache:
         Flushes the cache and deletes the relevant file.
         """
         self.data = {}
+        self.stats = {}
+        self.timings = {}
+        self.results_pruned = -1
+        self.directories = {}
+        self._new_directories = {}
         delete_files(None, [self.project_dir])
+        self.result_cache.flush_cache()
         logging.debug('The file cache was successfully flushed.')
 
     def __enter__(self):
@@ -122,15 +409,143 @@ class FileCache:
         to the current time. Using this object as a contextmanager is
         preferred (that will automatically call this method on exit).
         """
+        # Untracked files are analyzed again, so their timings stay useful.
+        self.timings = {file: timings
+                        for file, timings in self.timings.items()
+                        if file in self.data or file in self.to_untrack}
         for file in self.to_untrack:
             if file in self.data:
                 del self.data[file]
+            self.stats.pop(file, None)
         for file_name in self.data:
             self.data[file_name] = self.current_time
+            self._update_stats(file_name)
+        # Looking at all stored results takes a while, so it's done daily
+        if self.current_time - self.results_pruned >= 24 * 60 * 60:
+            self.result_cache.prune()
+            self.results_pruned = self.current_time
         pickle_dump(
             None,
             self.project_dir,
-            {'time': self.current_time, 'files': self.data})
+            {'time': self.current_time,
+             'results_pruned': self.results_pruned,
+             'files': self.data,
+             'stats': self.stats,
+             'timings': self.timings,
+             # The listings of directories no longer collected from are
+             # dropped, unless nothing was collected at all.
+             'directories': self._new_directories or self.directories})
+
+    def get_snapshot(self):
+        """
+        :return: A ``FileSystemSnapshot`` to collect files from. It reuses
+                 the listings of directories that weren't modified since
+                 they were read in the last run or earlier in this one.
+        """
+        return FileSystemSnapshot(self._new_directories, self.directories)
+
+    @staticmethod
+    def _get_stat(file):
+        stat = os.stat(file)
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def _get_digest(file):
+        digest = hashlib.md5()
+        with open(file, 'rb') as fp:
+            for block in iter(lambda: fp.read(65536), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _update_stats(self, file):
+        """
+        Records the stat data and the content digest of a file that was
+        checked for changes in this run. The digest is only computed if it
+        is not known for the observed stat data yet. If the file was
+        modified after it was checked, no digest is stored so it will be
+        analyzed again on the next run.
+
+        :param file: The file to record.
+        """
+        observed = self._observed_stats.get(file)
+        if observed is None:
+            return
+
+        try:
+            current = self._get_stat(file)
+        except OSError:
+            self.stats.pop(file, None)
+            return
+
+        if current != observed:
+            self.stats[file] = observed + (None,)
+            return
+
+        old = self.stats.get(file)
+        if old is None or old[:2] != observed or old[2] is None:
+            digest = self._observed_digests.get(file)
+            self.stats[file] = (digest if digest is not None and
+                                digest[:2] == observed
+                                else observed + (self._get_digest(file),))
+
+    def get_digests(self, files):
+        """
+        Returns the content digests of files, for the ``ResultCache`` to
+        look results up with. Digests known from the last run are reused if
+        the size and modification time of the file didn't change, the others
+        are computed once per run.
+
+        :param files: The files to get the digests of.
+        :return:      A dict mapping the files to a tuple of their size,
+                      modification time in nanoseconds and content digest.
+                      Files that can't be read or change while they are
+                      hashed are left out.
+        """
+        digests = {}
+        for file in files:
+            try:
+                observed = self._get_stat(file)
+            except OSError:
+                continue
+            # The stat data is recorded like for files checked for changes
+            self._observed_stats[file] = observed
+
+            for known in (self._observed_digests.get(file),
+                          self.stats.get(file)):
+                if (known is not None and known[:2] == observed and
+                        known[2] is not None):
+                    digests[file] = known
+                    break
+            else:
+                try:
+                    digest = self._get_digest(file)
+                    if self._get_stat(file) != observed:
+                        continue
+                except OSError:
+                    continue
+                digests[file] = self._observed_digests[file] = (
+                    observed + (digest,))
+
+        return digests
+
+    def record_timings(self, file, timings, size):
+        """
+        Records how long local bears needed to analyze a file, so that the
+        work of the next run can be ordered by it.
+
+        >>> cache = FileCache(None, "test", flush_cache=True)
+        >>> cache.record_timings("a.c", {"SomeBear": 0.5}, 100)
+        >>> cache.timings
+        {'a.c': {'SomeBear': (0.5, 100)}}
+
+        :param file:    The file that was analyzed.
+        :param timings: A dict mapping bear names to the time in seconds
+                        they needed to analyze the file.
+        :param size:    The estimated size of the analyzed file contents.
+        """
+        recorded = self.timings.setdefault(file, {})
+        for bear, seconds in timings.items():
+            recorded[bear] = (seconds, size)
 
     def __exit__(self, type, value, traceback):
         """
@@ -161,10 +576,45 @@ class FileCache:
             if file not in self.data:
                 self.data[file] = -1
 
+    def _is_cached(self, file):
+        """
+        Checks whether a file is unchanged since the last run. The file is
+        considered unchanged if its size and modification time are the same.
+        Otherwise the content digest decides, so touching a file without
+        changing it doesn't invalidate it while edits within the same second
+        are still detected.
+
+        :param file: The file to check.
+        :return:     True if the file is unchanged since the last run.
+        """
+        if file not in self.data:
+            return False
+
+        try:
+            observed = self._get_stat(file)
+        except OSError:
+            return False
+        self._observed_stats[file] = observed
+
+        old = self.stats.get(file)
+        if old is None:
+            # Cache data from older coala versions only has the run time.
+            return observed[1] // 10**9 <= self.data[file]
+
+        if old[:2] == observed:
+            return True
+
+        if old[0] != observed[0] or old[2] is None:
+            return False
+
+        digest = self._get_digest(file)
+        self.stats[file] = observed + (digest,)
+        return digest == old[2]
+
     def get_uncached_files(self, files):
         """
-        Returns the set of files that are not in the cache yet or have been
-        untracked.
+        Returns the set of files that are not in the cache yet, have been
+        untracked or have changed since the last run.
 
         :param files: The list of collected files.
         :return:      A set of files that are uncached.
@@ -172,12 +622,14 @@ class FileCache:
         if self.data == {}:
             # The first run on this project. So all files are new
             # and must be returned irrespective of whether caching is turned on.
+            for file in files:
+                try:
+                    self._observed_stats[file] = self._get_stat(file)
+                except OSError:
+                    pass
             return files
         else:
-            return {file
-                    for file in files
-                    if (file not in self.data or
-                        int(os.path.getmtime(file)) > self.data[file])}
+            return {file for file in files if not self._is_cached(file)}
 
 
 class FileDictFileCache(FileCache, FileDictGenerator):
@@ -266,6 +718,17 @@ class ProxyMapFileCache(FileCache, FileDictGenerator):
         """
         self.__proxymap = fileproxy_map
 
+    def get_digests(self, files):
+        """
+        The proxies may hold contents differing from the files on disk, so
+        no digests are given and results are looked up by the lines of the
+        files.
+
+        :param files: The files to get the digests of.
+        :return:      An empty dict.
+        """
+        return {}
+
     def get_file_dict(self, filename_list, allow_raw_files=False):
         """
         Builds a file dictionary from filename to lines of the file
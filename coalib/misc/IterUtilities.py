@@ -1,3 +1,4 @@
+from functools import wraps
 from itertools import tee
 
 
@@ -13,3 +14,38 @@ def partition(iterable, predicate):
 
     return ((item for pred, item in a if pred),
             (item for pred, item in b if not pred))
+
+
+def yield_once(iterator):
+    """
+    Decorator to make an iterator returned by a method yield each result only
+    once, like ``coala_utils.decorators.yield_once``. Hashable results are
+    remembered in a set, so many results don't take quadratic time.
+
+    >>> @yield_once
+    ... def generate_list(foo):
+    ...     return foo
+    >>> list(generate_list([1, 2, 1, [3], [3]]))
+    [1, 2, [3]]
+
+    :param iterator: Any method that returns an iterator
+    :return:         A method returning an iterator
+                     that yields every result only once at most.
+    """
+    @wraps(iterator)
+    def yield_once_generator(*args, **kwargs):
+        yielded = set()
+        # Unhashable results are compared to each other
+        yielded_unhashable = []
+        for item in iterator(*args, **kwargs):
+            try:
+                if item in yielded:
+                    continue
+                yielded.add(item)
+            except TypeError:
+                if item in yielded_unhashable:
+                    continue
+                yielded_unhashable.append(item)
+            yield item
+
+    return yield_once_generator
@@ -35,6 +35,7 @@ from coalib.results.result_actions.AlternatePatchAction import (
 from coalib.results.RESULT_SEVERITY import (
     RESULT_SEVERITY, RESULT_SEVERITY_COLORS)
 from coalib.settings.Setting import Setting
+from coala_utils.decorators import get_public_members
 from coala_utils.string_processing.Core import join_names
 
 from pygments import highlight
@@ -385,7 +386,8 @@ def print_results_formatted(log_printer,
 
     for result in result_list:
         severity_str = RESULT_SEVERITY.__str__(result.severity)
-        format_args = vars(result)
+        # Contains the message too
+        format_args = get_public_members(result)
         try:
             if len(result.affected_code) == 0:
                 format_args['affected_code'] = None
@@ -395,7 +397,6 @@ def print_results_formatted(log_printer,
                                         column=None,
                                         end_column=None,
                                         severity_str=severity_str,
-                                        message=result.message,
                                         **format_args))
                 continue
 
@@ -408,7 +409,6 @@ def print_results_formatted(log_printer,
                                         column=range.start.column,
                                         end_column=range.end.column,
                                         severity_str=severity_str,
-                                        message=result.message,
                                         **format_args))
         except KeyError as exception:
             log_exception(
@@ -4,6 +4,7 @@ import json
 import io
 import logging
 import logging.config
+import threading
 
 
 class CounterHandler(logging.Handler):
@@ -78,12 +79,29 @@ def configure_logging(color=True):
     })
 
 
-def configure_json_logging():
+def configure_json_logging(writer=None):
     """
     Configures logging for JSON.
-    :return: Returns a ``StringIO`` that captures the logs as JSON.
+
+    :param writer: A ``JSONLinesWriter`` to write the logs with as soon as
+                   they are logged. If not given, the logs are captured.
+    :return:       Returns a ``StringIO`` that captures the logs as JSON, or
+                   ``None`` if a writer is given.
     """
-    stream = io.StringIO()
+    if writer is None:
+        stream = io.StringIO()
+        handler = {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+            'stream': stream
+        }
+    else:
+        stream = None
+        handler = {
+            '()': 'coalib.output.Logging.JSONLinesHandler',
+            'formatter': 'json',
+            'writer': writer
+        }
 
     # reset counter handler
     CounterHandler.reset()
@@ -91,11 +109,7 @@ def configure_json_logging():
     logging.config.dictConfig({
         'version': 1,
         'handlers': {
-            'json': {
-                'class': 'logging.StreamHandler',
-                'formatter': 'json',
-                'stream': stream
-            },
+            'json': handler,
             'counter': {
                 'class': 'coalib.output.Logging.CounterHandler'
             }
@@ -113,6 +127,63 @@ def configure_json_logging():
     return stream
 
 
+class JSONLinesWriter:
+    """
+    Writes JSON objects to a stream, one per line. The stream is flushed after
+    every line, so the objects can be read while coala is still running. Lines
+    written by several threads, e.g. the results and the logs, don't mix.
+
+    >>> import io
+    >>> stream = io.StringIO()
+    >>> writer = JSONLinesWriter(stream)
+    >>> writer.write({'b': 2, 'a': 1})
+    >>> writer.write([3])
+    >>> print(stream.getvalue(), end='')
+    {"a": 1, "b": 2}
+    [3]
+    """
+
+    def __init__(self, stream, encoder=None):
+        """
+        :param stream:  The stream to write to.
+        :param encoder: The ``json.JSONEncoder`` class to encode objects with.
+        """
+        self.stream = stream
+        self.encoder = encoder
+        self.lock = threading.Lock()
+
+    def write_line(self, line):
+        """
+        :param line: A line holding an encoded JSON object.
+        """
+        with self.lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
+
+    def write(self, obj):
+        """
+        :param obj: The object to encode and write.
+        """
+        self.write_line(json.dumps(obj, cls=self.encoder, sort_keys=True))
+
+
+class JSONLinesHandler(logging.Handler):
+    """
+    A logging handler writing the records with a ``JSONLinesWriter``. The
+    formatter has to format them as JSON, like ``JSONFormatter``.
+    """
+
+    def __init__(self, writer):
+        """
+        :param writer: The ``JSONLinesWriter`` to write the records with.
+        """
+        super().__init__()
+        self.writer = writer
+
+    def emit(self, record):
+        self.writer.write_line(self.format(record))
+
+
 class JSONFormatter(logging.Formatter):
     """
     JSON formatter for python logging.
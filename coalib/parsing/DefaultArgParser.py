@@ -174,6 +174,10 @@ To run coala without user interaction, run the `coala --non-interactive`,
         '--limit-files', type=PathArg, nargs='+', metavar='FILE',
         help="filter the `--files` argument's matches further")
 
+    inputs_group.add_argument(
+        '--use-gitignore', const=True, action='store_const',
+        help='ignore the files git ignores as well')
+
     inputs_group.add_argument(
         '-d', '--bear-dirs', type=PathArg, nargs='+', metavar='DIR',
         help='additional directories which may contain bears')
@@ -236,6 +240,12 @@ To run coala without user interaction, run the `coala --non-interactive`,
         help='output logs as json along with results'
              ' (must be called with --json)')
 
+    outputs_group.add_argument(
+        '--ndjson', const=True, action='store_const',
+        help='write every result, and every log with `--log-json`, as a json'
+             ' object on its own line as soon as it is available'
+             ' (must be called with --json)')
+
     outputs_group.add_argument(
         '-o', '--output', type=PathArg, nargs=1, metavar='FILE',
         help='write results to the given file (must be called with --json)')
@@ -279,6 +289,11 @@ To run coala without user interaction, run the `coala --non-interactive`,
         '-j', '--jobs', type=int,
         help='number of jobs to use in parallel')
 
+    misc_group.add_argument(
+        '--concurrent-sections', const=True, action='store_const',
+        help='run independent sections at the same time on one set of '
+             'processes')
+
     misc_group.add_argument(
         '-n', '--no-orig', const=True, action='store_const',
         help="don't create .orig backup files before patching")
@@ -3,7 +3,7 @@ import platform
 import re
 from functools import lru_cache
 
-from coala_utils.decorators import yield_once
+from coalib.misc.IterUtilities import yield_once
 from coalib.misc.Constants import GLOBBING_SPECIAL_CHARS
 
 
@@ -158,6 +158,14 @@ def translate(pattern):
     :param pattern: Glob pattern with wildcards
     :return:        Regular expression with the same meaning
     """
+    return '(?ms)' + _translate(pattern) + '\\Z'
+
+
+def _translate(pattern):
+    """
+    Translates a pattern into a regular expression without flags, which
+    matches the beginning of a string only.
+    """
     index, length = 0, len(pattern)
     regex = ''
     while index < length:
@@ -191,7 +199,7 @@ def translate(pattern):
                 regex += '[' + sequence + ']'
         else:
             regex = regex + re.escape(char)
-    return '(?ms)' + regex + '\\Z'
+    return regex
 
 
 def fnmatch(name, globs):
@@ -223,75 +231,193 @@ def fnmatch(name, globs):
     if len(globs) == 0:
         return True
 
-    name = os.path.normcase(name)
-
-    return any(compiled_pattern.match(name)
-               for glob in globs
-               for compiled_pattern in _compile_pattern(glob))
+    return _get_glob_set(globs).match(name) is not None
+
+
+class GlobSet:
+    """
+    Many globs compiled at once, so a name is matched against all of them in
+    one go. It tells which glob matched, the first one given if there are
+    many:
+
+    >>> glob_set = GlobSet(['*.py', '(a|b).c', 'setup.cfg', 'a.*'])
+    >>> [glob_set.match(name) for name in ('a.py', 'b.c', 'setup.cfg', 'c.c')]
+    ['*.py', '(a|b).c', 'setup.cfg', None]
+
+    Globs without wildcards are looked up in a dictionary, the others are
+    joined into one regular expression. The syntax is the one of
+    ``fnmatch``.
+    """
+
+    def __init__(self, globs):
+        """
+        :param globs: A list of globs.
+        """
+        self.globs = tuple(globs)
+        # Maps the names matched by globs without wildcards to the index of
+        # the first glob matching them
+        self.names = {}
+        regexes = []
+        # The index of the glob of each group of the regular expression
+        self.group_globs = [None]
+        for index, glob in enumerate(self.globs):
+            for pattern in _iter_alternatives(glob):
+                pattern = os.path.normcase(os.path.expanduser(pattern))
+                if has_wildcard(pattern):
+                    regexes.append(f'({_translate(pattern)})\\Z')
+                    self.group_globs.append(index)
+                else:
+                    self.names.setdefault(pattern, index)
+
+        # Alternatives are tried in order, so the first matching glob wins
+        self.pattern = (re.compile('(?ms)' + '|'.join(regexes))
+                        if regexes else None)
+
+    def match(self, name):
+        """
+        :param name: A file or directory name.
+        :return:     The first of the globs matching the name, ``None`` if
+                     none does.
+        """
+        name = os.path.normcase(name)
+        index = self.names.get(name)
+        if self.pattern is not None and index != 0:
+            match = self.pattern.match(name)
+            if match is not None:
+                group_index = self.group_globs[match.lastindex]
+                if index is None or group_index < index:
+                    index = group_index
+
+        return None if index is None else self.globs[index]
+
+
+@lru_cache(maxsize=1024)
+def _get_glob_set(globs):
+    return GlobSet(globs)
 
 
 @lru_cache()
-def _compile_pattern(pattern):
-    return tuple(re.compile(translate(os.path.normcase(
-                     os.path.expanduser(pat))))
-                 for pat in _iter_alternatives(pattern))
+def compile_ignore_globs(globs):
+    """
+    Compiles globs of ignored files and directories into one regular
+    expression. It matches a path if one of the globs matches the path or a
+    directory it is in, so nothing in ignored directories has to be matched
+    on its own.
+
+    >>> pattern = compile_ignore_globs(('/a/vendor', '/a/**.pyc'))
+    >>> [bool(pattern.match(path)) for path in ('/a/vendor/b/c.py',
+    ...                                         '/a/vendor2/c.py',
+    ...                                         '/a/b/c.pyc',
+    ...                                         '/a/b/c.py')]
+    [True, False, True, False]
+
+    Globs ending with a separator match the paths in the directory:
+
+    >>> bool(compile_ignore_globs(('/a/vendor/',)).match('/a/vendor/b.py'))
+    True
+
+    :param globs: A tuple of globs. Empty ones are skipped.
+    :return:      A compiled regular expression to match the
+                  ``os.path.normcase`` of paths with, ``None`` if there are
+                  no globs.
+    """
+    regexes = [_translate(os.path.normcase(os.path.expanduser(pattern)))
+               for glob in globs if glob
+               for pattern in _iter_alternatives(glob)]
+    if not regexes:
+        return None
+
+    sep = re.escape(os.sep)
+    # After the part matched by a glob the path has to end, or it has to be
+    # in the matched directory.
+    return re.compile(f'(?ms)(?:{"|".join(regexes)})'
+                      f'(?:\\Z|(?<={sep})|{sep})')
 
 
-def _absolute_flat_glob(pattern):
+def _absolute_flat_glob(pattern, snapshot=None):
     """
     Glob function for a pattern that do not contain wildcards.
 
-    :pattern: File or directory path
-    :return:  Iterator that yields at most one valid file or dir name
+    :pattern:  File or directory path
+    :snapshot: The ``FileSystemSnapshot`` to look the path up in, the disk
+               is looked at if not given.
+    :return:   Iterator that yields at most one valid file or dir name
     """
     dirname, basename = os.path.split(pattern)
 
     if basename:
-        if os.path.exists(pattern):
+        if (os.path.exists if snapshot is None else snapshot.exists)(pattern):
             yield pattern
     else:
         # Patterns ending with a slash should match only directories.
-        if os.path.isdir(dirname):
+        if (os.path.isdir if snapshot is None else snapshot.isdir)(dirname):
             yield pattern
     return
 
 
-def _iter_relative_dirs(dirname):
+def _iter_relative_dirs(dirname, prune=None, pruned_dirname=None,
+                        snapshot=None):
     """
     Recursively iterates subdirectories of all levels from dirname
 
-    :param dirname: Directory name
-    :return:        Iterator that yields files and directory from the given dir
-                    and all it's (recursive) subdirectories
-    """
+    :param dirname:        Directory name
+    :param prune:          A function telling if a directory is skipped
+                           with everything in it. It's given the path of the
+                           directory joined to the given dirname, which may
+                           be empty.
+    :param pruned_dirname: The dirname to join for ``prune``, if it differs.
+    :param snapshot:       The ``FileSystemSnapshot`` to list the directories
+                           of, the disk is read if not given.
+    :return:               Iterator that yields files and directory from the
+                           given dir and all it's (recursive) subdirectories
+    """
+    if pruned_dirname is None:
+        pruned_dirname = dirname
     if not dirname:
         dirname = os.curdir
     try:
-        files_or_dirs = os.listdir(dirname)
+        if snapshot is None:
+            # Listing files fails below, which costs less than checking each
+            entries = [(name, True) for name in os.listdir(dirname)]
+        else:
+            entries = snapshot.list_entries(dirname)
     except os.error:
         return
-    for file_or_dir in files_or_dirs:
-        yield file_or_dir
+    for file_or_dir, may_be_dir in entries:
         path = os.path.join(dirname, file_or_dir)
-        for sub_file_or_dir in _iter_relative_dirs(path):
+        pruned_path = None
+        if prune is not None:
+            pruned_path = os.path.join(pruned_dirname, file_or_dir)
+            if prune(pruned_path):
+                continue
+        yield file_or_dir
+        if not may_be_dir:
+            continue
+        for sub_file_or_dir in _iter_relative_dirs(path, prune, pruned_path,
+                                                   snapshot):
             yield os.path.join(file_or_dir, sub_file_or_dir)
 
 
-def relative_wildcard_glob(dirname, pattern):
+def relative_wildcard_glob(dirname, pattern, prune=None, snapshot=None):
     """
     Non-recursive glob for one directory. Accepts wildcards.
 
-    :param dirname: Directory name
-    :param pattern: Glob pattern with wildcards
-    :return:        List of files in the dir of dirname that match the pattern
+    :param dirname:  Directory name
+    :param pattern:  Glob pattern with wildcards
+    :param prune:    A function telling if a directory is skipped if the
+                     pattern contains ``'**'``.
+    :param snapshot: The ``FileSystemSnapshot`` to list the directories of,
+                     the disk is read if not given.
+    :return:         List of files in the dir of dirname that match the
+                     pattern
     """
-    if not dirname:
-        dirname = os.curdir
     try:
         if '**' in pattern:
-            names = list(_iter_relative_dirs(dirname))
+            names = list(_iter_relative_dirs(dirname, prune,
+                                             snapshot=snapshot))
         else:
-            names = os.listdir(dirname)
+            names = (os.listdir if snapshot is None
+                     else snapshot.listdir)(dirname or os.curdir)
     except OSError:
         return []
     result = []
@@ -303,33 +429,41 @@ def relative_wildcard_glob(dirname, pattern):
     return result
 
 
-def relative_flat_glob(dirname, basename):
+def relative_flat_glob(dirname, basename, prune=None, snapshot=None):
     """
     Non-recursive glob for one directory. Does not accept wildcards.
 
     :param dirname:  Directory name
     :param basename: Basename of a file in dir of dirname
+    :param prune:    Unused, for the signature of the other glob functions.
+    :param snapshot: The ``FileSystemSnapshot`` to look the file up in, the
+                     disk is looked at if not given.
     :return:         List containing Basename if the file exists
     """
-    if os.path.exists(os.path.join(dirname, basename)):
+    if (os.path.exists if snapshot is None
+            else snapshot.exists)(os.path.join(dirname, basename)):
         return [basename]
     return []
 
 
-def relative_recursive_glob(dirname, pattern):
+def relative_recursive_glob(dirname, pattern, prune=None, snapshot=None):
     """
     Recursive Glob for one directory and all its (nested) subdirectories.
     Accepts only '**' as pattern.
 
-    :param dirname: Directory name
-    :param pattern: The recursive wildcard '**'
-    :return:        Iterator that yields all the (nested) subdirectories of the
-                    given dir
+    :param dirname:  Directory name
+    :param pattern:  The recursive wildcard '**'
+    :param prune:    A function telling if a directory is skipped.
+    :param snapshot: The ``FileSystemSnapshot`` to list the directories of,
+                     the disk is read if not given.
+    :return:         Iterator that yields all the (nested) subdirectories of
+                     the given dir
     """
     assert pattern == '**'
     if dirname:
         yield pattern[:0]
-    for relative_dir in _iter_relative_dirs(dirname):
+    for relative_dir in _iter_relative_dirs(dirname, prune,
+                                            snapshot=snapshot):
         yield relative_dir
 
 
@@ -347,10 +481,10 @@ def has_wildcard(pattern):
     return match is not None
 
 
-def _iglob(pattern):
+def _iglob(pattern, prune, snapshot):
     dirname, basename = os.path.split(pattern)
     if not has_wildcard(pattern):
-        for file in _absolute_flat_glob(pattern):
+        for file in _absolute_flat_glob(pattern, snapshot):
             yield file
         return
 
@@ -362,49 +496,62 @@ def _iglob(pattern):
         relative_glob_function = relative_flat_glob
 
     if not dirname:
-        for file in relative_glob_function(dirname, basename):
+        for file in relative_glob_function(dirname, basename, prune,
+                                           snapshot):
             yield file
         return
 
     # Prevent an infinite recursion if a drive or UNC path contains
     # wildcard characters (i.e. r'\\?\C:').
     if dirname != pattern and has_wildcard(dirname):
-        dirs = iglob(dirname)
+        dirs = iglob(dirname, prune, snapshot)
     else:
         dirs = [dirname]
 
     for dirname in dirs:
-        for name in relative_glob_function(dirname, basename):
+        for name in relative_glob_function(dirname, basename, prune,
+                                           snapshot):
             yield os.path.join(dirname, name)
 
 
 @yield_once
-def iglob(pattern):
+def iglob(pattern, prune=None, snapshot=None):
     """
     Iterates all filesystem paths that get matched by the glob pattern.
     Syntax is equal to that of fnmatch.
 
-    :param pattern: Glob pattern with wildcards
-    :return:        Iterator that yields all file names that match pattern
+    :param pattern:  Glob pattern with wildcards
+    :param prune:    A function telling if a directory is skipped with
+                     everything in it when looking for the matches of
+                     ``'**'``. It's given the path of the directory as it
+                     would be yielded.
+    :param snapshot: A ``FileSystemSnapshot`` to look the paths up in
+                     instead of the disk, so directories read before aren't
+                     read again.
+    :return:         Iterator that yields all file names that match pattern
     """
     for pat in _iter_alternatives(pattern):
         pat = os.path.expanduser(pat)
         pat = os.path.normcase(pat)
 
         if pat.endswith(os.sep):
-            for name in _iglob(pat):
+            for name in _iglob(pat, prune, snapshot):
                 yield name
         else:
-            for name in _iglob(pat):
+            for name in _iglob(pat, prune, snapshot):
                 yield name.rstrip(os.sep)
 
 
-def glob(pattern):
+def glob(pattern, prune=None, snapshot=None):
     """
     Iterates all filesystem paths that get matched by the glob pattern.
     Syntax is equal to that of fnmatch.
 
-    :param pattern: Glob pattern with wildcards
-    :return:        List of all file names that match pattern
+    :param pattern:  Glob pattern with wildcards
+    :param prune:    A function telling if a directory is skipped, see
+                     ``iglob``.
+    :param snapshot: A ``FileSystemSnapshot`` to look the paths up in, see
+                     ``iglob``.
+    :return:         List of all file names that match pattern
     """
-    return list(iglob(pattern))
+    return list(iglob(pattern, prune, snapshot))
@@ -1,9 +1,11 @@
 import queue
+import time
 import traceback
 
 from coalib.bears.BEAR_KIND import BEAR_KIND
 from coalib.bears.GlobalBear import GlobalBear
 from coalib.bears.LocalBear import LocalBear
+from coalib.io.FileDict import FileDict
 from coalib.misc import Constants
 from coalib.processes.communication.LogMessage import LOG_LEVEL, LogMessage
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
@@ -242,6 +244,10 @@ def run_global_bear(message_queue,
 
         return None
 
+    if isinstance(global_bear_instance.file_dict, FileDict):
+        # Files that can't be read are only left out once they are read
+        global_bear_instance.file_dict.load()
+
     kwargs = {'dependency_results': dependency_results,
               'debug': debug}
     return run_bear(message_queue,
@@ -257,7 +263,11 @@ def run_local_bears_on_file(message_queue,
                             local_result_dict,
                             control_queue,
                             filename,
-                            debug=False):
+                            debug=False,
+                            result_cache=None,
+                            result_key=None,
+                            timing_dict=None,
+                            result_filter=None):
     """
     This method runs a list of local bears on one file.
 
@@ -269,7 +279,7 @@ def run_local_bears_on_file(message_queue,
                               the timeout it returns queue Full exception.
     :param file_dict:         Dictionary that contains contents of files.
     :param local_bear_list:   List of local bears to run on file.
-    :param local_result_dict: A Manager.dict that will be used to store local
+    :param local_result_dict: A ResultDict that will be used to store local
                               bear results. A list of all local bear results
                               will be stored with the filename as key.
     :param control_queue:     If any result gets written to the result_dict a
@@ -278,6 +288,18 @@ def run_local_bears_on_file(message_queue,
                               name(for global results) or a file name to
                               indicate the result will be put to the queue.
     :param filename:          The name of file on which to run the bears.
+    :param result_cache:      An instance of ``misc.Caching.ResultCache``
+                              holding results of previous runs. Bears are
+                              only run if no results are stored for the
+                              current file contents and bear settings.
+    :param result_key:        The key to store the results with in the
+                              result_dict and to put to the control_queue.
+                              Defaults to the file name.
+    :param timing_dict:       A ResultDict to store the time in seconds each
+                              bear that was run needed with the same key as
+                              the results, or ``None`` to not measure it.
+    :param result_filter:     A ``ResultFilter`` dropping the results that
+                              won't be shown before they're sent.
     """
     if filename not in file_dict:
         send_msg(message_queue,
@@ -293,20 +315,51 @@ def run_local_bears_on_file(message_queue,
 
         return
 
+    try:
+        # Files are read only now, those that can't be read are left out
+        file_dict[filename]
+    except KeyError:
+        return
+
     local_result_list = []
+    timings = {}
     for bear_instance in local_bear_list:
-        result = run_local_bear(message_queue,
-                                timeout,
-                                local_result_list,
-                                file_dict,
-                                bear_instance,
-                                filename,
-                                debug=debug)
+        result = None
+        if result_cache is not None:
+            result = result_cache.get_results(filename,
+                                              file_dict[filename],
+                                              bear_instance)
+        if result is None:
+            start_time = time.perf_counter()
+            result = run_local_bear(message_queue,
+                                    timeout,
+                                    local_result_list,
+                                    file_dict,
+                                    bear_instance,
+                                    filename,
+                                    debug=debug)
+            if result is not None:
+                timings[bear_instance.name] = (time.perf_counter() -
+                                               start_time)
+                if result_cache is not None:
+                    result_cache.store_results(filename,
+                                               file_dict[filename],
+                                               bear_instance,
+                                               result)
         if result is not None:
             local_result_list.extend(result)
 
-    local_result_dict[filename] = local_result_list
-    control_queue.put((CONTROL_ELEMENT.LOCAL, filename))
+    if result_key is None:
+        result_key = filename
+    if timing_dict is not None:
+        timing_dict[result_key] = timings
+    if result_filter is not None:
+        local_result_list = result_filter.filter(local_result_list, file_dict)
+    # Diffs of files the parent has as well are sent without them
+    for result in local_result_list:
+        result.share_diffs(file_dict)
+    local_result_dict[result_key] = local_result_list
+    control_queue.put((CONTROL_ELEMENT.LOCAL, result_key))
 
 
 def get_global_dependency_results(global_result_dict, bear_instance):
@@ -336,43 +389,13 @@ def get_global_dependency_results(global_result_dict, bear_instance):
             return False
 
         dependency_results[depname] = global_result_dict[depname]
+        # Diffs are sent without their files, they're looked up here
+        for result in dependency_results[depname] or ():
+            result.resolve_diffs(bear_instance.file_dict)
 
     return dependency_results
 
 
-def get_next_global_bear(timeout,
-                         global_bear_queue,
-                         global_bear_list,
-                         global_result_dict):
-    """
-    Retrieves the next global bear.
-
-    :param timeout:            The queue blocks at most timeout seconds for a
-                               free slot to execute the put operation on. After
-                               the timeout it returns queue Full exception.
-    :param global_bear_queue:  queue (read, write) of indexes of global bear
-                               instances in the global_bear_list.
-    :param global_bear_list:   A list containing all global bears to be
-                               executed.
-    :param global_result_dict: A Manager.dict that will be used to store global
-                               results. The list of results of one global bear
-                               will be stored with the bear name as key.
-    :return:                   (bear, bearname, dependency_results)
-    """
-    dependency_results = False
-
-    while dependency_results is False:
-        bear_id = global_bear_queue.get(timeout=timeout)
-        bear = global_bear_list[bear_id]
-
-        dependency_results = (
-            get_global_dependency_results(global_result_dict, bear))
-        if dependency_results is False:
-            global_bear_queue.put(bear_id)
-
-    return bear, dependency_results
-
-
 def task_done(obj):
     """
     Invokes task_done if the given queue provides this operation. Otherwise
@@ -391,12 +414,17 @@ def run_local_bears(filename_queue,
                     local_bear_list,
                     local_result_dict,
                     control_queue,
-                    debug=False):
+                    debug=False,
+                    result_cache=None,
+                    timing_dict=None,
+                    result_filter=None):
     """
     Run local bears on all the files given.
 
-    :param filename_queue:    queue (read) of file names to check with
-                              local bears.
+    :param filename_queue:    queue (read) of file names to check with all
+                              local bears or of tuples of a file name and the
+                              indices of the local bears to run on it. Results
+                              are stored with the queue element as key.
     :param message_queue:     A queue that contains messages of type
                               errors/warnings/debug statements to be printed
                               in the Log.
@@ -405,7 +433,7 @@ def run_local_bears(filename_queue,
                               the timeout it returns queue Full exception.
     :param file_dict:         Dictionary that contains contents of files.
     :param local_bear_list:   List of local bears to run.
-    :param local_result_dict: A Manager.dict that will be used to store local
+    :param local_result_dict: A ResultDict that will be used to store local
                               bear results. A list of all local bear results
                               will be stored with the filename as key.
     :param control_queue:     If any result gets written to the result_dict a
@@ -413,32 +441,92 @@ def run_local_bears(filename_queue,
                               what kind of event happened) and either a bear
                               name(for global results) or a file name to
                               indicate the result will be put to the queue.
+    :param result_cache:      An instance of ``misc.Caching.ResultCache`` to
+                              replay results of unchanged files from.
+    :param timing_dict:       A ResultDict to store the time each bear needed
+                              for each queue element in, or ``None``.
+    :param result_filter:     A ``ResultFilter`` dropping the results that
+                              won't be shown before they're sent.
     """
     try:
         while True:
-            filename = filename_queue.get(timeout=timeout)
+            unit = filename_queue.get(timeout=timeout)
+            if isinstance(unit, tuple):
+                filename, bear_indices = unit
+                bears = [local_bear_list[index] for index in bear_indices]
+            else:
+                filename, bears = unit, local_bear_list
+
             run_local_bears_on_file(message_queue,
                                     timeout,
                                     file_dict,
-                                    local_bear_list,
+                                    bears,
                                     local_result_dict,
                                     control_queue,
                                     filename,
-                                    debug=debug)
+                                    debug=debug,
+                                    result_cache=result_cache,
+                                    result_key=unit,
+                                    timing_dict=timing_dict,
+                                    result_filter=result_filter)
             task_done(filename_queue)
     except queue.Empty:
         return
 
 
+def run_released_global_bear(message_queue,
+                             timeout,
+                             global_bear_instance,
+                             global_result_dict,
+                             control_queue,
+                             debug=False,
+                             result_filter=None):
+    """
+    Runs a global bear that was released to a process with the results of
+    its dependencies, stores its results and reports that it is done.
+
+    :param message_queue:        A queue that contains messages of type
+                                 errors/warnings/debug statements to be printed
+                                 in the Log.
+    :param timeout:              The queue blocks at most timeout seconds for a
+                                 free slot to execute the put operation on.
+                                 After the timeout it returns queue Full
+                                 exception.
+    :param global_bear_instance: Instance of GlobalBear to run.
+    :param global_result_dict:   The dictionary to take the dependency
+                                 results from and to store the results in.
+    :param control_queue:        The queue to report the bear done to.
+    :param result_filter:        A ``ResultFilter`` dropping the results that
+                                 won't be shown before they're stored.
+    """
+    bearname = global_bear_instance.__class__.__name__
+    dep_results = get_global_dependency_results(global_result_dict,
+                                                global_bear_instance)
+    result = run_global_bear(message_queue, timeout, global_bear_instance,
+                             dep_results, debug=debug)
+    if result and result_filter is not None:
+        result = result_filter.filter(result,
+                                      global_bear_instance.file_dict,
+                                      bearname)
+    for global_result in result or ():
+        global_result.share_diffs(global_bear_instance.file_dict)
+    # The control element is sent even without results so the bears
+    # depending on this one can be released.
+    global_result_dict[bearname] = result if result else None
+    control_queue.put((CONTROL_ELEMENT.GLOBAL, bearname))
+
+
 def run_global_bears(message_queue,
                      timeout,
                      global_bear_queue,
                      global_bear_list,
                      global_result_dict,
                      control_queue,
-                     debug=False):
+                     debug=False,
+                     wait=True,
+                     result_filter=None):
     """
-    Run all global bears.
+    Run the global bears released to the global_bear_queue.
 
     :param message_queue:      A queue that contains messages of type
                                errors/warnings/debug statements to be printed
@@ -447,7 +535,11 @@ def run_global_bears(message_queue,
                                free slot to execute the put operation on. After
                                the timeout it returns queue Full exception.
     :param global_bear_queue:  queue (read, write) of indexes of global bear
-                               instances in the global_bear_list.
+                               instances in the global_bear_list. A bear is
+                               only put there once the results of all its
+                               dependencies are in the global_result_dict.
+                               ``None`` signals that all global bears are done,
+                               it is put back for other processes to see it.
     :param global_bear_list:   list of global bear instances
     :param global_result_dict: A Manager.dict that will be used to store global
                                results. The list of results of one global bear
@@ -457,25 +549,35 @@ def run_global_bears(message_queue,
                                what kind of event happened) and either a bear
                                name(for global results) or a file name to
                                indicate the result will be put to the queue.
+    :param wait:               Whether to wait for further global bears to be
+                               released until all are done. Otherwise this
+                               returns as soon as no global bear is released
+                               within the timeout.
+    :param result_filter:      A ``ResultFilter`` dropping the results that
+                               won't be shown before they're stored.
+    :return:                   True if all global bears are done, False if no
+                               global bear was released within the timeout.
     """
-    try:
-        while True:
-            bear, dep_results = (
-                get_next_global_bear(timeout,
-                                     global_bear_queue,
-                                     global_bear_list,
-                                     global_result_dict))
-            bearname = bear.__class__.__name__
-            result = run_global_bear(message_queue, timeout, bear, dep_results,
-                                     debug=debug)
-            if result:
-                global_result_dict[bearname] = result
-                control_queue.put((CONTROL_ELEMENT.GLOBAL, bearname))
-            else:
-                global_result_dict[bearname] = None
+    while True:
+        try:
+            bear_id = global_bear_queue.get(timeout=None if wait else timeout)
+        except queue.Empty:
+            return False
+
+        if bear_id is None:
+            # Leave the signal for the other processes
+            global_bear_queue.put(None)
             task_done(global_bear_queue)
-    except queue.Empty:
-        return
+            return True
+
+        run_released_global_bear(message_queue,
+                                 timeout,
+                                 global_bear_list[bear_id],
+                                 global_result_dict,
+                                 control_queue,
+                                 debug=debug,
+                                 result_filter=result_filter)
+        task_done(global_bear_queue)
 
 
 def run(file_name_queue,
@@ -488,7 +590,10 @@ def run(file_name_queue,
         message_queue,
         control_queue,
         timeout=0,
-        debug=False):
+        debug=False,
+        result_cache=None,
+        timing_dict=None,
+        result_filter=None):
     """
     This is the method that is actually runs by processes.
 
@@ -508,14 +613,21 @@ def run(file_name_queue,
                                bears. Each invocation of the run method needs
                                one such queue which it checks with all the
                                local bears. The queue could be empty.
-                               (Repeat until queue empty.)
+                               (Repeat until queue empty.) Elements may also
+                               be tuples of a file name and the indices of
+                               the local bears to run on it, to distribute
+                               independent bears on one file over several
+                               processes.
     :param local_bear_list:    List of local bear instances.
     :param global_bear_list:   List of global bear instances.
     :param global_bear_queue:  queue (read, write) of indexes of global bear
-                               instances in the global_bear_list.
+                               instances in the global_bear_list. Bears are
+                               put there once their dependencies are done.
+                               ``None`` is put there once all global bears are
+                               done.
     :param file_dict:          dict of all files as {filename:file}, file as in
                                file.readlines().
-    :param local_result_dict:  A Manager.dict that will be used to store local
+    :param local_result_dict:  A ResultDict that will be used to store local
                                results. A list of all local results.
                                will be stored with the filename as key.
     :param global_result_dict: A Manager.dict that will be used to store global
@@ -537,8 +649,30 @@ def run(file_name_queue,
     :param timeout:            The queue blocks at most timeout seconds for a
                                free slot to execute the put operation on. After
                                the timeout it returns queue Full exception.
+    :param result_cache:       An instance of ``misc.Caching.ResultCache``
+                               holding local bear results of previous runs or
+                               ``None`` to run all local bears.
+    :param timing_dict:        A ResultDict that will be used to store the time
+                               in seconds each local bear needed, with the same
+                               keys as the local results. ``None`` disables
+                               measuring.
+    :param result_filter:      A ``ResultFilter`` dropping the results that
+                               won't be shown before they're sent, or
+                               ``None`` to send all results.
     """
     try:
+        # Global bears without dependencies are released right away. They
+        # usually take longest, so they're started before the local bears.
+        global_bears_done = run_global_bears(message_queue,
+                                             timeout,
+                                             global_bear_queue,
+                                             global_bear_list,
+                                             global_result_dict,
+                                             control_queue,
+                                             debug=debug,
+                                             wait=False,
+                                             result_filter=result_filter)
+
         run_local_bears(file_name_queue,
                         message_queue,
                         timeout,
@@ -546,16 +680,21 @@ def run(file_name_queue,
                         local_bear_list,
                         local_result_dict,
                         control_queue,
-                        debug=debug)
+                        debug=debug,
+                        result_cache=result_cache,
+                        timing_dict=timing_dict,
+                        result_filter=result_filter)
         control_queue.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
 
-        run_global_bears(message_queue,
-                         timeout,
-                         global_bear_queue,
-                         global_bear_list,
-                         global_result_dict,
-                         control_queue,
-                         debug=debug)
+        if not global_bears_done:
+            run_global_bears(message_queue,
+                             timeout,
+                             global_bear_queue,
+                             global_bear_list,
+                             global_result_dict,
+                             control_queue,
+                             debug=debug,
+                             result_filter=result_filter)
         control_queue.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
     except (OSError, KeyboardInterrupt):
         if debug:
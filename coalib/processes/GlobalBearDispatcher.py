@@ -0,0 +1,117 @@
+import logging
+
+
+class GlobalBearDispatcher:
+    """
+    Releases global bears to the processes running them as soon as all
+    bears they depend on are done. Processes block on the queue until a bear
+    is released, so they neither have to poll for bears whose dependencies
+    are still running nor put them back.
+
+    >>> from queue import Queue
+    >>> from coalib.bears.GlobalBear import GlobalBear
+    >>> from coalib.settings.Section import Section
+    >>> class ABear(GlobalBear): pass
+    >>> class BBear(GlobalBear): BEAR_DEPS = {ABear}
+    >>> section = Section('')
+    >>> bears = [BBear({}, section, Queue()), ABear({}, section, Queue())]
+    >>> global_bear_queue = Queue()
+    >>> dispatcher = GlobalBearDispatcher(bears, global_bear_queue)
+
+    Initially only the bears without dependencies are released:
+
+    >>> dispatcher.dispatch()
+    >>> list(global_bear_queue.queue)
+    [1]
+
+    Once a bear is done, the bears depending on it are released. When all
+    bears are done, ``None`` is put to the queue to stop the processes:
+
+    >>> dispatcher.finish('ABear')
+    >>> dispatcher.finish('BBear')
+    >>> list(global_bear_queue.queue)
+    [1, 0, None]
+    """
+
+    def __init__(self, global_bear_list, global_bear_queue, sequential=False):
+        """
+        :param global_bear_list:  The list of global bear instances.
+        :param global_bear_queue: The queue to put the indices of the released
+                                  bears in the global_bear_list to.
+        :param sequential:        Whether the released bears are run one after
+                                  another in the order they are released, as
+                                  in debug mode. Bears are then released right
+                                  after the bears they depend on, without
+                                  waiting for those to finish.
+        """
+        self.global_bear_list = global_bear_list
+        self.global_bear_queue = global_bear_queue
+        self.sequential = sequential
+
+        self.pending = list(range(len(global_bear_list)))
+        self.running = set()
+        self.done = set()
+        self.stopped = False
+
+    @staticmethod
+    def get_dependencies(bear):
+        # Invalid bears don't have any dependencies, they're rejected when
+        # being run.
+        return {dependency.__name__
+                for dependency in getattr(bear, 'BEAR_DEPS', ())}
+
+    def dispatch(self):
+        """
+        Releases all pending bears whose dependencies are done. Bears that
+        depend on bears which are not run at all are left out with a
+        warning. Once no bears are pending or running anymore, the processes
+        are stopped.
+        """
+        released = True
+        while released:
+            released = False
+            pending_names = {self.global_bear_list[index].__class__.__name__
+                             for index in self.pending}
+            for index in list(self.pending):
+                bear = self.global_bear_list[index]
+                name = bear.__class__.__name__
+                dependencies = self.get_dependencies(bear)
+                missing = (dependencies - self.done - self.running -
+                           pending_names)
+                if missing:
+                    logging.warning('{} cannot be run because it depends on '
+                                    '{} which is not run.'.format(
+                                        name, ', '.join(sorted(missing))))
+                    self.pending.remove(index)
+                    released = True
+                elif dependencies <= self.done:
+                    self.pending.remove(index)
+                    if self.sequential:
+                        self.done.add(name)
+                    else:
+                        self.running.add(name)
+                    self.global_bear_queue.put(index)
+                    released = True
+
+        if not self.pending and not self.running:
+            self.stop()
+
+    def finish(self, bearname):
+        """
+        Marks a global bear as done and releases the bears waiting for it.
+
+        :param bearname: The class name of the bear.
+        """
+        self.running.discard(bearname)
+        self.done.add(bearname)
+        self.dispatch()
+
+    def stop(self):
+        """
+        Tells the processes that no more global bears will be released. Does
+        nothing if that happened already.
+        """
+        if not self.stopped:
+            # Every process puts this back for the others when receiving it.
+            self.global_bear_queue.put(None)
+            self.stopped = True
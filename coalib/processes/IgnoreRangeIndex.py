@@ -0,0 +1,204 @@
+from bisect import bisect_right
+from itertools import accumulate
+import math
+
+from coala_utils.string_processing.StringConverter import StringConverter
+from coalib.parsing.Globbing import GlobSet
+from coalib.results.SourceRange import SourceRange
+
+
+def get_ignore_scope(line, keyword):
+    """
+    Retrieves the bears that are to be ignored defined in the given line.
+
+    :param line:    The line containing the ignore declaration.
+    :param keyword: The keyword that was found. Everything after the rightmost
+                    occurrence of it will be considered for the scope.
+    :return:        A list of lower cased bearnames or an empty list (-> "all")
+    """
+    toignore = line[line.rfind(keyword) + len(keyword):]
+    if toignore.startswith('all'):
+        return []
+    else:
+        return list(StringConverter(toignore, list_delimiters=', '))
+
+
+def yield_ignore_ranges(file_dict):
+    """
+    Yields tuples of affected bears and a SourceRange that shall be ignored for
+    those.
+
+    :param file_dict: The file dictionary.
+    """
+    for filename, file in file_dict.items():
+        start = None
+        bears = []
+        stop_ignoring = False
+
+        # Do not process raw files
+        if file is None:
+            continue
+
+        for line_number, line in enumerate(file, start=1):
+            # Before lowering all lines ever read, first look for the biggest
+            # common substring, case sensitive: I*gnor*e, start i*gnor*ing,
+            # N*oqa*.
+            if 'gnor' in line or 'oqa' in line:
+                line = line.lower()
+                if 'start ignoring ' in line:
+                    start = line_number
+                    bears = get_ignore_scope(line, 'start ignoring ')
+                elif 'stop ignoring' in line:
+                    stop_ignoring = True
+                    if start:
+                        yield (bears,
+                               SourceRange.from_values(
+                                   filename,
+                                   start,
+                                   1,
+                                   line_number,
+                                   len(file[line_number-1])))
+
+                else:
+                    for ignore_stmt in ['ignore ', 'noqa ', 'noqa']:
+                        if ignore_stmt in line:
+                            end_line = min(line_number + 1, len(file))
+                            yield (get_ignore_scope(line, ignore_stmt),
+                                   SourceRange.from_values(
+                                       filename,
+                                       line_number, 1,
+                                       end_line, len(file[end_line-1])))
+                            break
+
+        if stop_ignoring is False and start is not None:
+            yield (bears,
+                   SourceRange.from_values(filename,
+                                           start,
+                                           1,
+                                           len(file),
+                                           len(file[-1])))
+
+
+class IgnoreRangeIndex:
+    """
+    Holds the ranges in which results of some bears are ignored, as found by
+    ``yield_ignore_ranges``. The ranges are indexed per file and sorted by
+    their start lines, so a result is only compared to the few ranges that
+    may overlap it instead of all ranges of the project.
+
+    >>> from coalib.results.Result import Result
+    >>> from coalib.results.SourceRange import SourceRange
+    >>> index = IgnoreRangeIndex([
+    ...     (['pep8bear'], SourceRange.from_values('a.py', 3, 1, 4, 10)),
+    ...     ([], SourceRange.from_values('a.py', 10, 1, 11, 10))])
+    >>> index.ignores(Result.from_values('PEP8Bear', 'msg', 'a.py', 4))
+    True
+    >>> index.ignores(Result.from_values('PyLintBear', 'msg', 'a.py', 4))
+    False
+    >>> index.ignores(Result.from_values('PyLintBear', 'msg', 'a.py', 11))
+    True
+    >>> index.ignores(Result.from_values('PyLintBear', 'msg', 'b.py', 11))
+    False
+    """
+
+    def __init__(self, ignore_ranges=()):
+        """
+        :param ignore_ranges: Tuples of a list of lower cased bear names or
+                              globs and the ``SourceRange`` to ignore their
+                              results in. An empty list of bears stands for
+                              all bears.
+        """
+        # Maps file names to a list of ranges and the indices built from them
+        self.files = {}
+        self.matchers = {}
+        self.extend(ignore_ranges)
+
+    def extend(self, ignore_ranges):
+        """
+        Adds ranges to ignore results in, see ``__init__``.
+        """
+        for bears, range in ignore_ranges:
+            bears = tuple(bears)
+            if bears not in self.matchers:
+                self.matchers[bears] = GlobSet(bears)
+
+            filename = range.start.file
+            entries = self.files[filename][0] if filename in self.files else []
+            entries.append((range, bears))
+            # The index of the file is built again once it's needed
+            self.files[filename] = (entries, None)
+
+    def get_index(self, filename):
+        """
+        :param filename: The file to get the ranges of.
+        :return:         A tuple of the ranges of the file sorted by their
+                         start lines, their start lines and the highest end
+                         line of all ranges up to each of them.
+        """
+        entries, index = self.files[filename]
+        if index is None:
+            entries.sort(key=lambda entry: start_line(entry[0]))
+            index = (entries,
+                     [start_line(range) for range, _ in entries],
+                     list(accumulate((end_line(range) for range, _ in entries),
+                                     max)))
+            self.files[filename] = (entries, index)
+        return index
+
+    def matches(self, bears, origin):
+        """
+        :param bears:  The bears of a range, as given to ``extend``.
+        :param origin: The lower cased origin of a result, up to the first
+                       space.
+        :return:       Whether the results of the origin are ignored in the
+                       range.
+        """
+        if not bears:
+            return True
+
+        return self.matchers[bears].match(origin) is not None
+
+    def ignores(self, result):
+        """
+        Determines if the result has to be ignored, see
+        ``check_result_ignore``.
+
+        :param result: The result to check.
+        :return:       True if the result has to be ignored.
+        """
+        origin = result.origin.lower().split(' ')[0]
+        for affected_range in result.affected_code:
+            if affected_range.start.file not in self.files:
+                continue
+
+            entries, starts, max_ends = self.get_index(
+                affected_range.start.file)
+            # Only ranges starting before the affected code ends may overlap
+            # it. Of those, only the ones up to the last range reaching the
+            # start of the affected code need to be looked at.
+            first_line = start_line(affected_range)
+            position = bisect_right(starts, end_line(affected_range))
+            while position > 0 and max_ends[position - 1] >= first_line:
+                position -= 1
+                range, bears = entries[position]
+                if (range.overlaps(affected_range) and
+                        self.matches(bears, origin)):
+                    return True
+
+        return False
+
+
+def start_line(range):
+    """
+    :return: The start line of the range, ``-inf`` if it starts at the
+             beginning of the file.
+    """
+    return -math.inf if range.start.line is None else range.start.line
+
+
+def end_line(range):
+    """
+    :return: The end line of the range, ``inf`` if it ends at the end of the
+             file.
+    """
+    return math.inf if range.end.line is None else range.end.line
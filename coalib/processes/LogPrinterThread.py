@@ -17,13 +17,26 @@ class LogPrinterThread(threading.Thread):
         self.running = True
         self.message_queue = message_queue
 
+    @staticmethod
+    def log(elem):
+        if isinstance(elem, LogMessage):
+            logging.log(elem.log_level, elem.message)
+        else:
+            logging.info(elem)
+
     def run(self):
         while self.running:
             try:
-                elem = self.message_queue.get(timeout=0.1)
-                if isinstance(elem, LogMessage):
-                    logging.log(elem.log_level, elem.message)
-                else:
-                    logging.info(elem)
+                self.log(self.message_queue.get(timeout=0.1))
             except queue.Empty:
                 pass
+
+    def flush(self):
+        """
+        Outputs the messages left in the queue after the thread stopped.
+        """
+        while True:
+            try:
+                self.log(self.message_queue.get(timeout=0.1))
+            except queue.Empty:
+                return
@@ -0,0 +1,96 @@
+import copy
+import shutil
+from os.path import isfile
+
+from coala_utils.FileUtils import detect_encoding
+
+from coalib.misc.Exceptions import log_exception
+from coalib.results.result_actions.ApplyPatchAction import write_patched_file
+
+
+class PatchBatch:
+    """
+    Collects the patches auto-applied in a section, so each patched file is
+    written once when the section is done instead of once per patch.
+
+    The diffs of a file are merged into one diff in place as they're added,
+    which only takes as long as the added diffs are big. A diff conflicting
+    with the diffs added before raises a ``ConflictError`` right away, so the
+    result can still be shown to the user.
+
+    >>> from coalib.results.Diff import Diff
+    >>> from coalib.results.Result import Result
+    >>> batch = PatchBatch(no_orig=True)
+    >>> file_diff_dict = {}
+    >>> for line_nr in (1, 2):
+    ...     diff = Diff(['1\\n', '2\\n'])
+    ...     diff.modify_line(line_nr, 'x\\n')
+    ...     batch.add(Result('Bear', 'msg', diffs={'f': diff}), file_diff_dict)
+    >>> file_diff_dict['f'].modified
+    ['x\\n', 'x\\n']
+    """
+
+    def __init__(self, no_orig=False):
+        """
+        :param no_orig: Whether no ``.orig`` backups of the patched files are
+                        made.
+        """
+        self.no_orig = no_orig
+        # Maps the patched files to the names they have on the disk and their
+        # encodings, as found before they're written.
+        self.files = {}
+
+    def add(self, result, file_diff_dict):
+        """
+        Adds the diffs of a result to the diffs of the files they patch. The
+        files are backed up when they're patched first.
+
+        :param result:         The result to apply the diffs of.
+        :param file_diff_dict: A dictionary of the files and their diffs. It
+                               is altered in place, the diffs of the result
+                               aren't.
+        :raises ConflictError: If a diff conflicts with the diffs of its file.
+                               Diffs of other files of the result may already
+                               be added.
+        """
+        for filename, diff in result.diffs.items():
+            if filename not in self.files:
+                pre_patch_filename = filename
+                if filename in file_diff_dict:
+                    previous_diff = file_diff_dict[filename]
+                    if previous_diff.rename is not False:
+                        pre_patch_filename = previous_diff.rename
+                    # The diffs are merged in place, the previous diff may be
+                    # the one of a result.
+                    file_diff_dict[filename] = copy.deepcopy(previous_diff)
+                elif not self.no_orig and isfile(filename):
+                    shutil.copy2(filename, filename + '.orig')
+
+                self.files[filename] = (
+                    pre_patch_filename,
+                    detect_encoding(pre_patch_filename)
+                    if isfile(pre_patch_filename) else None)
+
+            if filename in file_diff_dict:
+                file_diff_dict[filename].merge(diff)
+            else:
+                file_diff_dict[filename] = copy.deepcopy(diff)
+
+    def write(self, file_diff_dict):
+        """
+        Writes the files patched since the last call, each one at once. Files
+        that can't be written are logged and left out.
+
+        :param file_diff_dict: A dictionary of the files and their diffs.
+        """
+        for filename, (pre_patch_filename, encoding) in self.files.items():
+            try:
+                write_patched_file(filename,
+                                   pre_patch_filename,
+                                   file_diff_dict[filename],
+                                   encoding)
+            except OSError as exception:
+                log_exception(f'Failed to write the patched file '
+                              f'{filename!r}.',
+                              exception)
+        self.files.clear()
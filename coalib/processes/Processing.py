@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from itertools import chain
 import logging
 import os
@@ -5,14 +6,20 @@ import platform
 import queue
 import subprocess
 
-from coala_utils.string_processing.StringConverter import StringConverter
-
 from coalib.collecting.Collectors import collect_files
+from coalib.collecting.FileSystemSnapshot import FileSystemSnapshot
 from coalib.misc.Exceptions import log_exception
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
 from coalib.processes.BearRunning import run
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.GlobalBearDispatcher import GlobalBearDispatcher
+from coalib.processes.IgnoreRangeIndex import (
+    IgnoreRangeIndex, yield_ignore_ranges)
+from coalib.processes.PatchBatch import PatchBatch
+from coalib.processes.communication.ResultDict import ResultDict
 from coalib.processes.LogPrinterThread import LogPrinterThread
+from coalib.processes.ResultFilter import ResultFilter
+from coalib.processes.WorkerPool import WorkerPool
 from coalib.results.Result import Result
 from coalib.results.result_actions.DoNothingAction import DoNothingAction
 from coalib.results.result_actions.ApplyPatchAction import ApplyPatchAction
@@ -25,12 +32,22 @@ from coalib.results.result_actions.PrintDebugMessageAction import (
     PrintDebugMessageAction)
 from coalib.results.result_actions.ShowPatchAction import ShowPatchAction
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
-from coalib.results.SourceRange import SourceRange
 from coalib.settings.Setting import glob_list, typed_list
-from coalib.parsing.Globbing import fnmatch
+from coalib.parsing.Globbing import GlobSet
 from coalib.io.FileProxy import FileDictGenerator
 from coalib.io.File import File
+from coalib.io.FileDict import FileDict
+
+
+#: How many bytes of a file every line counts as additionally when estimating
+#: how much work analyzing the file is.
+LINE_WEIGHT = 32
 
+#: Names of actions that don't modify any files when applied.
+READ_ONLY_ACTIONS = {'DoNothingAction',
+                     'PrintDebugMessageAction',
+                     'ShowAppliedPatchesAction',
+                     'ShowPatchAction'}
 
 ACTIONS = [DoNothingAction(),
            ApplyPatchAction(),
@@ -57,6 +74,217 @@ def fill_queue(queue_fill, any_list):
         queue_fill.put(elem)
 
 
+def get_local_bear_groups(local_bear_list):
+    """
+    Partitions local bears into groups of bears that depend on each other.
+    Bears of different groups can be run on the same file independently.
+
+    >>> from coalib.bears.LocalBear import LocalBear
+    >>> class ABear(LocalBear): pass
+    >>> class BBear(LocalBear): BEAR_DEPS = {ABear}
+    >>> class CBear(LocalBear): pass
+    >>> get_local_bear_groups([ABear, CBear, BBear])
+    [(0, 2), (1,)]
+
+    :param local_bear_list: List of local bears (or instances of those).
+                            Dependencies are expected to be listed before
+                            the bears depending on them.
+    :return:                A list of tuples containing the indices of the
+                            bears of each group in the order they have to
+                            be run.
+    """
+    names = [bear.name for bear in local_bear_list]
+    group_of = list(range(len(local_bear_list)))
+
+    def find(index):
+        while group_of[index] != index:
+            index = group_of[index]
+        return index
+
+    for index, bear in enumerate(local_bear_list):
+        for dependency in bear.BEAR_DEPS:
+            if dependency.__name__ in names:
+                dependency_group = find(names.index(dependency.__name__))
+                group_of[find(index)] = dependency_group
+
+    groups = OrderedDict()
+    for index in range(len(local_bear_list)):
+        groups.setdefault(find(index), []).append(index)
+
+    return [tuple(group) for group in groups.values()]
+
+
+def merge_local_results(local_result_dict):
+    """
+    Merges local results that were stored per group of bears into one list
+    of results per file.
+
+    :param local_result_dict: A dictionary with file names or tuples of a
+                              file name and the indices of the bears as keys
+                              and lists of results as values.
+    :return:                  A dictionary with file names as keys and the
+                              lists of results of all bears as values.
+    """
+    def unit(key):
+        return key if isinstance(key, tuple) else (key, ())
+
+    merged = OrderedDict()
+    for key in sorted(local_result_dict.keys(), key=unit):
+        filename = unit(key)[0]
+        merged.setdefault(filename, []).extend(local_result_dict[key] or [])
+
+    return merged
+
+
+def estimate_file_size(filename, lines=None):
+    """
+    Estimates how much work analyzing the given file is by its size on disk.
+    Many bears do some work per line, so every line counts as much as
+    ``LINE_WEIGHT`` bytes additionally if the lines of the file are given.
+
+    :param filename: The name of the file.
+    :param lines:    The lines of the file or ``None`` if they are unknown,
+                     e.g. for raw files.
+    :return:         The estimated size of the file or 0 if it can't be
+                     accessed.
+    """
+    try:
+        size = os.path.getsize(filename)
+    except OSError:
+        return 0
+
+    return size + (LINE_WEIGHT * len(lines) if lines is not None else 0)
+
+
+def get_file_lines(file_dict, filename):
+    """
+    Gets the lines of a file for estimating its size.
+
+    :param file_dict: A dictionary containing the contents of the files.
+    :param filename:  The name of the file.
+    :return:          The lines of the file or ``None`` if the file dict
+                      doesn't contain them.
+    """
+    try:
+        return file_dict[filename]
+    except KeyError:
+        return None
+
+
+def estimate_unit_costs(units, file_dict, local_bear_list, timings=None):
+    """
+    Estimates how long running the given units of local work takes.
+
+    A bear that analyzed a file in a previous run is expected to need the
+    same time again, scaled by the change of the file size. Other files are
+    estimated by the average time per size the bear needed for all files it
+    analyzed before. Without any timings the size of the files is used.
+
+    :param units:           Tuples of a file name and the indices of the
+                            local bears to run on the file.
+    :param file_dict:       A dictionary containing the contents of the files.
+    :param local_bear_list: The list of local bears the indices refer to.
+    :param timings:         A dictionary mapping file names to dictionaries
+                            mapping bear names to a tuple of the time the
+                            bear needed and the estimated file size at that
+                            time, as recorded by ``FileCache.record_timings``.
+    :return:                A dictionary with the units as keys and the
+                            estimated costs as values.
+    """
+    timings = timings or {}
+
+    totals = {}
+    for file_timings in timings.values():
+        for bear, (seconds, size) in file_timings.items():
+            total_seconds, total_size = totals.get(bear, (0, 0))
+            totals[bear] = (total_seconds + seconds, total_size + size)
+    rates = {bear: seconds / size
+             for bear, (seconds, size) in totals.items()
+             if size}
+    default_rate = sum(rates.values()) / len(rates) if rates else 1
+
+    costs = {}
+    for unit in units:
+        filename, bear_indices = unit
+        size = estimate_file_size(filename,
+                                  get_file_lines(file_dict, filename))
+        file_timings = timings.get(filename, {})
+        cost = 0
+        for index in bear_indices:
+            bear = local_bear_list[index].name
+            if bear in file_timings:
+                seconds, old_size = file_timings[bear]
+                cost += seconds * size / old_size if old_size else seconds
+            else:
+                cost += rates.get(bear, default_rate) * size
+        costs[unit] = cost
+
+    return costs
+
+
+def order_units(units, costs, local_bear_list, job_count):
+    """
+    Orders the units of local work by their estimated costs, longest first.
+    Processes take the next unit from a shared queue whenever they are done,
+    so this keeps a large file from being started last and stretching the
+    run.
+
+    :param units:           Tuples of a file name and the indices of the
+                            local bears to run on the file.
+    :param costs:           A dictionary with the estimated costs of the
+                            units.
+    :param local_bear_list: The list of local bears the indices refer to.
+    :param job_count:       The number of processes that will run the units.
+    :return:                The ordered list of units.
+    """
+    ordered = sorted(units, key=costs.get, reverse=True)
+
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        loads = [0] * max(job_count, 1)
+        for unit in ordered:
+            loads[loads.index(min(loads))] += costs[unit]
+
+        logging.debug(
+            'Local bears will process the files in this order (estimated '
+            'costs, expected makespan {:.3f} for {} processes):\n'.format(
+                max(loads), len(loads)) +
+            '\n'.join('{:.3f} {} ({})'.format(
+                costs[unit], unit[0],
+                ', '.join(local_bear_list[index].name for index in unit[1]))
+                for unit in ordered))
+
+    return ordered
+
+
+def record_timings(cache, timing_dict, local_result_dict, file_dict):
+    """
+    Records the time the local bears needed for every unit of work that
+    yielded results in the cache.
+
+    :param cache:             The ``FileCache`` to record the timings in.
+    :param timing_dict:       A ResultDict holding the timings of the units or
+                              ``None`` if nothing was measured.
+    :param local_result_dict: The local results with the units as keys.
+    :param file_dict:         A dictionary containing the contents of the
+                              analyzed files.
+    """
+    if timing_dict is None:
+        return
+
+    for key in local_result_dict.keys():
+        try:
+            timings = timing_dict[key]
+        except KeyError:  # pragma: no cover
+            # The process sending the timings died
+            continue
+        filename = key[0] if isinstance(key, tuple) else key
+        cache.record_timings(filename,
+                             timings,
+                             estimate_file_size(
+                                 filename,
+                                 get_file_lines(file_dict, filename)))
+
+
 def get_running_processes(processes):
     return sum((1 if process.is_alive() else 0) for process in processes)
 
@@ -110,7 +338,8 @@ def autoapply_actions(results,
                       file_dict,
                       file_diff_dict,
                       section,
-                      log_printer=None):
+                      log_printer=None,
+                      patch_batch=None):
     """
     Auto-applies actions like defined in the given section.
 
@@ -121,14 +350,19 @@ def autoapply_actions(results,
                            diff objects as values.
     :param section:        The section.
     :param log_printer:    A log printer instance to log messages on.
+    :param patch_batch:    A ``PatchBatch`` to add the patches applied with
+                           ``ApplyPatchAction`` to. They're written to the
+                           files once the batch is written then. Without a
+                           batch, each patch is written right away.
     :return:               A list of unprocessed results.
     """
     bear_actions = []
     for result in results:
         bear_actions += result.actions
-    default_actions, invalid_actions = get_default_actions(section,
+    settings = section.resolve()
+    default_actions, invalid_actions = get_default_actions(settings,
                                                            bear_actions)
-    no_autoapply_warn = bool(section.get('no_autoapply_warn', False))
+    no_autoapply_warn = bool(settings.get('no_autoapply_warn', False))
     for bearname, actionname in invalid_actions.items():
         logging.warning(f'Selected default action {actionname!r} '
                         f'for bear {bearname!r} does not '
@@ -138,19 +372,18 @@ def autoapply_actions(results,
         # There's nothing to auto-apply.
         return results
 
+    bear_globs = GlobSet(default_actions)
     not_processed_results = []
     for result in results:
         try:
             # Match full bear names deterministically, prioritized!
             action = default_actions[result.origin]
         except KeyError:
-            for bear_glob in default_actions:
-                if fnmatch(result.origin, bear_glob):
-                    action = default_actions[bear_glob]
-                    break
-            else:
+            bear_glob = bear_globs.match(result.origin)
+            if bear_glob is None:
                 not_processed_results.append(result)
                 continue
+            action = default_actions[bear_glob]
         if action not in bear_actions or action in result.actions:
             applicable = action.is_applicable(result, file_dict, file_diff_dict)
             if applicable is not True:
@@ -160,10 +393,14 @@ def autoapply_actions(results,
                 continue
 
             try:
-                action.apply_from_section(result,
-                                          file_dict,
-                                          file_diff_dict,
-                                          section)
+                if (patch_batch is not None and
+                        type(action) is ApplyPatchAction):
+                    patch_batch.add(result, file_diff_dict)
+                else:
+                    action.apply_from_section(result,
+                                              file_dict,
+                                              file_diff_dict,
+                                              section)
                 logging.info(
                     f'Applied {action.get_metadata().name!r} on '
                     f'{result.location_repr()} from {result.origin!r}.')
@@ -197,15 +434,26 @@ def check_result_ignore(result, ignore_ranges):
                           ignore. If any of the bearname lists is empty, it
                           is considered an ignore range for all bears.
                           This may be a list of globbed bear wildcards.
+                          Checking many results is faster with an
+                          ``IgnoreRangeIndex`` of the tuples instead.
     :return:              True if the result has to be ignored.
     """
-    for bears, range in ignore_ranges:
-        orig = result.origin.lower().split(' ')[0]
-        if (result.overlaps(range) and
-                (len(bears) == 0 or orig in bears or fnmatch(orig, bears))):
-            return True
+    if not isinstance(ignore_ranges, IgnoreRangeIndex):
+        ignore_ranges = IgnoreRangeIndex(ignore_ranges)
+
+    return ignore_ranges.ignores(result)
 
-    return False
+
+def get_min_severity(section):
+    """
+    :param section: The section to get the setting from.
+    :return:        The minimum severity of the results to show, as set by
+                    ``min_severity`` in the section.
+    """
+    min_severity_str = str(
+        section.resolve().get('min_severity', 'INFO')).upper()
+    return RESULT_SEVERITY.str_dict.get(min_severity_str,
+                                        RESULT_SEVERITY.INFO)
 
 
 def print_result(results,
@@ -217,7 +465,8 @@ def print_result(results,
                  file_diff_dict,
                  ignore_ranges,
                  console_printer,
-                 apply_single=False):
+                 apply_single=False,
+                 patch_batch=None):
     """
     Takes the results produced by each bear and gives them to the print_results
     method to present to the user.
@@ -233,16 +482,21 @@ def print_result(results,
                            to the output medium.
     :param file_diff_dict: A dictionary that contains filenames as keys and
                            diff objects as values.
-    :param ignore_ranges:  A list of SourceRanges. Results that affect code in
-                           any of those ranges will be ignored.
+    :param ignore_ranges:  An ``IgnoreRangeIndex`` or a list of tuples of
+                           bears and SourceRanges, see
+                           ``check_result_ignore``. Results that affect code
+                           in any of those ranges will be ignored.
     :param apply_single:   The action that should be applied for all results,
                            If it's not selected, has a value of False.
     :param console_printer: Object to print messages on the console.
+    :param patch_batch:    A ``PatchBatch`` to add auto-applied patches to,
+                           see ``autoapply_actions``.
     :return:               Returns False if any results were yielded. Else
                            True.
     """
-    min_severity_str = str(section.get('min_severity', 'INFO')).upper()
-    min_severity = RESULT_SEVERITY.str_dict.get(min_severity_str, 'INFO')
+    min_severity = get_min_severity(section)
+    if not isinstance(ignore_ranges, IgnoreRangeIndex):
+        ignore_ranges = IgnoreRangeIndex(ignore_ranges)
     results = list(filter(lambda result:
                           type(result) is Result and
                           result.severity >= min_severity and
@@ -252,7 +506,8 @@ def print_result(results,
     patched_results = autoapply_actions(results,
                                         file_dict,
                                         file_diff_dict,
-                                        section)
+                                        section,
+                                        patch_batch=patch_batch)
 
     print_results(None,
                   section,
@@ -266,34 +521,19 @@ def print_result(results,
 
 def get_file_dict(filename_list, log_printer=None, allow_raw_files=False):
     """
-    Reads all files into a dictionary.
+    Creates a dictionary of the files. The files are read once their contents
+    are accessed, see ``FileDict``.
 
     :param filename_list:   List of names of paths to files to get contents of.
     :param log_printer:     The logger which logs errors.
     :param allow_raw_files: Allow the usage of raw files (non text files),
                             disabled by default
-    :return:                Reads the content of each file into a dictionary
-                            with filenames as keys.
+    :return:                A ``FileDict`` with filenames as keys.
     """
-    file_dict = FileDict()
+    file_dict = FileDict(allow_raw_files=allow_raw_files)
     for filename in filename_list:
         try:
             file_dict[filename] = File(filename)
-            # This is a workaround to purposely raise a
-            # ``UnicodeDecodeError`` to move into the
-            # except clause.
-            File(filename).string
-        except UnicodeDecodeError:
-            if allow_raw_files:
-                file_dict[filename] = None
-                continue
-            else:
-                # In case raw files are not allowed the
-                # ``File`` object created for it
-                # needs to be evicted from the dictionary.
-                del file_dict[filename]
-            logging.warning(f"Failed to read file '{filename}'. It seems to "
-                            'contain non-unicode characters. Leaving it out.')
         except OSError as exception:
             log_exception(f"Failed to read file '{filename}' because of an "
                           'unknown error. Leaving it out.',
@@ -349,6 +589,35 @@ def instantiate_bears(section,
     return instantiated_local_bear_list, instantiated_global_bear_list
 
 
+def collect_section_files(section, snapshot=None):
+    """
+    Collects the files to analyze in the given section.
+
+    :param section:  The section to collect the files for.
+    :param snapshot: A ``FileSystemSnapshot`` to collect the files from,
+                     the disk is read if not given.
+    :return:         A list of file paths.
+    """
+    return collect_files(
+        glob_list(section.get('files', '')),
+        None,
+        ignored_file_paths=glob_list(section.get('ignore', '')),
+        limit_file_paths=glob_list(section.get('limit_files', '')),
+        section_name=section.name,
+        snapshot=snapshot,
+        use_gitignore=bool(section.get('use_gitignore', False)))
+
+
+def get_global_dependencies(global_bear_list):
+    """
+    :param global_bear_list: A list of global bears.
+    :return:                 The names of the bears the given bears depend on.
+    """
+    return {dependency.__name__
+            for bear in global_bear_list
+            for dependency in getattr(bear, 'BEAR_DEPS', ())}
+
+
 def instantiate_processes(section,
                           local_bear_list,
                           global_bear_list,
@@ -358,7 +627,10 @@ def instantiate_processes(section,
                           console_printer,
                           debug=False,
                           use_raw_files=False,
-                          debug_bears=False):
+                          debug_bears=False,
+                          filename_list=None,
+                          job=None,
+                          snapshot=None):
     """
     Instantiate the number of processes that will run bears which will be
     responsible for running bears in a multiprocessing environment.
@@ -375,16 +647,23 @@ def instantiate_processes(section,
                              for bears, not catching any exceptions on running
                              them.
     :param use_raw_files:    Allow the usage of raw files (non text files)
+    :param filename_list:    The files of the section if they were collected
+                             already.
+    :param job:              A ``WorkerPoolJob`` to add the section to.
+                             Instead of creating new processes and queues,
+                             the section is then run by the processes of the
+                             job, see ``WorkerPoolJob.start``.
+    :param snapshot:         The ``FileSystemSnapshot`` to collect the files
+                             from if they weren't collected already.
     :return:                 A tuple containing a list of processes,
                              and the arguments passed to each process which are
-                             the same for each object.
+                             the same for each object. No processes are
+                             returned if a job is given.
     """
-    filename_list = collect_files(
-        glob_list(section.get('files', '')),
-        None,
-        ignored_file_paths=glob_list(section.get('ignore', '')),
-        limit_file_paths=glob_list(section.get('limit_files', '')),
-        section_name=section.name)
+    if filename_list is None:
+        if snapshot is None and cache is not None:
+            snapshot = cache.get_snapshot()
+        filename_list = collect_section_files(section, snapshot)
 
     # This stores all matched files irrespective of whether coala is run
     # only on changed files or not. Global bears require all the files
@@ -397,20 +676,33 @@ def instantiate_processes(section,
     complete_file_dict = file_dict_generator(complete_filename_list,
                                              allow_raw_files=use_raw_files)
 
-    logging.debug('Files that will be checked:\n' +
-                  '\n'.join(complete_file_dict.keys()))
-
-    if debug or debug_bears:
-        from . import DebugProcessing as processing
+    # Timings are only measured if they can be kept for the next run.
+    timings = getattr(cache, 'timings', None)
+    if job is not None:
+        # The contents of the files are shared with the processes, which
+        # don't read the files again.
+        queues = job.add_section(
+            global_bears=bool(global_bear_list),
+            timings=timings is not None,
+            file_dict=complete_file_dict)
     else:
-        import multiprocessing as processing
-    manager = processing.Manager()
-    global_bear_queue = processing.Queue()
-    filename_queue = processing.Queue()
-    local_result_dict = manager.dict()
-    global_result_dict = manager.dict()
-    message_queue = processing.Queue()
-    control_queue = processing.Queue()
+        if debug or debug_bears:
+            from . import DebugProcessing as processing
+        else:
+            import multiprocessing as processing
+        manager = processing.Manager()
+        queues = {
+            'global_bear_queue': processing.Queue(),
+            'file_name_queue': processing.Queue(),
+            # Local results are sent straight to this process, global results
+            # need to be shared as global bears may depend on results from
+            # other processes.
+            'local_result_dict': ResultDict(processing.Queue()),
+            'global_result_dict': manager.dict(),
+            'timing_dict': (ResultDict(processing.Queue())
+                            if timings is not None else None),
+            'message_queue': processing.Queue(),
+            'control_queue': processing.Queue()}
 
     loaded_local_bears_count = len(local_bear_list)
     local_bear_list[:], global_bear_list[:] = instantiate_bears(
@@ -418,7 +710,7 @@ def instantiate_processes(section,
         local_bear_list,
         global_bear_list,
         complete_file_dict,
-        message_queue,
+        queues['message_queue'],
         console_printer=console_printer,
         debug=debug)
     loaded_valid_local_bears_count = len(local_bear_list)
@@ -426,117 +718,80 @@ def instantiate_processes(section,
     # the whole project is accessible to every bear. However, local bears are
     # run only for the changed files if caching is enabled.
 
+    result_cache = None
     # Start tracking all the files
     if cache and (loaded_valid_local_bears_count == loaded_local_bears_count
                   and not use_raw_files):
         cache.track_files(set(complete_filename_list))
-        changed_files = cache.get_uncached_files(
-            set(filename_list)) if cache else filename_list
+        result_cache = getattr(cache, 'result_cache', None)
+
+        if result_cache is None:
+            # Without a result cache the local bears should process only the
+            # changed files.
+            filename_list = cache.get_uncached_files(set(filename_list))
+            logging.debug("coala is run only on changed files, bears' log "
+                          'messages from previous runs may not appear. You '
+                          'may use the `--flush-cache` flag to see them.')
+        elif isinstance(complete_file_dict, FileDict):
+            # Files of a ``FileDict`` are loaded below, after the digests are
+            # computed, so results are looked up by them.
+            result_cache.add_digests(cache.get_digests(filename_list))
+
+    if isinstance(complete_file_dict, FileDict):
+        # The files are read at once, in parallel, after their digests were
+        # computed. Files that can't be read are left out.
+        complete_file_dict.load()
 
-        # If caching is enabled then the local bears should process only the
-        # changed files.
-        logging.debug("coala is run only on changed files, bears' log "
-                      'messages from previous runs may not appear. You may '
-                      'use the `--flush-cache` flag to see them.')
-        filename_list = changed_files
+    logging.debug('Files that will be checked:\n' +
+                  '\n'.join(complete_file_dict.keys()))
 
     # Note: the complete file dict is given as the file dict to bears and
     # the whole project is accessible to every bear. However, local bears are
     # run only for the changed files if caching is enabled.
-    file_dict = {filename: complete_file_dict[filename]
-                 for filename in filename_list
-                 if filename in complete_file_dict}
-
-    bear_runner_args = {'file_name_queue': filename_queue,
-                        'local_bear_list': local_bear_list,
-                        'global_bear_list': global_bear_list,
-                        'global_bear_queue': global_bear_queue,
-                        'file_dict': file_dict,
-                        'local_result_dict': local_result_dict,
-                        'global_result_dict': global_result_dict,
-                        'message_queue': message_queue,
-                        'control_queue': control_queue,
-                        'timeout': 0.1,
-                        'debug': debug}
-
-    fill_queue(filename_queue, file_dict.keys())
-    fill_queue(global_bear_queue, range(len(global_bear_list)))
-
-    return ([processing.Process(target=run, kwargs=bear_runner_args)
-             for i in range(job_count)],
-            bear_runner_args)
-
-
-def get_ignore_scope(line, keyword):
-    """
-    Retrieves the bears that are to be ignored defined in the given line.
-
-    :param line:    The line containing the ignore declaration.
-    :param keyword: The keyword that was found. Everything after the rightmost
-                    occurrence of it will be considered for the scope.
-    :return:        A list of lower cased bearnames or an empty list (-> "all")
-    """
-    toignore = line[line.rfind(keyword) + len(keyword):]
-    if toignore.startswith('all'):
-        return []
+    if isinstance(complete_file_dict, FileDict):
+        file_dict = complete_file_dict.subset(filename_list)
     else:
-        return list(StringConverter(toignore, list_delimiters=', '))
-
-
-def yield_ignore_ranges(file_dict):
-    """
-    Yields tuples of affected bears and a SourceRange that shall be ignored for
-    those.
-
-    :param file_dict: The file dictionary.
-    """
-    for filename, file in file_dict.items():
-        start = None
-        bears = []
-        stop_ignoring = False
-
-        # Do not process raw files
-        if file is None:
-            continue
-
-        for line_number, line in enumerate(file, start=1):
-            # Before lowering all lines ever read, first look for the biggest
-            # common substring, case sensitive: I*gnor*e, start i*gnor*ing,
-            # N*oqa*.
-            if 'gnor' in line or 'oqa' in line:
-                line = line.lower()
-                if 'start ignoring ' in line:
-                    start = line_number
-                    bears = get_ignore_scope(line, 'start ignoring ')
-                elif 'stop ignoring' in line:
-                    stop_ignoring = True
-                    if start:
-                        yield (bears,
-                               SourceRange.from_values(
-                                   filename,
-                                   start,
-                                   1,
-                                   line_number,
-                                   len(file[line_number-1])))
+        file_dict = {filename: complete_file_dict[filename]
+                     for filename in filename_list
+                     if filename in complete_file_dict}
+
+    bear_runner_args = dict(queues,
+                            local_bear_list=local_bear_list,
+                            global_bear_list=global_bear_list,
+                            file_dict=file_dict,
+                            timeout=0.1,
+                            debug=debug,
+                            result_cache=result_cache,
+                            result_filter=ResultFilter(
+                                get_min_severity(section),
+                                get_global_dependencies(global_bear_list)))
+
+    # Independent local bears are queued separately, so one file with several
+    # slow bears doesn't keep a single process busy while others are idle.
+    bear_groups = get_local_bear_groups(local_bear_list) or [()]
+    units = [(filename, group)
+             for filename in file_dict
+             for group in bear_groups]
+    costs = estimate_unit_costs(units, file_dict, local_bear_list, timings)
+    fill_queue(bear_runner_args['file_name_queue'],
+               order_units(units, costs, local_bear_list, job_count))
+
+    if job is not None:
+        return [], bear_runner_args
+
+    processes = [processing.Process(target=run, kwargs=bear_runner_args)
+                 for i in range(job_count)]
+    if not (debug or debug_bears):
+        # Once a process ended, everything it sent was received or is
+        # ready to be, results of processes that died aren't waited for.
+        workers = processes[:]
+        for result_dict in (queues['local_result_dict'],
+                            queues['timing_dict']):
+            if result_dict is not None:
+                result_dict.is_alive = lambda: all(process.is_alive()
+                                                   for process in workers)
 
-                else:
-                    for ignore_stmt in ['ignore ', 'noqa ', 'noqa']:
-                        if ignore_stmt in line:
-                            end_line = min(line_number + 1, len(file))
-                            yield (get_ignore_scope(line, ignore_stmt),
-                                   SourceRange.from_values(
-                                       filename,
-                                       line_number, 1,
-                                       end_line, len(file[end_line-1])))
-                            break
-
-        if stop_ignoring is False and start is not None:
-            yield (bears,
-                   SourceRange.from_values(filename,
-                                           start,
-                                           1,
-                                           len(file),
-                                           len(file[-1])))
+    return processes, bear_runner_args
 
 
 def get_file_list(results):
@@ -563,7 +818,9 @@ def process_queues(processes,
                    console_printer,
                    debug=False,
                    apply_single=False,
-                   debug_bears=False):
+                   debug_bears=False,
+                   global_bear_dispatcher=None,
+                   keep_results=True):
     """
     Iterate the control queue and send the results received to the print_result
     method so that they can be presented to the user.
@@ -592,6 +849,13 @@ def process_queues(processes,
     :param apply_single:       The action that should be applied for all
                                results. If it's not selected, has a value of
                                False.
+    :param global_bear_dispatcher:
+                               The ``GlobalBearDispatcher`` to notify when a
+                               global bear is done.
+    :param keep_results:       Whether the results are kept in the result
+                               dictionaries once they are printed. If not,
+                               they are replaced by empty lists, so they don't
+                               stay in memory until all sections are done.
     :return:                   Return True if all bears execute successfully and
                                Results were delivered to the user. Else False.
     """
@@ -603,8 +867,30 @@ def process_queues(processes,
     local_processes = len(processes)
     global_processes = len(processes)
     global_result_buffer = []
+    # The printed global results are only written back once all global bears
+    # are done, bears depending on them may read them until then.
+    printed_global_results = {}
     result_files = set()
-    ignore_ranges = list(yield_ignore_ranges(file_dict))
+    ignore_ranges = IgnoreRangeIndex()
+    # Auto-applied patches are written once all results are processed
+    patch_batch = PatchBatch(
+        no_orig=bool(section.resolve().get('no_orig', False)))
+
+    def add_result_files(results):
+        # Diffs are sent without their files, they're looked up here
+        for result in results:
+            result.resolve_diffs(file_dict)
+
+        # Only files with results are scanned for ignore comments, so no
+        # other files need to be read by this process.
+        new_files = get_file_list(results) - result_files
+        result_files.update(new_files)
+        for filename in new_files:
+            try:
+                file = file_dict[filename]
+            except KeyError:
+                continue
+            ignore_ranges.extend(yield_ignore_ranges({filename: file}))
 
     # One process is the logger thread (if not in debug mode)
     while local_processes > (1 if not (debug or debug_bears) else 0):
@@ -617,8 +903,13 @@ def process_queues(processes,
                 global_processes -= 1
             elif control_elem == CONTROL_ELEMENT.LOCAL:
                 assert local_processes != 0
-                result_files.update(get_file_list(local_result_dict[index]))
-                retval, res = print_result(local_result_dict[index],
+                try:
+                    results = local_result_dict[index]
+                except KeyError:  # pragma: no cover
+                    # The process sending the results died
+                    continue
+                add_result_files(results)
+                retval, res = print_result(results,
                                            file_dict,
                                            retval,
                                            print_results,
@@ -627,11 +918,13 @@ def process_queues(processes,
                                            file_diff_dict,
                                            ignore_ranges,
                                            console_printer=console_printer,
-                                           apply_single=apply_single
-                                           )
-                local_result_dict[index] = res
+                                           apply_single=apply_single,
+                                           patch_batch=patch_batch)
+                local_result_dict[index] = res if keep_results else []
             else:
                 assert control_elem == CONTROL_ELEMENT.GLOBAL
+                if global_bear_dispatcher is not None:
+                    global_bear_dispatcher.finish(index)
                 global_result_buffer.append(index)
         except queue.Empty:
             if get_running_processes(processes) < 2:  # pragma: no cover
@@ -641,7 +934,9 @@ def process_queues(processes,
 
     # Flush global result buffer
     for elem in global_result_buffer:
-        result_files.update(get_file_list(global_result_dict[elem]))
+        if not global_result_dict[elem]:
+            continue
+        add_result_files(global_result_dict[elem])
         retval, res = print_result(global_result_dict[elem],
                                    file_dict,
                                    retval,
@@ -651,8 +946,9 @@ def process_queues(processes,
                                    file_diff_dict,
                                    ignore_ranges,
                                    console_printer=console_printer,
-                                   apply_single=apply_single)
-        global_result_dict[elem] = res
+                                   apply_single=apply_single,
+                                   patch_batch=patch_batch)
+        printed_global_results[elem] = res if keep_results else []
 
     # One process is the logger thread
     while global_processes > 1:
@@ -660,7 +956,11 @@ def process_queues(processes,
             control_elem, index = control_queue.get(timeout=0.1)
 
             if control_elem == CONTROL_ELEMENT.GLOBAL:
-                result_files.update(get_file_list(global_result_dict[index]))
+                if global_bear_dispatcher is not None:
+                    global_bear_dispatcher.finish(index)
+                if not global_result_dict[index]:
+                    continue
+                add_result_files(global_result_dict[index])
                 retval, res = print_result(global_result_dict[index],
                                            file_dict,
                                            retval,
@@ -670,16 +970,26 @@ def process_queues(processes,
                                            file_diff_dict,
                                            ignore_ranges,
                                            console_printer,
-                                           apply_single)
-                global_result_dict[index] = res
+                                           apply_single,
+                                           patch_batch)
+                printed_global_results[index] = res if keep_results else []
             else:
                 assert control_elem == CONTROL_ELEMENT.GLOBAL_FINISHED
                 global_processes -= 1
         except queue.Empty:
-            if get_running_processes(processes) < 2:  # pragma: no cover
+            running_processes = get_running_processes(processes)
+            if running_processes < 2:  # pragma: no cover
                 # Recover silently, those branches are only
                 # nondeterministically covered.
                 break
+            if (global_bear_dispatcher is not None and
+                    running_processes < global_processes):  # pragma: no cover
+                # A process died, the bears waiting for its results would
+                # never be released.
+                global_bear_dispatcher.stop()
+
+    global_result_dict.update(printed_global_results)
+    patch_batch.write(file_diff_dict)
 
     if cache:
         cache.untrack_files(result_files)
@@ -714,6 +1024,62 @@ def simplify_section_result(section_result):
             results_for_section)
 
 
+def get_debug_bears(section):
+    """
+    Retrieves the bears to debug in the given section.
+
+    :param section: The section to retrieve the setting from.
+    :return:        A list of bear names or False if no bears are debugged.
+    """
+    if 'debug_bears' not in section or (
+            section['debug_bears'].value == 'False'):
+        return False
+
+    return typed_list(str)(section['debug_bears'])
+
+
+def get_job_count(section):
+    """
+    Retrieves the number of processes to run the bears of a section with.
+
+    :param section: The section to retrieve the ``jobs`` setting from.
+    :return:        The number of processes, the CPU count by default.
+    """
+    try:
+        return int(section['jobs'])
+    except ValueError:
+        logging.warning("Unable to convert setting 'jobs' into a number. "
+                        'Falling back to CPU count.')
+        return get_cpu_count()
+    except IndexError:
+        return get_cpu_count()
+
+
+def get_use_raw_files(bears):
+    """
+    Checks whether the given bears use raw files. Bears using raw files
+    can't be mixed with ones using text files.
+
+    :param bears: The bears of a section.
+    :return:      True if the bears use raw files, False if they use text
+                  files and None if they are mixed.
+    """
+    use_raw_files = set(bear.USE_RAW_FILES for bear in bears)
+
+    if len(use_raw_files) > 1:
+        logging.error("Bears that uses raw files can't be mixed with Bears "
+                      'that uses text files. Please move the following bears '
+                      'to their own section: ' +
+                      ', '.join(bear.name for bear in bears
+                                if not bear.USE_RAW_FILES))
+        return None
+
+    # use_raw_files is expected to be only one object.
+    # The if statement is to ensure this doesn't fail when
+    # it's running on an empty run
+    return use_raw_files.pop() if len(use_raw_files) > 0 else False
+
+
 def execute_section(section,
                     global_bear_list,
                     local_bear_list,
@@ -722,7 +1088,10 @@ def execute_section(section,
                     log_printer,
                     console_printer,
                     debug=False,
-                    apply_single=False):
+                    apply_single=False,
+                    worker_pool=None,
+                    keep_results=True,
+                    snapshot=None):
     # type: (object, object, object, object, object, object, object, object,
     # object) -> object
     """
@@ -752,45 +1121,30 @@ def execute_section(section,
                              not catching any exceptions.
     :param apply_single:     The action that should be applied for all results.
                              If it's not selected, has a value of False.
+    :param worker_pool:      A ``WorkerPool`` to run the bears on instead of
+                             new processes. It is not used in debug mode.
+    :param keep_results:     Whether the results are returned. If not, they
+                             are dropped once they are printed.
+    :param snapshot:         The ``FileSystemSnapshot`` to collect the files
+                             from, shared by the sections of a run.
     :return:                 Tuple containing a bool (True if results were
-                             yielded, False otherwise), a Manager.dict
+                             yielded, False otherwise), a dict
                              containing all local results(filenames are key)
                              and a Manager.dict containing all global bear
                              results (bear names are key) as well as the
                              file dictionary.
     """
-    debug_bears = (False
-                   if 'debug_bears' not in section or (
-                       section['debug_bears'].value == 'False') else
-                   typed_list(str)(section['debug_bears']))
+    debug_bears = get_debug_bears(section)
+    running_processes = (1 if debug or debug_bears else
+                         get_job_count(section))
 
-    if debug or debug_bears:
-        running_processes = 1
-    else:
-        try:
-            running_processes = int(section['jobs'])
-        except ValueError:
-            logging.warning("Unable to convert setting 'jobs' into a number. "
-                            'Falling back to CPU count.')
-            running_processes = get_cpu_count()
-        except IndexError:
-            running_processes = get_cpu_count()
-
-    bears = global_bear_list + local_bear_list
-    use_raw_files = set(bear.USE_RAW_FILES for bear in bears)
-
-    if len(use_raw_files) > 1:
-        logging.error("Bears that uses raw files can't be mixed with Bears "
-                      'that uses text files. Please move the following bears '
-                      'to their own section: ' +
-                      ', '.join(bear.name for bear in bears
-                                if not bear.USE_RAW_FILES))
+    use_raw_files = get_use_raw_files(global_bear_list + local_bear_list)
+    if use_raw_files is None:
         return ((), {}, {}, {})
 
-    # use_raw_files is expected to be only one object.
-    # The if statement is to ensure this doesn't fail when
-    # it's running on an empty run
-    use_raw_files = use_raw_files.pop() if len(use_raw_files) > 0 else False
+    job = None
+    if worker_pool is not None and not (debug or debug_bears):
+        job = worker_pool.create_job(running_processes)
 
     processes, arg_dict = instantiate_processes(section,
                                                 local_bear_list,
@@ -801,37 +1155,66 @@ def execute_section(section,
                                                 console_printer=console_printer,
                                                 debug=debug,
                                                 use_raw_files=use_raw_files,
-                                                debug_bears=debug_bears)
-
-    logger_thread = LogPrinterThread(arg_dict['message_queue'])
-    # Start and join the logger thread along with the processes to run bears
-    if not (debug or debug_bears):
-        # in debug mode the logging messages are directly processed by the
-        # message_queue
-        processes.append(logger_thread)
+                                                debug_bears=debug_bears,
+                                                job=job,
+                                                snapshot=snapshot)
+
+    global_bear_dispatcher = GlobalBearDispatcher(
+        arg_dict['global_bear_list'],
+        arg_dict['global_bear_queue'],
+        sequential=bool(debug or debug_bears))
+    global_bear_dispatcher.dispatch()
+
+    if job is not None:
+        job.start([arg_dict])
+        processes = job.processes + [worker_pool.logger_thread]
+    else:
+        logger_thread = LogPrinterThread(arg_dict['message_queue'])
+        # Start and join the logger thread along with the processes to run
+        # bears
+        if not (debug or debug_bears):
+            # in debug mode the logging messages are directly processed by the
+            # message_queue
+            processes.append(logger_thread)
 
-    for runner in processes:
-        runner.start()
+        for runner in processes:
+            runner.start()
 
     try:
-        return (process_queues(processes,
-                               arg_dict['control_queue'],
-                               arg_dict['local_result_dict'],
-                               arg_dict['global_result_dict'],
-                               arg_dict['file_dict'],
-                               print_results,
-                               section,
-                               cache,
-                               None,
-                               console_printer=console_printer,
-                               debug=debug,
-                               apply_single=apply_single,
-                               debug_bears=debug_bears),
-                arg_dict['local_result_dict'],
-                arg_dict['global_result_dict'],
+        yielded_results = process_queues(processes,
+                                         arg_dict['control_queue'],
+                                         arg_dict['local_result_dict'],
+                                         arg_dict['global_result_dict'],
+                                         arg_dict['file_dict'],
+                                         print_results,
+                                         section,
+                                         cache,
+                                         None,
+                                         console_printer=console_printer,
+                                         debug=debug,
+                                         apply_single=apply_single,
+                                         debug_bears=debug_bears,
+                                         global_bear_dispatcher=(
+                                             global_bear_dispatcher),
+                                         keep_results=keep_results)
+        record_timings(cache,
+                       arg_dict['timing_dict'],
+                       arg_dict['local_result_dict'],
+                       arg_dict['file_dict'])
+        global_result_dict = arg_dict['global_result_dict']
+        if job is not None:
+            # The shared dictionary is gone once the pool is closed
+            global_result_dict = dict(global_result_dict)
+        return (yielded_results,
+                merge_local_results(arg_dict['local_result_dict']),
+                global_result_dict,
                 arg_dict['file_dict'])
     finally:
-        if not (debug or debug_bears):
+        # Processes waiting for global bears would never terminate otherwise
+        global_bear_dispatcher.stop()
+        if job is not None:
+            job.close()
+        elif not (debug or debug_bears):
             # in debug mode multiprocessing and logger_thread are disabled
             # ==> no need for following actions
             logger_thread.running = False
@@ -840,16 +1223,216 @@ def execute_section(section,
                 runner.join()
 
 
-class FileDict(dict):
+def may_modify_files(section, interactive=False):
     """
-    Acts as a middleware to provide the bears with the
-    actual file contents instead of the `File`
-    objects.
+    Checks whether processing the results of a section may modify the
+    analyzed files.
+
+    :param section:     The section to check.
+    :param interactive: Whether the user may apply actions interactively.
+    :return:            True if actions that may modify files are applied
+                        automatically or the user may apply them.
     """
+    if interactive:
+        return True
+
+    actions, invalid_actions = get_default_actions(section, [])
+    # Actions defined by bears aren't known here
+    return bool(invalid_actions) or any(
+        action.get_metadata().name not in READ_ONLY_ACTIONS
+        for action in actions.values())
 
-    def __getitem__(self, key):
-        val = super().__getitem__(key)
-        if val is None:
-            return val
+
+def get_section_batches(sections, interactive=False, snapshot=None):
+    """
+    Splits sections into batches that can be executed together. A section
+    is executed together with the sections before it unless it shares files
+    with one of them while either of both may modify those files, as it has
+    to analyze the files after the patches were applied then.
+
+    :param sections:    A list of tuples of a section, its global bears and
+                        its local bears.
+    :param interactive: Whether the user may apply actions interactively.
+    :param snapshot:    The ``FileSystemSnapshot`` to collect the files of
+                        all sections from, a new one if not given.
+    :return:            A list of batches, each a list of tuples of a
+                        section, its global bears, its local bears and the
+                        files collected for it.
+    """
+    batches = []
+    batch_files = []
+    # The directories of all sections are read once
+    if snapshot is None:
+        snapshot = FileSystemSnapshot()
+    for section, global_bear_list, local_bear_list in sections:
+        filename_list = collect_section_files(section, snapshot)
+        files = (set(filename_list), may_modify_files(section, interactive))
+        independent = batches and not any(
+            files[0] & other_files and (files[1] or other_modifies)
+            for other_files, other_modifies in batch_files)
+
+        if independent:
+            batches[-1].append(
+                (section, global_bear_list, local_bear_list, filename_list))
+            batch_files.append(files)
         else:
-            return val.lines
+            batches.append(
+                [(section, global_bear_list, local_bear_list, filename_list)])
+            batch_files = [files]
+
+    return batches
+
+
+def execute_sections(sections,
+                     print_results,
+                     cache,
+                     console_printer,
+                     print_section_beginning=lambda section: None,
+                     interactive=False,
+                     apply_single=False,
+                     worker_pool=None,
+                     keep_results=True,
+                     snapshot=None):
+    """
+    Executes several sections on one shared set of processes. Processes move
+    on to the next section as soon as no work is left for them in one, so
+    they don't idle at the end of each section. The results are processed
+    one section after another in the given order.
+
+    Sections that share files with a section before them which may modify
+    them are only executed after it, see ``get_section_batches``. Debug mode
+    is not supported, use ``execute_section`` instead.
+
+    :param sections:                A list of tuples of a section, its global
+                                    bears and its local bears. Dependencies
+                                    are already resolved.
+    :param print_results:           Prints all given results appropriate to
+                                    the output medium.
+    :param cache:                   An instance of ``misc.Caching.FileCache``
+                                    to use as a file cache buffer.
+    :param console_printer:         Object to print messages on the console.
+    :param print_section_beginning: A callback that is called with each
+                                    section before its results are processed.
+    :param interactive:             Whether the user may apply actions
+                                    interactively.
+    :param apply_single:            The action that should be applied for all
+                                    results. If it's not selected, has a value
+                                    of False.
+    :param worker_pool:             The ``WorkerPool`` to run the bears on. If
+                                    not given, a pool is created for the
+                                    sections.
+    :param keep_results:            Whether the results are returned. If not,
+                                    they are dropped once they are printed.
+    :param snapshot:                The ``FileSystemSnapshot`` to collect the
+                                    files of the sections from.
+    :return:                        A list with the result of
+                                    ``execute_section`` for each section.
+    """
+    own_worker_pool = worker_pool is None
+    if own_worker_pool:
+        worker_pool = WorkerPool()
+
+    section_results = []
+    try:
+        if snapshot is None and cache is not None:
+            snapshot = cache.get_snapshot()
+        for batch in get_section_batches(sections, interactive, snapshot):
+            section_results.extend(execute_section_batch(
+                batch,
+                print_results,
+                cache,
+                console_printer,
+                print_section_beginning,
+                apply_single,
+                worker_pool,
+                keep_results))
+    finally:
+        if own_worker_pool:
+            worker_pool.close()
+
+    return section_results
+
+
+def execute_section_batch(batch,
+                          print_results,
+                          cache,
+                          console_printer,
+                          print_section_beginning,
+                          apply_single,
+                          worker_pool,
+                          keep_results=True):
+    """
+    Executes a batch of sections as returned by ``get_section_batches`` as
+    one job of the given ``WorkerPool``. See ``execute_sections`` for the
+    parameters.
+    """
+    prepared = []
+    job_count = max(get_job_count(section) for section, _, _, _ in batch)
+    job = worker_pool.create_job(job_count)
+    for section, global_bear_list, local_bear_list, filename_list in batch:
+        use_raw_files = get_use_raw_files(global_bear_list + local_bear_list)
+        if use_raw_files is None:
+            prepared.append((section, None, None))
+            continue
+
+        _, arg_dict = instantiate_processes(section,
+                                            local_bear_list,
+                                            global_bear_list,
+                                            get_job_count(section),
+                                            cache,
+                                            None,
+                                            console_printer=console_printer,
+                                            use_raw_files=use_raw_files,
+                                            filename_list=filename_list,
+                                            job=job)
+        global_bear_dispatcher = GlobalBearDispatcher(
+            arg_dict['global_bear_list'],
+            arg_dict['global_bear_queue'])
+        global_bear_dispatcher.dispatch()
+        prepared.append((section, arg_dict, global_bear_dispatcher))
+
+    job.start([arg_dict
+               for _, arg_dict, _ in prepared
+               if arg_dict is not None])
+    processes = job.processes + [worker_pool.logger_thread]
+
+    section_results = []
+    try:
+        for section, arg_dict, global_bear_dispatcher in prepared:
+            print_section_beginning(section)
+            if arg_dict is None:
+                section_results.append(((), {}, {}, {}))
+                continue
+
+            yielded_results = process_queues(
+                processes,
+                arg_dict['control_queue'],
+                arg_dict['local_result_dict'],
+                arg_dict['global_result_dict'],
+                arg_dict['file_dict'],
+                print_results,
+                section,
+                cache,
+                None,
+                console_printer=console_printer,
+                apply_single=apply_single,
+                global_bear_dispatcher=global_bear_dispatcher,
+                keep_results=keep_results)
+            record_timings(cache,
+                           arg_dict['timing_dict'],
+                           arg_dict['local_result_dict'],
+                           arg_dict['file_dict'])
+            # The shared dictionary is gone once the pool is closed
+            section_results.append(
+                (yielded_results,
+                 merge_local_results(arg_dict['local_result_dict']),
+                 dict(arg_dict['global_result_dict']),
+                 arg_dict['file_dict']))
+
+        return section_results
+    finally:
+        for _, _, global_bear_dispatcher in prepared:
+            if global_bear_dispatcher is not None:
+                # Processes waiting for global bears would never terminate
+                global_bear_dispatcher.stop()
+        job.close()
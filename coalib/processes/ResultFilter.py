@@ -0,0 +1,84 @@
+from coalib.processes.IgnoreRangeIndex import (
+    IgnoreRangeIndex, yield_ignore_ranges)
+from coalib.results.Result import Result
+from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
+
+
+class ResultFilter:
+    """
+    Drops results that wouldn't be shown in the processes running the bears,
+    so they don't have to be sent to the main process. These are results that
+    aren't plain ``Result`` objects, like ``HiddenResult``, results below the
+    minimum severity and results in code that is ignored with comments.
+
+    ``print_result`` checks the remaining results again, as ignore comments in
+    files the process can't read are only found there.
+
+    >>> from coalib.results.HiddenResult import HiddenResult
+    >>> result_filter = ResultFilter(RESULT_SEVERITY.NORMAL)
+    >>> results = [Result('Bear', 'shown'),
+    ...            Result('Bear', 'info', severity=RESULT_SEVERITY.INFO),
+    ...            HiddenResult('Bear', 'contents')]
+    >>> [result.message for result in result_filter.filter(results, {})]
+    ['shown']
+    """
+
+    def __init__(self,
+                 min_severity=RESULT_SEVERITY.INFO,
+                 dependencies=()):
+        """
+        :param min_severity: The minimum severity of the results to keep.
+        :param dependencies: The names of the global bears other global bears
+                             depend on. All of their results are kept, as they
+                             are passed to the depending bears.
+        """
+        self.min_severity = min_severity
+        self.dependencies = frozenset(dependencies)
+        self.ignore_ranges = IgnoreRangeIndex()
+        self.scanned_files = set()
+
+    def __getstate__(self):
+        # Ignore comments are looked for by each process on its own
+        return {'min_severity': self.min_severity,
+                'dependencies': self.dependencies}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def scan_files(self, results, file_dict):
+        """
+        Looks for ignore comments in the files affected by the results that
+        weren't looked at yet.
+
+        :param results:   The results to look at the files of.
+        :param file_dict: The dictionary to read the files from. Files that
+                          aren't in it or can't be read are skipped.
+        """
+        filenames = {code.file
+                     for result in results
+                     for code in result.affected_code} - self.scanned_files
+        self.scanned_files.update(filenames)
+        for filename in filenames:
+            try:
+                file = file_dict[filename]
+            except KeyError:
+                continue
+            self.ignore_ranges.extend(yield_ignore_ranges({filename: file}))
+
+    def filter(self, results, file_dict, bear_name=None):
+        """
+        :param results:   A list of results.
+        :param file_dict: The files the bears were run on.
+        :param bear_name: The name of the global bear that yielded the
+                          results, if they're from a global bear.
+        :return:          A list with the results that may be shown.
+        """
+        if bear_name in self.dependencies:
+            return results
+
+        results = [result for result in results
+                   if type(result) is Result and
+                   result.severity >= self.min_severity]
+        self.scan_files(results, file_dict)
+        return [result for result in results
+                if not self.ignore_ranges.ignores(result)]
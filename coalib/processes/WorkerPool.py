@@ -0,0 +1,745 @@
+from collections import Counter
+import importlib
+import io
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import sys
+import threading
+
+from coalib.bears.Bear import Bear
+from coalib.processes.BearRunning import (
+    run_local_bears, run_released_global_bear)
+from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.LogPrinterThread import LogPrinterThread
+from coalib.processes.communication.JobQueue import JobQueue
+from coalib.processes.communication.ResultDict import ResultDict
+from coalib.processes.communication.SharedFileDict import SharedFileDict
+
+
+class BearDescriptor:
+    """
+    Describes a bear instance by its class and its attributes, so it can be
+    sent to a process of a ``WorkerPool`` and recreated there without running
+    its constructor, which checks the prerequisites of the bear, again.
+
+    >>> from queue import Queue
+    >>> from coalib.bears.LocalBear import LocalBear
+    >>> from coalib.settings.Section import Section
+    >>> bear = LocalBear(Section('section'), Queue())
+    >>> descriptor = pickle.loads(pickle.dumps(BearDescriptor(bear)))
+    >>> message_queue = Queue()
+    >>> recreated = descriptor.instantiate(message_queue)
+    >>> type(recreated).__name__, recreated.section.name
+    ('LocalBear', 'section')
+    >>> recreated.message_queue is message_queue
+    True
+
+    Within the process that described the bear, the bear itself is used:
+
+    >>> BearDescriptor(bear).instantiate(message_queue) is bear
+    True
+    """
+
+    def __init__(self, bear):
+        """
+        :param bear: The bear instance to describe.
+        """
+        bear_class = type(bear)
+        self.bear = bear
+        self.module = bear_class.__module__
+        self.path = getattr(sys.modules.get(self.module), '__file__', None)
+        self.qualname = bear_class.__qualname__
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        bear_state = vars(state.pop('bear')).copy()
+        # Processes use their own queue to send messages
+        del bear_state['message_queue']
+        state['bear_state'] = bear_state
+        return state
+
+    def get_class(self):
+        """
+        Looks up the class of the bear by its name, importing its module
+        from where it was loaded if needed.
+
+        :raises ImportError:    Raised if the module can't be imported.
+        :raises AttributeError: Raised if the class isn't defined in its
+                                module on module level.
+        """
+        try:
+            module = importlib.import_module(self.module)
+        except ImportError:
+            # Bears are imported from their directory, see
+            # ``coalib.collecting.Importers``.
+            if self.path is None:
+                raise
+            directory = os.path.dirname(self.path)
+            if directory not in sys.path:
+                sys.path.insert(0, directory)
+            module = importlib.import_module(self.module)
+
+        obj = module
+        for name in self.qualname.split('.'):
+            obj = getattr(obj, name)
+        return obj
+
+    def is_valid(self):
+        """
+        :return: Whether the bear can be recreated from this description in
+                 another process.
+        """
+        try:
+            return self.get_class() is type(self.bear)
+        except (ImportError, AttributeError):
+            return False
+
+    def instantiate(self, message_queue):
+        """
+        Recreates the bear.
+
+        :param message_queue: The queue the bear sends its messages to.
+        :return:              The bear instance.
+        """
+        if 'bear' in self.__dict__:
+            return self.bear
+
+        bear_class = self.get_class()
+        bear = bear_class.__new__(bear_class)
+        bear.__dict__.update(self.bear_state)
+        bear.message_queue = message_queue
+        return bear
+
+
+def describe_bear(bear):
+    """
+    Describes a bear for a ``WorkerPool`` process. Objects that aren't bears
+    are passed along as they are, running them reports them as invalid.
+
+    :param bear: The bear instance.
+    :return:     A ``BearDescriptor`` or the object itself.
+    """
+    return BearDescriptor(bear) if isinstance(bear, Bear) else bear
+
+
+def instantiate_bear(bear, message_queue):
+    """
+    Recreates a bear described with ``describe_bear``.
+    """
+    if isinstance(bear, BearDescriptor):
+        return bear.instantiate(message_queue)
+    return bear
+
+
+class SectionUnitQueue:
+    """
+    The queue of local work units of one section of a job as seen by a
+    process running the job. Getting a unit blocks until one is available,
+    ``queue.Empty`` is raised as soon as no units are left for the section.
+    """
+
+    def __init__(self, job, section):
+        self.job = job
+        self.section = section
+
+    def get(self, block=True, timeout=None):
+        return self.job.get_unit(self.section)
+
+
+class WorkerJob:
+    """
+    Runs a job of a ``WorkerPool`` in one of its processes. All processes of
+    the job run through the local work units of the sections in order and
+    run the global bears released for any section in between. Once no units
+    are left, they run released global bears until all sections are done.
+    """
+
+    #: The time in seconds to wait for items of the shared queues before
+    #: checking whether the process collecting the results is alive.
+    QUEUE_TIMEOUT = 0.1
+
+    def __init__(self, job_id, pid, sections, queues):
+        """
+        :param job_id:   The id of the job.
+        :param pid:      The id of the process collecting the results.
+        :param sections: A list of dictionaries with the bears and the files
+                         of each section, see ``WorkerPoolJob.start``.
+        :param queues:   The shared queues of the ``WorkerPool``.
+        """
+        self.id = job_id
+        self.pid = pid
+        self.queues = queues
+        self.next_unit = None
+        self.units_done = False
+        self.global_bears_done = False
+
+        self.sections = [self.get_runner_args(index, section, pid)
+                         for index, section in enumerate(sections)]
+
+    def get_runner_args(self, index, section, pid):
+        """
+        Recreates the bears and sets up the queues of a section.
+
+        :param index:   The index of the section in the job.
+        :param section: The dictionary sent for the section.
+        :param pid:     The id of the process collecting the results.
+        :return:        A dictionary with arguments like those of ``run``.
+        """
+        message_queue = self.queues['messages']
+        timing_dict = (ResultDict(JobQueue(self.queues['timings'],
+                                           self.id,
+                                           index),
+                                  pid)
+                       if section['timings'] else None)
+        return {'file_name_queue': SectionUnitQueue(self, index),
+                'message_queue': message_queue,
+                'timeout': section['timeout'],
+                'file_dict': section['file_dict'],
+                'local_bear_list': [instantiate_bear(bear, message_queue)
+                                    for bear in section['local_bear_list']],
+                'global_bear_list': [instantiate_bear(bear, message_queue)
+                                     for bear in section['global_bear_list']],
+                'local_result_dict': ResultDict(
+                    JobQueue(self.queues['results'], self.id, index), pid),
+                'global_result_dict': section['global_result_dict'],
+                'control_queue': JobQueue(self.queues['control'],
+                                          self.id,
+                                          index),
+                'result_cache': section['result_cache'],
+                'result_filter': section['result_filter'],
+                'timing_dict': timing_dict}
+
+    def get_item(self, name, wait=True):
+        """
+        Gets the next item of a shared queue of the pool. While waiting for
+        it, the process collecting the results is checked to be alive, as
+        nothing is queued anymore once it ended.
+
+        :param name: The name of the queue.
+        :param wait: Whether to wait for an item.
+        :return:     The item or ``None`` if the process collecting the
+                     results ended.
+        :raises queue.Empty:
+                     Raised if no item is queued and ``wait`` is false.
+        """
+        if not wait:
+            return self.queues[name].get(timeout=0)
+
+        while True:
+            try:
+                return self.queues[name].get(timeout=self.QUEUE_TIMEOUT)
+            except queue.Empty:
+                if self.pid not in (os.getpid(), os.getppid()):
+                    return None
+
+    def get_unit(self, section):
+        """
+        Gets the next local work unit of a section. Units are queued section
+        after section, followed by a marker that the job has no more units.
+        Units of newer jobs mark the end as well.
+
+        :param section: The index of the section.
+        :return:        The unit.
+        :raises queue.Empty:
+                        Raised if no units are left for the section.
+        """
+        while not self.units_done:
+            item = self.next_unit or self.get_item('units')
+            self.next_unit = None
+            if item is None:
+                self.units_done = True
+                break
+
+            job_id, item_section, unit = item
+            if job_id < self.id:
+                # Left over from an aborted job
+                continue
+
+            if job_id > self.id or item_section is None:
+                # Leave the marker for the other processes
+                self.queues['units'].put(item)
+                self.units_done = True
+            elif item_section != section:
+                self.next_unit = item
+                break
+            else:
+                return unit
+
+        raise queue.Empty
+
+    def run_global_bears(self, wait):
+        """
+        Runs the global bears released for any section of the job.
+
+        :param wait: Whether to wait for further global bears until all
+                     sections are done. Otherwise this returns as soon as no
+                     global bear is released.
+        """
+        while not self.global_bears_done:
+            try:
+                item = self.get_item('global_bears', wait)
+            except queue.Empty:
+                return
+            if item is None:
+                self.global_bears_done = True
+                return
+
+            job_id, section, bear_index = item
+            if job_id < self.id:
+                continue
+
+            if job_id > self.id or section is None:
+                self.queues['global_bears'].put(item)
+                self.global_bears_done = True
+            elif bear_index is None:
+                # One of these is queued for every process of the job once
+                # the global bears of the section are done.
+                self.sections[section]['control_queue'].put(
+                    (CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+            else:
+                args = self.sections[section]
+                run_released_global_bear(args['message_queue'],
+                                         args['timeout'],
+                                         args['global_bear_list'][bear_index],
+                                         args['global_result_dict'],
+                                         args['control_queue'],
+                                         result_filter=args['result_filter'])
+
+    def run(self):
+        try:
+            for args in self.sections:
+                self.run_global_bears(wait=False)
+                run_local_bears(args['file_name_queue'],
+                                args['message_queue'],
+                                args['timeout'],
+                                args['file_dict'],
+                                args['local_bear_list'],
+                                args['local_result_dict'],
+                                args['control_queue'],
+                                result_cache=args['result_cache'],
+                                timing_dict=args['timing_dict'],
+                                result_filter=args['result_filter'])
+                args['control_queue'].put(
+                    (CONTROL_ELEMENT.LOCAL_FINISHED, None))
+
+            self.run_global_bears(wait=True)
+        except (OSError, KeyboardInterrupt):
+            pass
+        finally:
+            # Messages are sent before, so they can be waited for
+            self.queues['messages'].put(self.id)
+
+
+def run_job(job_id, pid, sections, queues):
+    """
+    Runs a job of a ``WorkerPool``, see ``WorkerJob``.
+    """
+    WorkerJob(job_id, pid, sections, queues).run()
+
+
+class TaskPickler(pickle.Pickler):
+    """
+    Pickles a task, replacing some objects by the objects they are shared
+    as, e.g. file dictionaries by ``SharedFileDict`` objects.
+    """
+
+    def __init__(self, file, shared):
+        """
+        :param file:   The file to write the pickled task to.
+        :param shared: A dictionary mapping the ids of the objects to replace
+                       to the objects and their replacements.
+        """
+        pickle.Pickler.__init__(self, file, pickle.HIGHEST_PROTOCOL)
+        self.shared = shared
+
+    def persistent_id(self, obj):
+        _, replacement = self.shared.get(id(obj), (None, None))
+        return replacement
+
+
+class TaskUnpickler(pickle.Unpickler):
+    """
+    Unpickles a task pickled by ``TaskPickler``.
+    """
+
+    def persistent_load(self, replacement):
+        return replacement
+
+
+def work(task_queue, queues):
+    """
+    The main loop of the processes of a ``WorkerPool``. Runs the jobs sent
+    to the given task queue until ``None`` is received.
+
+    :param task_queue: The queue to receive the pickled jobs from.
+    :param queues:     The shared queues of the pool.
+    """
+    try:
+        for task in iter(task_queue.get, None):
+            run_job(*TaskUnpickler(io.BytesIO(task)).load(), queues)
+    except KeyboardInterrupt:
+        pass
+
+
+class WorkerPoolLogPrinterThread(LogPrinterThread):
+    """
+    Outputs the messages of the processes of a ``WorkerPool``. Processes send
+    the id of a job once they finished it, so the parent process can wait
+    for all messages of a job to be output.
+    """
+
+    def __init__(self, message_queue):
+        LogPrinterThread.__init__(self, message_queue)
+        self.finished_jobs = Counter()
+        self.condition = threading.Condition()
+
+    def log(self, elem):
+        if not isinstance(elem, int):
+            LogPrinterThread.log(elem)
+            return
+
+        with self.condition:
+            self.finished_jobs[elem] += 1
+            self.condition.notify_all()
+
+    def wait(self, job_id, process_count, is_running):
+        """
+        Waits until the given number of processes finished a job.
+
+        :param job_id:        The id of the job.
+        :param process_count: The number of processes running the job.
+        :param is_running:    A function returning whether all processes
+                              are still running. If not, waiting stops once
+                              no message arrives for a while.
+        """
+        with self.condition:
+            while self.finished_jobs[job_id] < process_count:
+                if not self.condition.wait(0.1) and not is_running():
+                    break
+            del self.finished_jobs[job_id]
+
+
+class WorkerPool:
+    """
+    A set of processes that run the bears of all sections coala executes.
+    The processes are started once they're needed first and are reused for
+    all following sections until the pool is closed. As they're forked after
+    the bears were collected, the bear modules are loaded in them already.
+
+    Work is sent to the processes in jobs, a job runs one or more sections
+    at once. The bears are sent as ``BearDescriptor`` objects. All jobs share
+    the same queues, the items of the queues are tagged with the job and the
+    section they belong to, see
+    ``coalib.processes.communication.JobQueue.JobQueue``.
+
+    >>> pool = WorkerPool()
+    >>> job = pool.create_job(2)
+    >>> len(job.processes)
+    2
+    >>> pool.close()
+    """
+
+    def __init__(self):
+        self.queues = None
+        self.workers = []
+        self.manager = None
+        self.logger_thread = None
+        self.last_job_id = 0
+
+    def start(self, job_count):
+        """
+        Starts processes until the pool has at least the given number of
+        them.
+        """
+        if self.queues is None:
+            self.queues = {name: multiprocessing.Queue()
+                           for name in ('units', 'global_bears', 'control',
+                                        'messages', 'results', 'timings')}
+            self.logger_thread = WorkerPoolLogPrinterThread(
+                self.queues['messages'])
+            self.logger_thread.start()
+
+        while len(self.workers) < job_count:
+            task_queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=work,
+                                              args=(task_queue, self.queues))
+            process.start()
+            self.workers.append((process, task_queue))
+
+    def get_manager(self):
+        """
+        :return: A ``multiprocessing.Manager`` that is shut down along with
+                 the pool.
+        """
+        if self.manager is None:
+            self.manager = multiprocessing.Manager()
+        return self.manager
+
+    def create_job(self, job_count):
+        """
+        Creates a job to run on some of the processes of the pool.
+
+        :param job_count: The number of processes to run the job on.
+        :return:          A ``WorkerPoolJob``.
+        """
+        self.start(job_count)
+        self.last_job_id += 1
+        return WorkerPoolJob(self, self.last_job_id, self.workers[:job_count])
+
+    def close(self):
+        """
+        Stops all processes of the pool and waits for them to finish.
+        """
+        if self.queues is None:
+            return
+
+        # Processes may still wait for units or global bears of a job
+        end_marker = (self.last_job_id + 1, None, None)
+        self.queues['units'].put(end_marker)
+        self.queues['global_bears'].put(end_marker)
+        for process, task_queue in self.workers:
+            task_queue.put(None)
+        for process, task_queue in self.workers:
+            process.join()
+
+        self.logger_thread.running = False
+        self.logger_thread.join()
+        self.logger_thread.flush()
+        if self.manager is not None:
+            self.manager.shutdown()
+
+        self.queues = None
+        self.workers = []
+        self.manager = None
+        self.logger_thread = None
+
+
+class GlobalBearJobQueue(JobQueue):
+    """
+    The queue the ``GlobalBearDispatcher`` of a section of a job releases
+    global bears to. Instead of a single ``None`` that every process puts
+    back, one ``None`` per process of the job is queued when the global bears
+    of the section are done, as the processes run the global bears of all
+    sections of the job at once.
+    """
+
+    def __init__(self, job, section):
+        JobQueue.__init__(self, job.pool.queues['global_bears'], job.id,
+                          section)
+        self.pool_job = job
+
+    def put(self, item, block=True, timeout=None):
+        if item is not None:
+            JobQueue.put(self, item, block, timeout)
+            return
+
+        for _ in self.pool_job.processes:
+            JobQueue.put(self, None, block, timeout)
+        self.pool_job.stop_section(self.section)
+
+
+class WorkerPoolJob:
+    """
+    A job of a ``WorkerPool``, running one or more sections on some of its
+    processes. Sections are added with ``add_section`` first, the job runs
+    once ``start`` is called. The processes finish the job once ``None`` was
+    put to the global bear queue of every section, which must happen before
+    the next job of the pool is created.
+    """
+
+    def __init__(self, pool, job_id, workers):
+        """
+        :param pool:    The ``WorkerPool``.
+        :param job_id:  The id of the job.
+        :param workers: The processes of the pool with their task queues to
+                        run the job on.
+        """
+        self.pool = pool
+        self.id = job_id
+        self.workers = workers
+        self.processes = [process for process, _ in workers]
+        self.helpers = []
+        self.buffers = {'control': {}, 'results': {}, 'timings': {}}
+        self.section_count = 0
+        self.file_dicts = []
+        self.shared = {}
+        self.stopped_sections = set()
+        self.started = False
+        self.ended = False
+
+    def get_queue(self, name, section):
+        return JobQueue(self.pool.queues[name], self.id, section,
+                        self.buffers[name])
+
+    def is_alive(self):
+        """
+        :return: Whether all processes of the job are alive. Otherwise the
+                 processes that ended can't send anything anymore.
+        """
+        return all(process.is_alive() for process in self.processes)
+
+    def add_section(self, global_bears=True, timings=True, file_dict=None):
+        """
+        Adds a section to the job.
+
+        :param global_bears: Whether the section has global bears, which need
+                             a dictionary shared by the processes for their
+                             results.
+        :param timings:      Whether the time the local bears need is
+                             measured.
+        :param file_dict:    The dictionary with the contents of all files of
+                             the section. It's sent to the processes as a
+                             ``SharedFileDict``, as are the dictionaries with
+                             some of its files passed to ``start``.
+        :return:             A dictionary with the queues and dictionaries to
+                             pass to ``run`` for the section.
+        """
+        section = self.section_count
+        self.section_count += 1
+        self.file_dicts.append(file_dict)
+        return {
+            'file_name_queue': JobQueue(self.pool.queues['units'],
+                                        self.id,
+                                        section),
+            'global_bear_queue': GlobalBearJobQueue(self, section),
+            'local_result_dict': ResultDict(self.get_queue('results',
+                                                           section),
+                                            is_alive=self.is_alive),
+            'global_result_dict': (self.pool.get_manager().dict()
+                                   if global_bears else {}),
+            'timing_dict': (ResultDict(self.get_queue('timings', section),
+                                       is_alive=self.is_alive)
+                            if timings else None),
+            'message_queue': self.pool.queues['messages'],
+            'control_queue': self.get_queue('control', section)}
+
+    @staticmethod
+    def describe_section(runner_args):
+        return {'local_bear_list': [describe_bear(bear) for bear in
+                                    runner_args['local_bear_list']],
+                'global_bear_list': [describe_bear(bear) for bear in
+                                     runner_args['global_bear_list']],
+                'file_dict': runner_args['file_dict'],
+                'global_result_dict': runner_args['global_result_dict'],
+                'timeout': runner_args['timeout'],
+                'result_cache': runner_args['result_cache'],
+                'result_filter': runner_args.get('result_filter'),
+                'timings': runner_args['timing_dict'] is not None}
+
+    def share_file_dicts(self, section_runner_args):
+        """
+        Writes the file dictionaries of the sections to ``SharedFileDict``
+        objects, which replace them when the task of the job is pickled.
+
+        :param section_runner_args: The arguments to ``run`` of each section.
+        """
+        for file_dict, runner_args in zip(self.file_dicts,
+                                          section_runner_args):
+            if file_dict is None:
+                continue
+
+            shared = SharedFileDict(file_dict)
+            self.shared[id(file_dict)] = (file_dict, shared)
+            local_file_dict = runner_args['file_dict']
+            if local_file_dict is not file_dict:
+                self.shared[id(local_file_dict)] = (
+                    local_file_dict, shared.subset(local_file_dict))
+
+    def pickle_task(self, task):
+        """
+        Pickles a task for the processes of the pool.
+
+        :param task: The task, a tuple of the job id, the id of the process
+                     collecting the results and the described sections.
+        :return:     The pickled task or ``None`` if it can't be sent.
+        """
+        bears = [bear
+                 for section in task[2]
+                 for bear in (section['local_bear_list'] +
+                              section['global_bear_list'])
+                 if isinstance(bear, BearDescriptor)]
+        invalid = [bear.qualname for bear in bears if not bear.is_valid()]
+        if invalid:
+            logging.debug('The bears {} are not defined on module level, '
+                          'starting new processes to run them.'.format(
+                              ', '.join(invalid)))
+            return None
+
+        data = io.BytesIO()
+        try:
+            TaskPickler(data, self.shared).dump(task)
+            return data.getvalue()
+        except (pickle.PicklingError, AttributeError, TypeError) as exception:
+            logging.debug('The bears can not be sent to the running '
+                          'processes, starting new processes to run them: '
+                          f'{exception}')
+            return None
+
+    def start(self, section_runner_args):
+        """
+        Starts running the sections.
+
+        :param section_runner_args: A list with the arguments to ``run`` of
+                                    each section of the job, in the order the
+                                    sections were added.
+        """
+        self.pool.queues['units'].put((self.id, None, None))
+        task = (self.id,
+                os.getpid(),
+                [self.describe_section(runner_args)
+                 for runner_args in section_runner_args])
+        self.share_file_dicts(section_runner_args)
+        data = self.pickle_task(task)
+        if data is None:
+            # Forked processes get the bears as they are
+            self.helpers = [multiprocessing.Process(
+                                target=run_job,
+                                args=task + (self.pool.queues,))
+                            for _ in self.workers]
+            for helper in self.helpers:
+                helper.start()
+            self.processes = self.helpers
+        else:
+            for _, task_queue in self.workers:
+                task_queue.put(data)
+
+        self.started = True
+        self.end()
+
+    def stop_section(self, section):
+        """
+        Marks that the global bears of a section are done.
+
+        :param section: The index of the section.
+        """
+        self.stopped_sections.add(section)
+        self.end()
+
+    def end(self):
+        """
+        Tells the processes to finish the job once it was started and the
+        global bears of all sections are done.
+        """
+        if (self.started and not self.ended and
+                len(self.stopped_sections) == self.section_count):
+            self.pool.queues['global_bears'].put((self.id, None, None))
+            self.ended = True
+
+    def close(self):
+        """
+        Waits for the processes to finish the job and for their messages to
+        be output.
+        """
+        for helper in self.helpers:
+            helper.join()
+
+        self.pool.logger_thread.wait(
+            self.id,
+            len(self.processes),
+            lambda: all(process.is_alive() for process in self.processes))
+
+        for _, shared in self.shared.values():
+            shared.close()
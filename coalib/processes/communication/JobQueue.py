@@ -0,0 +1,66 @@
+from collections import defaultdict, deque
+import time
+
+
+class JobQueue:
+    """
+    A view on a queue that is shared by all jobs of a
+    ``coalib.processes.WorkerPool.WorkerPool`` and by all sections of a job.
+
+    Items are put to the underlying queue along with the job and section
+    they belong to. Getting an item returns the next item of the job and
+    section of the view. Items of other sections of the job are kept for the
+    views of those sections, items of other jobs are left over from aborted
+    jobs and are dropped.
+
+    >>> from queue import Queue
+    >>> shared_queue = Queue()
+    >>> buffers = {}
+    >>> first = JobQueue(shared_queue, 1, 0, buffers)
+    >>> second = JobQueue(shared_queue, 1, 1, buffers)
+    >>> JobQueue(shared_queue, 0, 0).put('stale')
+    >>> second.put('b')
+    >>> first.put('a')
+    >>> first.get()
+    'a'
+    >>> second.get()
+    'b'
+    >>> first.get(timeout=0)
+    Traceback (most recent call last):
+     ...
+    queue.Empty
+    """
+
+    def __init__(self, queue, job, section=0, buffers=None):
+        """
+        :param queue:   The shared queue.
+        :param job:     The id of the job the view belongs to.
+        :param section: The index of the section in the job the view belongs
+                        to.
+        :param buffers: A dictionary shared by the views on the same queue
+                        and job, to keep the items of other sections in.
+        """
+        self.queue = queue
+        self.job = job
+        self.section = section
+        self.buffers = defaultdict(deque) if buffers is None else buffers
+
+    def put(self, item, block=True, timeout=None):
+        self.queue.put((self.job, self.section, item), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        buffered = self.buffers.get(self.section)
+        if buffered:
+            return buffered.popleft()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = (None if deadline is None
+                         else max(deadline - time.monotonic(), 0))
+            job, section, item = self.queue.get(block, remaining)
+            if job != self.job:
+                continue
+            if section == self.section:
+                return item
+
+            self.buffers.setdefault(section, deque()).append(item)
@@ -0,0 +1,98 @@
+import os
+from queue import Empty
+
+
+class ResultDict(dict):
+    """
+    A dictionary of result lists that is filled by the processes running
+    bears.
+
+    Unlike a ``multiprocessing.Manager().dict()``, the dictionary itself is
+    never shared. When a child process assigns a value, the key and the value
+    are sent straight to the parent process through the given queue. The
+    parent receives them when it looks the key up, so results are pickled
+    only once and don't pass through a separate server process.
+
+    Within the process that created the dictionary it behaves like an
+    ordinary ``dict``:
+
+    >>> from queue import Queue
+    >>> results = ResultDict(Queue())
+    >>> results['file.py'] = []
+    >>> results['file.py']
+    []
+
+    Values sent from other processes are received on lookup:
+
+    >>> results.queue.put(('other_file.py', ['result']))
+    >>> results['other_file.py']
+    ['result']
+
+    Values that can't be sent anymore aren't waited for:
+
+    >>> results.is_alive = lambda: False
+    >>> results['missing.py']
+    Traceback (most recent call last):
+     ...
+    KeyError: 'missing.py'
+    """
+
+    #: The time in seconds to wait for a value before checking whether the
+    #: processes sending values are alive.
+    RECEIVE_TIMEOUT = 0.1
+
+    def __init__(self, queue, pid=None, is_alive=None):
+        """
+        :param queue:    The queue used to transport the keys and values to
+                         the parent process. It has to implement
+                         ``put(obj)`` and ``get(block=True, timeout=None)``.
+        :param pid:      The id of the process collecting the results.
+                         Defaults to the current process.
+        :param is_alive: A function telling whether any of the processes
+                         sending values is alive. Values that weren't
+                         received yet are only waited for while it returns
+                         ``True``. Defaults to waiting indefinitely. It is
+                         not sent to other processes.
+        """
+        super().__init__()
+        self.queue = queue
+        self.pid = os.getpid() if pid is None else pid
+        self.is_alive = is_alive
+
+    def __reduce__(self):
+        # Don't pickle contents, a child process only sends new values.
+        return ResultDict, (self.queue,), {'pid': self.pid, 'is_alive': None}
+
+    def __setitem__(self, key, value):
+        if os.getpid() == self.pid:
+            super().__setitem__(key, value)
+        else:
+            self.queue.put((key, value))
+
+    def __getitem__(self, key):
+        while not super().__contains__(key):
+            try:
+                self.receive(timeout=self.RECEIVE_TIMEOUT)
+            except Empty:
+                if self.is_alive is not None and not self.is_alive():
+                    # The value may have been sent right before the
+                    # processes ended
+                    try:
+                        self.receive(timeout=0)
+                    except Empty:
+                        raise KeyError(key)
+
+        return super().__getitem__(key)
+
+    def receive(self, timeout=None):
+        """
+        Receives one key and value pair sent by a child process, blocking
+        until one is available.
+
+        :param timeout: The time in seconds to wait at most, ``None`` to
+                        wait indefinitely.
+        :raises queue.Empty:
+                        Raised if nothing was received in time.
+        """
+        key, value = self.queue.get(timeout=timeout)
+        super().__setitem__(key, value)
@@ -0,0 +1,202 @@
+from array import array
+from collections.abc import Mapping, Sequence
+import mmap
+import os
+import tempfile
+
+
+class SharedLines(Sequence):
+    """
+    The lines of a file in a ``SharedFileDict``. Lines are decoded when they
+    are accessed, otherwise it behaves like the tuple of lines it replaces.
+    Concatenating them with tuples, lists or other lines gives a tuple.
+    """
+
+    def __init__(self, offsets, content, first, count):
+        """
+        :param offsets: The offsets of all lines in the shared memory.
+        :param content: The shared memory holding the lines.
+        :param first:   The index of the offset of the first line.
+        :param count:   The number of lines.
+        """
+        self.offsets = offsets
+        self.content = content
+        self.first = first
+        self._count = count
+
+    def get_line(self, index):
+        start = self.offsets[self.first + index]
+        end = self.offsets[self.first + index + 1]
+        return str(self.content[start:end], 'utf-8', 'surrogatepass')
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self.get_line(i)
+                         for i in range(*index.indices(self._count)))
+
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('line index out of range')
+        return self.get_line(index)
+
+    def __iter__(self):
+        return map(self.get_line, range(self._count))
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, SharedLines)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __add__(self, other):
+        if isinstance(other, (tuple, list, SharedLines)):
+            return tuple(self) + tuple(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, (tuple, list)):
+            return tuple(other) + tuple(self)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(tuple(self))
+
+    def __reduce__(self):
+        # Lines leaving the process, e.g. with results, are plain tuples
+        return tuple, (tuple(self),)
+
+
+class SharedFileDict(Mapping):
+    """
+    A read-only file dictionary keeping the contents of all files in one
+    memory mapped file. Only the name of that file and an index of the files
+    in it are pickled, so all processes unpickling the dictionary share the
+    contents instead of holding a copy each.
+
+    >>> import pickle
+    >>> shared = SharedFileDict({'a.py': ('a = 1\\n', 'b = 2\\n'),
+    ...                          'b.py': (),
+    ...                          'c.bin': None})
+    >>> copy = pickle.loads(pickle.dumps(shared))
+    >>> copy['a.py']
+    ('a = 1\\n', 'b = 2\\n')
+    >>> copy['a.py'][-1], len(copy['b.py']), copy['c.bin']
+    ('b = 2\\n', 0, None)
+    >>> copy['a.py'] == ('a = 1\\n', 'b = 2\\n')
+    True
+
+    The dictionary may be restricted to some of the files without copying
+    their contents:
+
+    >>> sorted(shared.subset(['b.py', 'c.bin']))
+    ['b.py', 'c.bin']
+
+    The file is removed once the dictionary that created it is closed:
+
+    >>> shared.close()
+    >>> os.path.exists(shared.path)
+    False
+    """
+
+    def __init__(self, file_dict):
+        """
+        Writes the contents of the files to a new memory mapped file.
+
+        :param file_dict: A dictionary mapping the file names to their lines.
+                          Files with ``None`` as contents are kept as they
+                          are.
+        """
+        self.index = {}
+        offsets = array('Q')
+        contents = []
+        position = 0
+        for filename in file_dict:
+            lines = file_dict[filename]
+            if lines is None:
+                self.index[filename] = None
+                continue
+
+            self.index[filename] = (len(offsets), len(lines))
+            offsets.append(position)
+            for line in lines:
+                encoded = line.encode('utf-8', 'surrogatepass')
+                contents.append(encoded)
+                position += len(encoded)
+                offsets.append(position)
+
+        descriptor, self.path = tempfile.mkstemp(prefix='coala-files-')
+        with os.fdopen(descriptor, 'wb') as file:
+            offsets.tofile(file)
+            file.writelines(contents)
+
+        self.content_start = len(offsets) * offsets.itemsize
+        self.owner = True
+        self.memory = None
+
+    def subset(self, filenames):
+        """
+        :param filenames: The files to keep.
+        :return:          A ``SharedFileDict`` with the given files only,
+                          sharing the memory mapped file of this one.
+        """
+        subset = SharedFileDict.__new__(SharedFileDict)
+        subset.__setstate__(self.__getstate__())
+        subset.index = {filename: self.index[filename]
+                        for filename in filenames}
+        return subset
+
+    def get_memory(self):
+        """
+        :return: The offsets of the lines and the memory holding them.
+        """
+        if self.memory is None:
+            with open(self.path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    memory = memoryview(b'')
+                else:
+                    memory = memoryview(mmap.mmap(
+                        file.fileno(), 0, access=mmap.ACCESS_READ))
+            self.memory = (memory[:self.content_start].cast('Q'),
+                           memory[self.content_start:])
+        return self.memory
+
+    def close(self):
+        """
+        Removes the memory mapped file, if this dictionary created it.
+        """
+        if self.owner:
+            try:
+                os.remove(self.path)
+            except OSError:
+                # Windows doesn't allow removing a file that is mapped
+                # by another process.
+                pass
+            self.owner = False
+
+    def __getitem__(self, filename):
+        entry = self.index[filename]
+        if entry is None:
+            return None
+        return SharedLines(*self.get_memory(), *entry)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getstate__(self):
+        return {'path': self.path,
+                'content_start': self.content_start,
+                'index': self.index}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.owner = False
+        self.memory = None
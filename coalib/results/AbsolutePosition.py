@@ -4,6 +4,8 @@ from coala_utils.decorators import enforce_signature
 
 class AbsolutePosition(TextPosition):
 
+    __slots__ = ('_text', '_position')
+
     @enforce_signature
     def __init__(self,
                  text: (tuple, list, None) = None,
@@ -23,6 +25,13 @@ class AbsolutePosition(TextPosition):
         self._position = position
         super().__init__(line, column)
 
+    def __getstate__(self):
+        return super().__getstate__(), self._text, self._position
+
+    def __setstate__(self, state):
+        state, self._text, self._position = state
+        super().__setstate__(state)
+
     @property
     def position(self):
         return self._position
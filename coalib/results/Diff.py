@@ -1,19 +1,63 @@
+from collections import OrderedDict
 import copy
 import difflib
+import hashlib
 import logging
 
 from unidiff import PatchSet
 
+from coalib.results.DiffEngine import get_opcodes
 from coalib.results.LineDiff import LineDiff, ConflictError
 from coalib.results.SourceRange import SourceRange
 from coalib.results.TextRange import TextRange
 from coala_utils.decorators import enforce_signature, generate_eq
 
 
-@generate_eq('_file', 'modified', 'rename', 'delete')
+#: The number of files ``get_file_digest`` keeps the digests of.
+DIGEST_CACHE_SIZE = 64
+
+# Maps the ids of tuples of lines to the tuples and their digests
+_digest_cache = OrderedDict()
+
+
+def get_file_digest(lines):
+    """
+    Computes a digest of the lines of a file. The digests of the last few
+    tuples are kept, so a file is hashed once for all diffs made for it.
+
+    >>> get_file_digest(['a\\n', 'b\\n']) == get_file_digest(('a\\n', 'b\\n'))
+    True
+    >>> get_file_digest(['a\\n', 'b\\n']) == get_file_digest(['a\\nb\\n'])
+    False
+
+    :param lines: The lines of the file.
+    :return:      The digest as a string.
+    """
+    cached = _digest_cache.get(id(lines))
+    if cached is not None and cached[0] is lines:
+        _digest_cache.move_to_end(id(lines))
+        return cached[1]
+
+    # The representation keeps the line boundaries
+    digest = hashlib.sha1(repr(tuple(lines)).encode(
+        'utf-8', 'surrogatepass')).hexdigest()
+    if type(lines) is tuple:
+        _digest_cache[id(lines)] = (lines, digest)
+        if len(_digest_cache) > DIGEST_CACHE_SIZE:
+            _digest_cache.popitem(last=False)
+    return digest
+
+
+@generate_eq('_contents', 'rename', 'delete')
 class Diff:
     """
     A Diff result represents a difference for one file.
+
+    Diffs are pickled with the file they were made for, unless it was marked
+    with ``share_file`` as one the receiving process has as well. Those
+    diffs only carry their changes and the digest of the file, so they're
+    as big as the changes. The file has to be given to them with ``resolve``
+    again where it's needed.
     """
 
     def __init__(self, file_list, rename=False, delete=False):
@@ -21,18 +65,147 @@ class Diff:
         Creates an empty diff for the given file.
 
         :param file_list: The original (unmodified) file as a list of its
-                          lines.
+                          lines. Tuples of lines are shared with the diff, so
+                          they must not be changed.
         :param rename:    False or str containing new name of file.
         :param delete:    True if file is set to be deleted.
         """
         self._changes = {}
-        self._file = list(file_list)
-        self._original = self._generate_linebreaks(self._file)
+        self._lines = (file_list
+                       if type(file_list) is tuple else
+                       tuple(file_list))
+        self._line_count = len(self._lines)
+        self._digest = None
+        self._original = None
+        self._file_shared = False
         self.rename = rename
         self.delete = delete
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_original'] = None
+        state['_file_shared'] = False
+        if self._file_shared:
+            state['_digest'] = self.digest
+            state['_lines'] = None
+        return state
+
+    def __setstate__(self, state):
+        if '_file' in state:
+            # Pickled before diffs left their files out
+            state['_lines'] = tuple(state.pop('_file'))
+            state['_line_count'] = len(state['_lines'])
+            state['_digest'] = None
+            state['_original'] = None
+        state.setdefault('_file_shared', False)
+        self.__dict__.update(state)
+
+    def __deepcopy__(self, memo):
+        # The file is never changed, copies share it
+        result = object.__new__(type(self))
+        result.__dict__.update(self.__dict__)
+        result._changes = copy.deepcopy(self._changes, memo)
+        return result
+
+    @property
+    def _file(self):
+        """
+        :return:             The lines of the original file.
+        :raises LookupError: If the diff was received from another process
+                             and wasn't given its file with ``resolve``.
+        """
+        if self._lines is None:
+            raise LookupError('The file of the diff is unknown in this '
+                              'process, it has to be given with resolve().')
+        return self._lines
+
+    @property
+    def _contents(self):
+        """
+        :return: What diffs are compared by: the original and the modified
+                 file. Diffs without their file are compared by their
+                 changes instead, so comparing them never fails.
+        """
+        if self._lines is None:
+            return self._line_count, self._digest, self._changes
+        return self._lines, self.modified
+
+    @property
+    def digest(self):
+        """
+        :return: The digest of the original file, see ``get_file_digest``.
+        """
+        if self._digest is None:
+            self._digest = get_file_digest(self._lines)
+        return self._digest
+
+    @property
+    def resolved(self):
+        """
+        :return: Whether the diff knows its original file.
+        """
+        return self._lines is not None
+
+    def share_file(self, file):
+        """
+        Marks the file of the diff as one the process receiving the pickled
+        diff has as well, so the diff is pickled without it. Diffs that were
+        made for other lines, e.g. normalized ones, keep their file.
+
+        >>> import pickle
+        >>> file = ('a\\n', 'b\\n')
+        >>> diff = Diff(file)
+        >>> pickle.loads(pickle.dumps(diff)).resolved
+        True
+        >>> diff.share_file(['a\\n', 'c\\n'])
+        False
+        >>> diff.share_file(file)
+        True
+        >>> pickle.loads(pickle.dumps(diff)).resolved
+        False
+
+        :param file: The lines of the file the receiving process has.
+        :return:     Whether the diff is pickled without its file.
+        """
+        self._file_shared = (
+            self._lines is not None and
+            (self._lines is file or
+             (len(file) == self._line_count and
+              get_file_digest(file) == self.digest)))
+        return self._file_shared
+
+    def resolve(self, file):
+        """
+        Gives a diff pickled without its file the file again.
+
+        >>> import pickle
+        >>> file = ('a\\n', 'b\\n')
+        >>> diff = Diff(file)
+        >>> diff.share_file(file)
+        True
+        >>> diff = pickle.loads(pickle.dumps(diff))
+        >>> diff.resolved
+        False
+        >>> diff.resolve(['a\\n', 'c\\n'])
+        False
+        >>> diff.resolve(('a\\n', 'b\\n'))
+        True
+        >>> diff.original
+        ['a\\n', 'b\\n']
+
+        :param file: The lines of the file the diff may have been made for.
+        :return:     Whether the diff knows its original file now. It
+                     doesn't if the given file has other contents.
+        """
+        if (self._lines is None and
+                len(file) == self._line_count and
+                get_file_digest(file) == self._digest):
+            self._lines = file if type(file) is tuple else tuple(file)
+        return self._lines is not None
+
     @classmethod
-    def from_string_arrays(cls, file_array_1, file_array_2, rename=False):
+    def from_string_arrays(cls, file_array_1, file_array_2, rename=False,
+                           engine=None):
         """
         Creates a Diff object from two arrays containing strings.
 
@@ -42,32 +215,31 @@ class Diff:
         :param file_array_1: Original array
         :param file_array_2: Array to compare
         :param rename:       False or str containing new name of file.
+        :param engine:       The name of the engine to compare the arrays
+                             with, see ``coalib.results.DiffEngine``. The
+                             default engine is used if not given.
         """
         result = cls(file_array_1, rename=rename)
 
-        matcher = difflib.SequenceMatcher(None, file_array_1, file_array_2)
-        # We use this because its faster (generator) and doesn't yield as much
-        # useless information as get_opcodes.
-        for change_group in matcher.get_grouped_opcodes(1):
-            for (tag,
-                 a_index_1,
-                 a_index_2,
-                 b_index_1,
-                 b_index_2) in change_group:
-                if tag == 'delete':
-                    for index in range(a_index_1+1, a_index_2+1):
-                        result.delete_line(index)
-                elif tag == 'insert':
-                    # We add after line, they add before, so dont add 1 here
-                    result.add_lines(a_index_1,
-                                     file_array_2[b_index_1:b_index_2])
-                elif tag == 'replace':
-                    result.modify_line(a_index_1+1,
-                                       file_array_2[b_index_1])
-                    result.add_lines(a_index_1+1,
-                                     file_array_2[b_index_1+1:b_index_2])
-                    for index in range(a_index_1+2, a_index_2+1):
-                        result.delete_line(index)
+        for (tag,
+             a_index_1,
+             a_index_2,
+             b_index_1,
+             b_index_2) in get_opcodes(file_array_1, file_array_2, engine):
+            if tag == 'delete':
+                for index in range(a_index_1+1, a_index_2+1):
+                    result.delete_line(index)
+            elif tag == 'insert':
+                # We add after line, they add before, so dont add 1 here
+                result.add_lines(a_index_1,
+                                 file_array_2[b_index_1:b_index_2])
+            elif tag == 'replace':
+                result.modify_line(a_index_1+1,
+                                   file_array_2[b_index_1])
+                result.add_lines(a_index_1+1,
+                                 file_array_2[b_index_1+1:b_index_2])
+                for index in range(a_index_1+2, a_index_2+1):
+                    result.delete_line(index)
 
         return result
 
@@ -214,6 +386,8 @@ class Diff:
         """
         Retrieves the original file.
         """
+        if self._original is None:
+            self._original = self._generate_linebreaks(self._file)
         return self._original
 
     def _raw_modified(self):
@@ -225,15 +399,16 @@ class Diff:
         if self.delete:
             return result
 
+        file = self._file
         current_line = 0
 
         # Note that line_nr counts from _1_ although 0 is possible when
         # inserting lines before everything
         for line_nr in sorted(self._changes):
-            result.extend(self._file[current_line:max(line_nr-1, 0)])
+            result.extend(file[current_line:max(line_nr-1, 0)])
             linediff = self._changes[line_nr]
             if not linediff.delete and not linediff.change and line_nr > 0:
-                result.append(self._file[line_nr-1])
+                result.append(file[line_nr-1])
             elif linediff.change:
                 result.append(linediff.change[1])
 
@@ -242,7 +417,7 @@ class Diff:
 
             current_line = line_nr
 
-        result.extend(self._file[current_line:])
+        result.extend(file[current_line:])
 
         return result
 
@@ -281,9 +456,9 @@ class Diff:
     def __json__(self):
         """
         Override JSON export, using the unified diff is the easiest thing for
-        the users.
+        the users. Diffs whose file is unknown are exported as ``None``.
         """
-        return self.unified_diff
+        return self.unified_diff if self.resolved else None
 
     def affected_code(self, filename):
         """
@@ -383,6 +558,20 @@ class Diff:
         Adds another diff to this one. Will throw an exception if this is not
         possible. (This will *not* be done in place.)
         """
+        result = copy.deepcopy(self)
+        result.merge(other)
+        return result
+
+    def _merged_changes(self, other):
+        """
+        Merges the changes of another diff with copies of the changes of this
+        diff, leaving this diff as it is.
+
+        :param other:          The diff to merge.
+        :return:               A dictionary of the line numbers changed by the
+                               other diff and their merged changes.
+        :raises ConflictError: If the diffs conflict.
+        """
         if not isinstance(other, Diff):
             raise TypeError('Only diffs can be added to a diff.')
 
@@ -390,23 +579,79 @@ class Diff:
                                                          other.rename):
             raise ConflictError('Diffs contain conflicting renamings.')
 
-        result = copy.deepcopy(self)
-        result.rename = self.rename or other.rename
-        result.delete = self.delete or other.delete
-
-        for line_nr in other._changes:
-            change = other._changes[line_nr]
-            if change.delete is True:
-                result.delete_line(line_nr)
-            if change.add_after is not False:
-                result.add_lines(line_nr, change.add_after)
-            if change.change is not False:
-                result.modify_line(line_nr, change.change[1])
+        changes = self._changes
+        self._changes = {line_nr: copy.copy(changes[line_nr])
+                         for line_nr in other._changes
+                         if line_nr in changes}
+        try:
+            for line_nr, change in other._changes.items():
+                if change.delete is True:
+                    self.delete_line(line_nr)
+                if change.add_after is not False:
+                    self.add_lines(line_nr, change.add_after)
+                if change.change is not False:
+                    self.modify_line(line_nr, change.change[1])
+
+            return self._changes
+        finally:
+            self._changes = changes
+
+    def merge(self, other):
+        r"""
+        Adds another diff to this one in place. This only takes as long as the
+        other diff is big, so many small diffs can be merged into one quickly.
+        Nothing is changed if the diffs conflict.
+
+        >>> diff = Diff(['1\n', '2\n'])
+        >>> diff.modify_line(1, 'a\n')
+        >>> other = Diff(['1\n', '2\n'])
+        >>> other.delete_line(2)
+        >>> diff.merge(other)
+        >>> diff.modified
+        ['a\n']
+        >>> other.modify_line(1, 'b\n')
+        >>> diff.merge(other)
+        Traceback (most recent call last):
+         ...
+        coalib.results.LineDiff.ConflictError: ...
+        >>> diff.modified
+        ['a\n']
 
-        return result
+        :param other:          The diff to add.
+        :raises ConflictError: If the diffs conflict.
+        """
+        self._changes.update(self._merged_changes(other))
+        self.rename = self.rename or other.rename
+        self.delete = self.delete or other.delete
 
-    def __bool__(self):
+    def is_changed_by(self, other):
+        r"""
+        Determines whether adding another diff to this one would change it,
+        without adding it. This only takes as long as the other diff is big.
+
+        >>> diff = Diff(['1\n', '2\n'])
+        >>> diff.delete_line(2)
+        >>> other = Diff(['1\n', '2\n'])
+        >>> other.delete_line(2)
+        >>> diff.is_changed_by(other)
+        False
+        >>> other.modify_line(1, 'a\n')
+        >>> diff.is_changed_by(other)
+        True
+
+        :param other:          The diff to add.
+        :return:               True if the other diff changes something this
+                               diff doesn't change yet.
+        :raises ConflictError: If the diffs conflict.
         """
+        changes = self._merged_changes(other)
+        return ((other.rename is not False and self.rename is False) or
+                (other.delete and not self.delete) or
+                any(change != self._changes.get(line_nr, LineDiff())
+                    for line_nr, change in changes.items()))
+
+    def __bool__(self):
+        r"""
         >>> bool(Diff([]))
         False
         >>> bool(Diff([], rename="some"))
@@ -416,11 +661,40 @@ class Diff:
         >>> bool(Diff.from_string_arrays(['1'], []))
         True
 
+        >>> diff = Diff(['1\n', '2'])
+        >>> diff.modify_line(2, '2\n')
+        >>> bool(diff)
+        True
+
         :return: False if the patch has no effect at all when applied.
         """
-        return (self.rename is not False or
-                self.delete is True or
-                self.modified != self.original)
+        if self.rename is not False or self.delete is True:
+            return True
+
+        additions, deletions = self.stats()
+        if additions != deletions:
+            return True
+
+        if not self.resolved:
+            # Without the file, changes are assumed to have an effect
+            return bool(self._changes)
+
+        if any(change.delete or change.add_after
+               for change in self._changes.values()):
+            return self.modified != self.original
+
+        # Only the changed lines may differ, no need to build the whole file.
+        # Linebreaks are added to all lines but the last one.
+        last_line_nr = self._line_count
+        for line_nr, change in self._changes.items():
+            original, replacement = change.change
+            if line_nr != last_line_nr:
+                original, replacement = self._add_linebreaks((original,
+                                                              replacement))
+            if original != replacement:
+                return True
+
+        return False
 
     def delete_line(self, line_nr):
         """
@@ -428,7 +702,7 @@ class Diff:
 
         Raises an exception if line number doesn't exist in the diff.
         """
-        if line_nr > len(self._file):
+        if line_nr > self._line_count:
             raise IndexError('The given line number is out of bounds.')
 
         linediff = self._get_change(line_nr)
@@ -629,7 +903,7 @@ class Diff:
         :param lines: A list of strings, representing lines.
         """
 
-        if lines == []:
+        if not lines:
             return []
 
         return Diff._add_linebreaks(lines[:-1]) + [lines[-1]]
@@ -0,0 +1,330 @@
+"""
+Engines to compute the differences between two sequences, e.g. the lines of
+two versions of a file, for ``Diff.from_string_arrays``.
+
+Each engine takes two sequences of hashable items and returns their opcodes,
+a list of ``(tag, i1, i2, j1, j2)`` tuples as returned by
+``difflib.SequenceMatcher.get_opcodes``: they tell how to turn ``a[i1:i2]``
+into ``b[j1:j2]``, where ``tag`` is one of ``'equal'``, ``'replace'``,
+``'delete'`` and ``'insert'``.
+
+>>> a = ['a\\n', 'b\\n', 'c\\n', 'd\\n']
+>>> b = ['a\\n', 'c\\n', 'x\\n', 'd\\n']
+>>> for engine in sorted(DIFF_ENGINES):
+...     opcodes = get_opcodes(a, b, engine)
+...     print(engine, [opcode for opcode in opcodes if opcode[0] != 'equal'])
+difflib [('delete', 1, 2, 1, 1), ('insert', 3, 3, 2, 3)]
+myers [('delete', 1, 2, 1, 1), ('insert', 3, 3, 2, 3)]
+patience [('delete', 1, 2, 1, 1), ('insert', 3, 3, 2, 3)]
+"""
+
+from bisect import bisect_left
+from collections import Counter
+import difflib
+
+
+def difflib_opcodes(a, b):
+    """
+    Computes the opcodes with ``difflib.SequenceMatcher``. It looks for the
+    longest matching blocks first, which takes quadratic time on big files
+    with many similar lines.
+    """
+    return difflib.SequenceMatcher(None, a, b).get_opcodes()
+
+
+def myers_opcodes(a, b):
+    """
+    Computes the opcodes of a shortest edit script with the linear space
+    variant of Myers' algorithm. It takes ``O((N+M)D)`` time for sequences
+    of the lengths ``N`` and ``M`` differing in ``D`` items.
+    """
+    a, b = hash_items(a, b)
+    blocks = []
+    myers_blocks(a, 0, len(a), b, 0, len(b), blocks)
+    return blocks_to_opcodes(blocks, len(a), len(b))
+
+
+def patience_opcodes(a, b):
+    """
+    Computes the opcodes with the patience algorithm: items occurring once in
+    both sequences are matched first, the parts between them are compared on
+    their own. Parts without such items are compared with Myers' algorithm.
+    This is fast on big files and aligns the differences of code to lines
+    like function headers rather than to blank lines and braces.
+    """
+    a, b = hash_items(a, b)
+    blocks = []
+    patience_blocks(a, 0, len(a), b, 0, len(b), blocks)
+    return blocks_to_opcodes(blocks, len(a), len(b))
+
+
+#: The engines ``get_opcodes`` can use, by name.
+DIFF_ENGINES = {'difflib': difflib_opcodes,
+                'myers': myers_opcodes,
+                'patience': patience_opcodes}
+
+#: The engine used if none is given explicitly. Users can choose another
+#: one with the ``diff_engine`` setting of a section, see
+#: ``get_section_diff_engine``.
+DEFAULT_DIFF_ENGINE = 'difflib'
+
+
+def get_opcodes(a, b, engine=None):
+    """
+    Computes the differences between two sequences.
+
+    :param a:      The original sequence.
+    :param b:      The sequence to compare it to.
+    :param engine: The name of the engine in ``DIFF_ENGINES`` to use,
+                   ``DEFAULT_DIFF_ENGINE`` if not given.
+    :return:       A list of opcodes, see the module documentation.
+    :raises ValueError: If there's no engine of the given name.
+    """
+    engine = DEFAULT_DIFF_ENGINE if engine is None else engine
+    if engine not in DIFF_ENGINES:
+        raise ValueError(f'Unknown diff engine {engine!r}, use one of '
+                         f'{", ".join(sorted(DIFF_ENGINES))}.')
+
+    return DIFF_ENGINES[engine](a, b)
+
+
+def get_section_diff_engine(section):
+    """
+    Gets the engine chosen with the ``diff_engine`` setting of a section.
+
+    >>> from coalib.settings.Section import Section
+    >>> from coalib.settings.Setting import Setting
+    >>> section = Section('section')
+    >>> get_section_diff_engine(section) is None
+    True
+    >>> section.append(Setting('diff_engine', 'patience'))
+    >>> get_section_diff_engine(section)
+    'patience'
+
+    :param section: The section.
+    :return:        The name of the engine or ``None`` if the setting isn't
+                    given, so the default engine is used.
+    """
+    return str(section['diff_engine']) if 'diff_engine' in section else None
+
+
+def hash_items(a, b):
+    """
+    Replaces the items of both sequences by numbers, equal items by equal
+    numbers. Comparing numbers is cheaper than comparing long lines.
+
+    :return: Two lists of numbers.
+    """
+    ids = {}
+    return ([ids.setdefault(item, len(ids)) for item in a],
+            [ids.setdefault(item, len(ids)) for item in b])
+
+
+def blocks_to_opcodes(blocks, a_length, b_length):
+    """
+    :param blocks:   A list of ``(i, j, n)`` tuples for the matching
+                     ``a[i:i+n]`` and ``b[j:j+n]``, in any order.
+    :param a_length: The length of the original sequence.
+    :param b_length: The length of the sequence it's compared to.
+    :return:         The opcodes of the blocks, like
+                     ``difflib.SequenceMatcher.get_opcodes`` returns them.
+    """
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in sorted(blocks) + [(a_length, b_length, 0)]:
+        if i < block_i and j < block_j:
+            opcodes.append(('replace', i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(('delete', i, block_i, j, j))
+        elif j < block_j:
+            opcodes.append(('insert', i, i, j, block_j))
+
+        if size:
+            if opcodes and opcodes[-1][0] == 'equal':
+                # Adjacent blocks are joined
+                _, i, _, j, _ = opcodes.pop()
+                opcodes.append(('equal', i, block_i + size,
+                                j, block_j + size))
+            else:
+                opcodes.append(('equal', block_i, block_i + size,
+                                block_j, block_j + size))
+        i, j = block_i + size, block_j + size
+
+    return opcodes
+
+
+def trim_common_items(a, a_low, a_high, b, b_low, b_high, blocks):
+    """
+    Adds the blocks of the items both ranges start and end with.
+
+    :return: The bounds of the ranges without those items.
+    """
+    start = a_low
+    while a_low < a_high and b_low < b_high and a[a_low] == b[b_low]:
+        a_low += 1
+        b_low += 1
+    if a_low > start:
+        blocks.append((start, b_low - (a_low - start), a_low - start))
+
+    end = a_high
+    while a_low < a_high and b_low < b_high and (a[a_high - 1] ==
+                                                 b[b_high - 1]):
+        a_high -= 1
+        b_high -= 1
+    if a_high < end:
+        blocks.append((a_high, b_high, end - a_high))
+
+    return a_low, a_high, b_low, b_high
+
+
+def myers_blocks(a, a_low, a_high, b, b_low, b_high, blocks):
+    """
+    Adds the matching blocks of ``a[a_low:a_high]`` and ``b[b_low:b_high]``
+    of a shortest edit script to ``blocks``. The ranges are split at the
+    middle of such a script, which is searched for from both ends at once.
+    """
+    a_low, a_high, b_low, b_high = trim_common_items(
+        a, a_low, a_high, b, b_low, b_high, blocks)
+    middle = find_middle_snake(a, a_low, a_high, b, b_low, b_high)
+    if middle is not None:
+        x, y = middle
+        myers_blocks(a, a_low, a_low + x, b, b_low, b_low + y, blocks)
+        myers_blocks(a, a_low + x, a_high, b, b_low + y, b_high, blocks)
+
+
+def find_middle_snake(a, a_low, a_high, b, b_low, b_high):
+    """
+    Looks for the middle of a shortest edit script of ``a[a_low:a_high]``
+    and ``b[b_low:b_high]``. They mustn't start or end with equal items.
+
+    :return: The offsets in the ranges to split them at, ``None`` if they
+             have nothing in common.
+    """
+    n = a_high - a_low
+    m = b_high - b_low
+    if not n or not m:
+        return None
+
+    max_d = (n + m + 1) // 2
+    offset = max_d
+    # The furthest x reached on each diagonal k = x - y, forwards from the
+    # start and backwards from the end, where x counts from the end.
+    forward = [-1] * (2 * max_d + 2)
+    backward = [-1] * (2 * max_d + 2)
+    forward[offset + 1] = backward[offset + 1] = 0
+    delta = n - m
+    # Paths searched forwards meet the ones searched backwards in the
+    # forward pass if delta is odd, in the backward pass otherwise.
+    front = delta % 2 != 0
+    # Diagonals leaving the ranges are skipped at either end
+    forward_start = forward_end = backward_start = backward_end = 0
+
+    for d in range(max_d):
+        for k in range(-d + forward_start, d + 1 - forward_end, 2):
+            if k == -d or (k != d and
+                           forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_low + x] == b[b_low + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if x > n:
+                forward_end += 2
+            elif y > m:
+                forward_start += 2
+            elif front:
+                backward_index = offset + delta - k
+                if (0 <= backward_index < len(backward) and
+                        backward[backward_index] != -1 and
+                        x >= n - backward[backward_index]):
+                    return x, y
+
+        for k in range(-d + backward_start, d + 1 - backward_end, 2):
+            if k == -d or (k != d and (backward[offset + k - 1] <
+                                       backward[offset + k + 1])):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and (a[a_high - x - 1] ==
+                                       b[b_high - y - 1]):
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if x > n:
+                backward_end += 2
+            elif y > m:
+                backward_start += 2
+            elif not front:
+                forward_index = offset + delta - k
+                if (0 <= forward_index < len(forward) and
+                        forward[forward_index] != -1):
+                    forward_x = forward[forward_index]
+                    if forward_x >= n - x:
+                        return forward_x, forward_x - (delta - k)
+
+    return None
+
+
+def patience_blocks(a, a_low, a_high, b, b_low, b_high, blocks):
+    """
+    Adds the matching blocks of ``a[a_low:a_high]`` and ``b[b_low:b_high]``
+    to ``blocks``, matching the items occurring once in both ranges first.
+    """
+    a_low, a_high, b_low, b_high = trim_common_items(
+        a, a_low, a_high, b, b_low, b_high, blocks)
+    if a_low == a_high or b_low == b_high:
+        return
+
+    a_counts = Counter(a[a_low:a_high])
+    b_positions = {}
+    for j in range(b_low, b_high):
+        item = b[j]
+        if a_counts[item] == 1:
+            b_positions[item] = None if item in b_positions else j
+    anchors = [(i, b_positions[a[i]])
+               for i in range(a_low, a_high)
+               if b_positions.get(a[i]) is not None]
+    anchors = longest_increasing_subsequence(anchors)
+
+    if not anchors:
+        myers_blocks(a, a_low, a_high, b, b_low, b_high, blocks)
+        return
+
+    for i, j in anchors:
+        patience_blocks(a, a_low, i, b, b_low, j, blocks)
+        blocks.append((i, j, 1))
+        a_low, b_low = i + 1, j + 1
+    patience_blocks(a, a_low, a_high, b, b_low, b_high, blocks)
+
+
+def longest_increasing_subsequence(pairs):
+    """
+    :param pairs: A list of ``(i, j)`` tuples sorted by ``i``.
+    :return:      The longest list of the pairs whose ``j`` increase too.
+    """
+    # The last j of the best subsequence of each length so far, the index of
+    # the pair ending it, and the index of the pair before each pair.
+    tails = []
+    tail_indices = []
+    previous = [None] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        length = bisect_left(tails, j)
+        if length:
+            previous[index] = tail_indices[length - 1]
+        if length == len(tails):
+            tails.append(j)
+            tail_indices.append(index)
+        else:
+            tails[length] = j
+            tail_indices[length] = index
+
+    subsequence = []
+    index = tail_indices[-1] if tail_indices else None
+    while index is not None:
+        subsequence.append(pairs[index])
+        index = previous[index]
+    return subsequence[::-1]
@@ -18,6 +18,8 @@ class HiddenResult(Result):
     to transfer any data from a dependent bear to others.
     """
 
+    __slots__ = ('contents',)
+
     @enforce_signature
     def __init__(self,
                  origin,
@@ -85,3 +87,10 @@ class HiddenResult(Result):
                         applied_actions)
 
         self.contents = contents
+
+    def __getstate__(self):
+        return super().__getstate__(), self.contents
+
+    def __setstate__(self, state):
+        state, self.contents = state
+        super().__setstate__(state)
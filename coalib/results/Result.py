@@ -1,3 +1,6 @@
+from itertools import count
+from operator import attrgetter
+import os
 import uuid
 from os.path import relpath
 
@@ -8,6 +11,29 @@ from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.results.SourceRange import SourceRange
 
 
+# The process the IDs were generated in and the IDs to generate
+_ids = (None, None)
+
+
+def generate_result_id():
+    """
+    Generates an ID for a result, unique among the results of all processes.
+    The IDs of a process have a random prefix and count up from it, calling
+    ``uuid.uuid4`` for every result is slow.
+
+    >>> generate_result_id() + 1 == generate_result_id()
+    True
+
+    :return: A 128 bit integer.
+    """
+    global _ids
+    pid, ids = _ids
+    if pid != os.getpid():
+        # Forked processes need their own prefix
+        pid, ids = _ids = os.getpid(), count(uuid.uuid4().int >> 64 << 64)
+    return next(ids)
+
+
 # Omit additional info, debug message and diffs for brevity
 @generate_repr(('id', hex),
                'origin',
@@ -50,9 +76,18 @@ class Result:
     >>> r.message
     'spam and eggs'
 
+
+    The attributes of results are slots, as there may be many of them, and
+    they're pickled as tuples. Other attributes may still be set, they're
+    kept in a ``__dict__`` that's only created then and pickled too.
     """
     # Stop ignoring
 
+    __slots__ = ('origin', 'message_base', 'message_arguments',
+                 'applied_actions', 'debug_msg', 'additional_info',
+                 'affected_code', 'severity', 'confidence', 'diffs', 'id',
+                 'aspect', 'actions', 'alternate_diffs', '__dict__')
+
     @enforce_signature
     def __init__(self,
                  origin,
@@ -132,7 +167,7 @@ class Result:
             raise ValueError('Value of confidence should be between 0 and 100.')
         self.confidence = confidence
         self.diffs = diffs
-        self.id = uuid.uuid4().int
+        self.id = generate_result_id()
         self.aspect = aspect
         if self.aspect and not self.additional_info:
             self.additional_info = (
@@ -142,6 +177,16 @@ class Result:
         self.actions = actions
         self.alternate_diffs = alternate_diffs
 
+    def __getstate__(self):
+        return _get_slot_values(self), self.__dict__ or None
+
+    def __setstate__(self, state):
+        values, dict = state
+        for name, value in zip(Result.__slots__, values):
+            setattr(self, name, value)
+        if dict:
+            self.__dict__.update(dict)
+
     @property
     def message(self):
         if not self.message_arguments:
@@ -282,6 +327,46 @@ class Result:
 
         return retval
 
+    def share_diffs(self, file_dict):
+        """
+        Marks the files of the diffs as ones the process receiving the
+        result has as well, so they're not sent with the result, see
+        ``Diff.share_file``.
+
+        :param file_dict: A dictionary containing the lines of the files with
+                          filename as key, as the receiving process has them.
+                          Diffs of files that aren't in it or whose lines
+                          differ keep their files.
+        """
+        diff_dicts = [self.diffs or {}] + list(self.alternate_diffs or [])
+        for diff_dict in diff_dicts:
+            for filename, diff in diff_dict.items():
+                try:
+                    file = file_dict[filename]
+                except KeyError:
+                    continue
+                diff.share_file(file)
+
+    def resolve_diffs(self, file_dict):
+        """
+        Gives the diffs of a result received from another process or a cache
+        their original files again, see ``Diff.resolve``.
+
+        :param file_dict: A dictionary containing the lines of the files with
+                          filename as key. Diffs of files that aren't in it
+                          are left as they are.
+        """
+        diff_dicts = [self.diffs or {}] + list(self.alternate_diffs or [])
+        for diff_dict in diff_dicts:
+            for filename, diff in diff_dict.items():
+                if diff.resolved:
+                    continue
+                try:
+                    file = file_dict[filename]
+                except KeyError:
+                    continue
+                diff.resolve(file)
+
     @enforce_signature
     def apply(self, file_dict: dict):
         """
@@ -354,3 +439,6 @@ class Result:
                               for file, diff in _dict['diffs'].items()}
         _dict['aspect'] = type(self.aspect).__qualname__
         return _dict
+
+
+_get_slot_values = attrgetter(*Result.__slots__[:-1])
@@ -1,4 +1,6 @@
-from os.path import relpath, abspath
+from functools import lru_cache
+from os.path import abspath, isabs, normpath, relpath
+import sys
 
 from coala_utils.decorators import (
     enforce_signature, generate_ordering, generate_repr, get_public_members)
@@ -9,6 +11,8 @@ from coalib.results.TextPosition import TextPosition
 @generate_ordering('file', 'line', 'column')
 class SourcePosition(TextPosition):
 
+    __slots__ = ('filename', '_file')
+
     @enforce_signature
     def __init__(self, file: str, line=None, column=None):
         """
@@ -25,8 +29,17 @@ class SourcePosition(TextPosition):
         """
         TextPosition.__init__(self, line, column)
 
-        self.filename = file
-        self._file = abspath(file)
+        self._file = get_absolute_path(file)
+        # Most files are given with their absolute paths already, they aren't
+        # stored twice then.
+        self.filename = self._file if file == self._file else file
+
+    def __getstate__(self):
+        return super().__getstate__(), self._file, self.filename
+
+    def __setstate__(self, state):
+        state, self._file, self.filename = state
+        super().__setstate__(state)
 
     @property
     def file(self):
@@ -45,3 +58,26 @@ class SourcePosition(TextPosition):
         if self.column is not None:
             source_position += ':' + str(self.column)
         return source_position
+
+
+def get_absolute_path(file):
+    """
+    Makes a path absolute like ``os.path.abspath``, but returns the same
+    string object for the same path. The positions in a file share it, so
+    it's kept in memory and pickled once only.
+
+    >>> get_absolute_path('/a/./b') is get_absolute_path('/a/b/../b')
+    True
+
+    :param file: The path.
+    :return:     The normalized absolute path.
+    """
+    if isabs(file):
+        # These don't depend on the working directory, they're cached
+        return _get_normalized_path(file)
+    return sys.intern(abspath(file))
+
+
+@lru_cache(maxsize=4096)
+def _get_normalized_path(file):
+    return sys.intern(normpath(file))
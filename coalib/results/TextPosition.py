@@ -9,6 +9,9 @@ class ZeroOffsetError(ValueError):
 @generate_repr('line', 'column')
 @generate_ordering('line', 'column')
 class TextPosition:
+    # Positions are made for every result. They've no ``__dict__`` to be
+    # small and they're pickled as tuples.
+    __slots__ = ('_line', '_column')
 
     @enforce_signature
     def __init__(self, line: (int, None) = None, column: (int, None) = None):
@@ -35,6 +38,12 @@ class TextPosition:
         self._line = line
         self._column = column
 
+    def __getstate__(self):
+        return self._line, self._column
+
+    def __setstate__(self, state):
+        self._line, self._column = state
+
     @property
     def line(self):
         return self._line
@@ -9,6 +9,8 @@ from coalib.results.TextPosition import TextPosition
 @generate_ordering('start', 'end')
 class TextRange:
 
+    __slots__ = ('_start', '_end')
+
     @enforce_signature
     def __init__(self, start: TextPosition, end: (TextPosition, None) = None):
         """
@@ -78,6 +80,12 @@ class TextRange:
 
         return cls(min(a.start, b.start), max(a.end, b.end))
 
+    def __getstate__(self):
+        return self._start, self._end
+
+    def __setstate__(self, state):
+        self._start, self._end = state
+
     @property
     def start(self):
         return self._start
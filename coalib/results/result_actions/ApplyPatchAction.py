@@ -1,4 +1,6 @@
+import os
 import shutil
+import tempfile
 from os.path import isfile
 from os import remove
 
@@ -8,6 +10,74 @@ from coalib.results.result_actions.ShowPatchAction import ShowPatchAction
 from coalib.results.result_actions.ResultAction import ResultAction
 
 
+def write_file_atomically(filename, lines, encoding, mode_filename=None):
+    """
+    Writes the lines to a temporary file next to the given file first, which
+    then replaces it. The file thus either has its old or its new contents,
+    even if writing fails midway. If the file is a symbolic link, the file it
+    points to is written.
+
+    :param filename:      The file to write.
+    :param lines:         The lines to write.
+    :param encoding:      The encoding to write the file with.
+    :param mode_filename: A file to take the permissions from if the file
+                          doesn't exist yet, e.g. the file it is renamed
+                          from. Otherwise new files get the default
+                          permissions given by the umask.
+    """
+    filename = os.path.realpath(filename)
+    directory, name = os.path.split(filename)
+    with tempfile.NamedTemporaryFile(mode='w',
+                                     encoding=encoding,
+                                     dir=directory,
+                                     prefix='.' + name + '.',
+                                     suffix='.tmp',
+                                     delete=False) as file:
+        try:
+            file.writelines(lines)
+        except BaseException:
+            file.close()
+            remove(file.name)
+            raise
+
+    if isfile(filename):
+        shutil.copymode(filename, file.name)
+    elif mode_filename is not None and isfile(mode_filename):
+        shutil.copymode(mode_filename, file.name)
+    else:
+        # Temporary files are only accessible by their owner
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(file.name, 0o666 & ~umask)
+    os.replace(file.name, filename)
+
+
+def write_patched_file(filename, pre_patch_filename, diff, encoding=None):
+    """
+    Writes the patched contents of a file to the disk, renaming or deleting it
+    as the diff says.
+
+    :param filename:           The name of the file the diff was made for.
+    :param pre_patch_filename: The name the file has on the disk.
+    :param diff:               All changes to the file.
+    :param encoding:           The encoding of the file. It's detected from
+                               the file on the disk if not given.
+    """
+    if not diff.delete:
+        if encoding is None:
+            encoding = detect_encoding(pre_patch_filename)
+        new_filename = (diff.rename
+                        if diff.rename is not False
+                        else filename)
+        write_file_atomically(new_filename, diff.modified, encoding,
+                              mode_filename=pre_patch_filename)
+
+    if diff.delete or diff.rename:
+        if diff.rename != pre_patch_filename and isfile(
+                pre_patch_filename):
+            remove(pre_patch_filename)
+
+
 class ApplyPatchAction(ResultAction):
 
     SUCCESS_MESSAGE = 'Patch applied successfully.'
@@ -41,19 +111,8 @@ class ApplyPatchAction(ResultAction):
                     shutil.copy2(pre_patch_filename,
                                  pre_patch_filename + '.orig')
 
-            diff = file_diff_dict[filename]
-
-            if not diff.delete:
-                new_filename = (diff.rename
-                                if diff.rename is not False
-                                else filename)
-                with open(new_filename, mode='w',
-                          encoding=detect_encoding(pre_patch_filename)) as file:
-                    file.writelines(diff.modified)
-
-            if diff.delete or diff.rename:
-                if diff.rename != pre_patch_filename and isfile(
-                        pre_patch_filename):
-                    remove(pre_patch_filename)
+            write_patched_file(filename,
+                               pre_patch_filename,
+                               file_diff_dict[filename])
 
         return file_diff_dict
@@ -66,13 +66,15 @@ class ShowPatchAction(ResultAction):
         if not result.diffs:
             return 'This result has no patch attached.'
 
+        if not all(diff.resolved for diff in result.diffs.values()):
+            return 'The files of the patches are not known.'
+
         try:
             # Needed so the addition is run for all patches -> ConflictError
             nonempty_patches = False
             for filename, diff in result.diffs.items():
                 if diff and (filename not in file_diff_dict or
-                             diff + file_diff_dict[filename] !=
-                             file_diff_dict[filename]):
+                             file_diff_dict[filename].is_changed_by(diff)):
                     nonempty_patches = True
 
             if nonempty_patches:
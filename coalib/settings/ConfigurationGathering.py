@@ -252,7 +252,9 @@ def load_configuration(arg_list,
 
     # We don't want to store targets argument back to file, thus remove it
     targets = [item.lower() for item in list(
-        cli_sections['cli'].contents.pop('targets', ''))]
+        cli_sections['cli'].contents.get('targets', ''))]
+    if 'targets' in cli_sections['cli'].contents:
+        cli_sections['cli'].delete_setting('targets')
 
     if bool(cli_sections['cli'].get('no_config', 'False')):
         sections = cli_sections
@@ -7,7 +7,7 @@ from coalib.bearlib.aspects import AspectList
 from coalib.collecting.Collectors import collect_registered_bears_dirs
 from coala_utils.decorators import enforce_signature, generate_repr
 from coalib.misc.DictUtilities import update_ordered_dict_key
-from coalib.settings.Setting import Setting, path_list
+from coalib.settings.Setting import FrozenSetting, Setting, path_list
 from coalib.parsing.Globbing import glob_escape
 
 
@@ -72,6 +72,56 @@ def extract_aspects_from_section(section):
     return aspect_instances
 
 
+class SectionContents(OrderedDict):
+    """
+    The settings of a section by their keys. It counts how often it was
+    changed, so the section can tell when its resolved settings are out of
+    date.
+
+    >>> contents = SectionContents()
+    >>> contents['key'] = Setting('key', 'value')
+    >>> contents.change_count
+    1
+    >>> str(contents.pop('key')), contents.change_count > 1
+    ('value', True)
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.change_count = 0
+        OrderedDict.__init__(self, *args, **kwargs)
+
+    def __setitem__(self, key, value):
+        OrderedDict.__setitem__(self, key, value)
+        self.change_count += 1
+
+    def __delitem__(self, key):
+        OrderedDict.__delitem__(self, key)
+        self.change_count += 1
+
+    def pop(self, *args):
+        self.change_count += 1
+        return OrderedDict.pop(self, *args)
+
+    def popitem(self, last=True):
+        self.change_count += 1
+        return OrderedDict.popitem(self, last)
+
+    def setdefault(self, key, default=None):
+        self.change_count += 1
+        return OrderedDict.setdefault(self, key, default)
+
+    def clear(self):
+        self.change_count += 1
+        OrderedDict.clear(self)
+
+    def move_to_end(self, key, last=True):
+        self.change_count += 1
+        OrderedDict.move_to_end(self, key, last)
+
+    def __repr__(self):
+        return repr(OrderedDict(self))
+
+
 @generate_repr()
 class Section:
     """
@@ -130,11 +180,86 @@ class Section:
             raise ValueError('defaults may not be self for non-recursivity.')
 
         self.name = str(name)
+        self.change_count = 0
+        self.resolved = None
         self.defaults = defaults
         self.contents = OrderedDict()
         self.aspects = None
         self.language = None
 
+    @property
+    def defaults(self):
+        return self._defaults
+
+    @defaults.setter
+    def defaults(self, defaults):
+        self._defaults = defaults
+        self.mark_changed()
+
+    @property
+    def version(self):
+        """
+        A value that changes whenever the settings of this section or of its
+        defaults are changed, so values derived from them can be reused until
+        then.
+
+        >>> section = Section('section', Section('defaults'))
+        >>> version = section.version
+        >>> section.defaults['key'] = 'value'
+        >>> section.version == version
+        False
+        """
+        return (self.change_count,
+                self.contents.change_count,
+                None if self.defaults is None else self.defaults.version)
+
+    @property
+    def contents(self):
+        """
+        The settings of the section by their keys, a ``SectionContents``.
+        Changing it marks the section as changed:
+
+        >>> section = Section('section')
+        >>> section['key'] = 'value'
+        >>> 'key' in section
+        True
+        >>> del section.contents['key']
+        >>> 'key' in section
+        False
+        """
+        return self._contents
+
+    @contents.setter
+    def contents(self, contents):
+        self._contents = SectionContents(contents)
+        self.mark_changed()
+
+    def mark_changed(self):
+        """
+        Marks that the settings of the section changed. This is done by all
+        methods changing the section and by changing ``contents``, it's only
+        needed after changing the settings in it directly.
+        """
+        self.change_count += 1
+
+    def resolve(self):
+        """
+        Resolves the settings of the section, including those of its defaults,
+        and appends the settings to be appended to the ones of the defaults.
+        This is done once, until the section or its defaults are changed.
+
+        >>> section = Section('section', Section('defaults'))
+        >>> section.defaults['key'] = 'value'
+        >>> section.append(Setting('key', 'other value', to_append=True))
+        >>> str(section.resolve()['key'])
+        'value, other value'
+
+        :return: A ``ResolvedSection`` with the settings.
+        """
+        if self.resolved is None or self.resolved.version != self.version:
+            self.resolved = ResolvedSection(self)
+        return self.resolved
+
     def bear_dirs(self):
         bear_dirs = path_list(self.get('bear_dirs', ''))
         for bear_dir in bear_dirs:
@@ -170,6 +295,7 @@ class Section:
 
         # Setting asserts key != "" for us
         self.contents[key] = setting
+        self.mark_changed()
 
     def add_or_create_setting(self,
                               setting,
@@ -223,12 +349,11 @@ class Section:
         return iter(joined)
 
     def __contains__(self, item, ignore_defaults=False):
-        try:
-            self.__getitem__(item, ignore_defaults)
+        if ignore_defaults:
+            key = self.__prepare_key(item)
+            return key != '' and key in self.contents
 
-            return True
-        except IndexError:
-            return False
+        return item in self.resolve()
 
     def __getitem__(self, item, ignore_defaults=False):
         key = self.__prepare_key(item)
@@ -296,6 +421,7 @@ class Section:
             raise TypeError('other_section has to be a Section')
 
         self.contents.update(other_section.contents)
+        self.mark_changed()
 
         if not ignore_defaults and other_section.defaults is not None:
             if self.defaults is None:
@@ -325,6 +451,7 @@ class Section:
                 self.contents[new_key].value = new_value
             else:
                 self.contents[key].value = new_value
+        self.mark_changed()
 
     def delete_setting(self, key):
         """
@@ -332,6 +459,7 @@ class Section:
         :param key: The key of the setting to be deleted
         """
         del self.contents[key]
+        self.mark_changed()
 
     def set_default_section(self, sections, section_name=None):
         """
@@ -383,3 +511,79 @@ class Section:
         elif 'cli' in sections and self.name.lower() != 'cli':
             # CLI section is now default
             self.defaults = sections['cli']
+
+
+class ResolvedSection:
+    """
+    A read-only view of the settings of a section, as returned by
+    ``Section.resolve``. The settings are ``FrozenSetting`` objects, so they
+    are returned without copying them. Lookups work like the ones of a
+    ``Section``:
+
+    >>> section = Section('section')
+    >>> section['key'] = 'value'
+    >>> resolved = section.resolve()
+    >>> str(resolved['KEY']), 'key' in resolved, 'other' in resolved
+    ('value', True, False)
+    >>> str(resolved.get('other', 'default'))
+    'default'
+    """
+
+    @staticmethod
+    def __prepare_key(key):
+        return str(key).lower().strip()
+
+    def __init__(self, section):
+        """
+        :param section: The section to resolve.
+        """
+        self.name = section.name
+        self.version = section.version
+        self.settings = OrderedDict()
+
+        defaults = (None if section.defaults is None
+                    else section.defaults.resolve())
+        for key, setting in section.contents.items():
+            value = None
+            if (setting.to_append and defaults is not None and
+                    key in defaults):
+                value = defaults[key]._value + ', ' + setting._value
+            self.settings[key] = FrozenSetting(setting, value)
+
+        if defaults is not None:
+            for key, setting in defaults.settings.items():
+                self.settings.setdefault(key, setting)
+
+    def __iter__(self):
+        return iter(self.settings)
+
+    def __len__(self):
+        return len(self.settings)
+
+    def __contains__(self, item):
+        return self.__prepare_key(item) in self.settings
+
+    def __getitem__(self, item):
+        key = self.__prepare_key(item)
+        if key == '':
+            raise IndexError('Empty keys are invalid.')
+
+        try:
+            return self.settings[key]
+        except KeyError:
+            raise IndexError('Required index is unavailable.')
+
+    def get(self, key, default=''):
+        """
+        Retrieves the item without raising an exception. If the item is not
+        available an appropriate Setting will be generated from your provided
+        default value.
+
+        :param key:     The key of the setting to return.
+        :param default: The default value
+        :return:        The setting.
+        """
+        try:
+            return self[key]
+        except IndexError:
+            return Setting(key, str(default))
@@ -1,3 +1,4 @@
+import copy
 import os
 from collections import Iterable, OrderedDict
 
@@ -333,3 +334,60 @@ class Setting(StringConverter):
             raise TypeError("Instantiated with str 'origin' "
                             'which does not have line numbers. '
                             'Use SourcePosition for line numbers.')
+
+
+class FrozenSetting(Setting):
+    """
+    A ``Setting`` that can't be changed, so it can be handed out without
+    copying it. Copies of it are ordinary settings again:
+
+    >>> from copy import copy
+    >>> setting = FrozenSetting(Setting('key', 'value'))
+    >>> setting.value = 'other value'
+    Traceback (most recent call last):
+     ...
+    AttributeError: Can't change a frozen setting.
+    >>> setting = copy(setting)
+    >>> setting.value = 'other value'
+    >>> str(setting)
+    'other value'
+    """
+
+    def __init__(self, setting, value=None):
+        """
+        :param setting: The setting to freeze. It is not changed and doesn't
+                        affect the frozen setting when it's changed later.
+        :param value:   A value to use instead of the one of the setting. The
+                        frozen setting is never appended to other settings.
+        """
+        self.__dict__.update(setting.__dict__)
+        if value is not None:
+            self.value = value
+        self.to_append = False
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError("Can't change a frozen setting.")
+        super().__setattr__(name, value)
+
+    def thaw(self, memo=None):
+        """
+        :param memo: The memo of ``copy.deepcopy``, if its attributes should
+                     be copied as well.
+        :return:     A ``Setting`` with the same key, value and origin that can
+                     be changed.
+        """
+        setting = Setting.__new__(Setting)
+        state = {name: value for name, value in self.__dict__.items()
+                 if name != '_frozen'}
+        if memo is not None:
+            state = copy.deepcopy(state, memo)
+        setting.__dict__.update(state)
+        return setting
+
+    def __copy__(self):
+        return self.thaw()
+
+    def __deepcopy__(self, memo):
+        return self.thaw(memo)
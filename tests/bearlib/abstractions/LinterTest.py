@@ -4,14 +4,16 @@ import os
 import re
 import sys
 import unittest
-from unittest.mock import ANY, Mock
+from unittest.mock import ANY, Mock, patch
 
 from coalib.bearlib.abstractions.Linter import linter
 from coalib.results.Diff import Diff
+from coalib.results.DiffEngine import get_opcodes
 from coalib.results.Result import Result
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.results.SourceRange import SourceRange
 from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
 
 WINDOWS = platform.system() == 'Windows'
 
@@ -468,6 +470,23 @@ class LinterRunTest(LinterTestBase):
                 expected_result, '', [])
             process_output_mock.reset_mock()
 
+    def test_process_output_corrected_diff_engine(self):
+        uut = (linter(sys.executable, output_format='corrected')
+               (self.EmptyTestLinter)
+               (self.section, None))
+        original = ['a\n', 'b\n']
+
+        with patch('coalib.results.Diff.get_opcodes',
+                   wraps=get_opcodes) as get_opcodes_mock:
+            list(uut.process_output('a\n', 'some-file.c', original))
+            get_opcodes_mock.assert_called_once_with(original, ['a\n'], None)
+
+            self.section.append(Setting('diff_engine', 'patience'))
+            get_opcodes_mock.reset_mock()
+            list(uut.process_output('a\n', 'some-file.c', original))
+            get_opcodes_mock.assert_called_once_with(original, ['a\n'],
+                                                     'patience')
+
     def test_process_output_corrected(self):
         uut = (linter(sys.executable, output_format='corrected')
                (self.EmptyTestLinter)
@@ -29,8 +29,9 @@ from coalib.results.TextPosition import ZeroOffsetError
 from coalib.output.printers.LOG_LEVEL import LOG_LEVEL
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.processes.communication.LogMessage import LogMessage
+from coalib.settings.FunctionMetadata import FunctionMetadata
 from coalib.settings.Section import Section
-from coalib.settings.Setting import Setting, language
+from coalib.settings.Setting import Setting, language, typed_list
 from pyprint.ConsolePrinter import ConsolePrinter
 from coala_utils.ContextManagers import prepare_file
 
@@ -101,6 +102,13 @@ class TypedTestBear(Bear):
         return []
 
 
+class ListTestBear(Bear):
+
+    def run(self, names: typed_list(str)):
+        names.append('c')
+        return names
+
+
 class ZeroOffsetLocalBear(LocalBear):
 
     def __init__(self, section, queue, error_message):
@@ -389,6 +397,35 @@ class BearTest(BearTestBase):
         self.assertTrue(self.queue.empty())
         self.assertFalse(self.uut.was_executed)
 
+    def test_section_params(self):
+        self.uut = ListTestBear(self.settings, self.queue)
+        self.settings.append(Setting('names', 'a, b'))
+        with patch.object(FunctionMetadata, 'create_params_from_section',
+                          autospec=True,
+                          side_effect=FunctionMetadata.
+                          create_params_from_section) as create:
+            self.assertEqual(self.uut.execute(), ['a', 'b', 'c'])
+            # The bear gets new values every time, though they are only
+            # created once
+            self.assertEqual(self.uut.execute(), ['a', 'b', 'c'])
+            self.assertEqual(create.call_count, 1)
+
+            self.settings.defaults = Section('defaults')
+            self.uut.execute()
+            self.assertEqual(create.call_count, 2)
+
+            self.settings.defaults['names'] = 'd'
+            self.uut.execute()
+            self.assertEqual(create.call_count, 3)
+
+            self.settings.language = Language['Python']
+            self.uut.execute()
+            self.assertEqual(create.call_count, 4)
+
+            self.uut.section = self.settings.copy()
+            self.uut.execute()
+            self.assertEqual(create.call_count, 5)
+
     def check_message(self, log_level, message=None, regex=False):
         msg = self.queue.get()
         self.assertIsInstance(msg, LogMessage)
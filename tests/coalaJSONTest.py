@@ -58,6 +58,48 @@ class coalaJSONTest(unittest.TestCase):
                                     'results found')
                 self.assertFalse(stderr)
 
+    def test_ndjson(self):
+        with bear_test_module():
+            with prepare_file(['#fixme'], None) as (lines, filename):
+                args = (coala.main, 'coala', '--json', '-c', os.devnull, '-b',
+                        'LineCountTestBear', '-f', filename)
+                retval, stdout, stderr = execute_coala(*args)
+                results = json.loads(stdout)['results']
+
+                retval, stdout, stderr = execute_coala(
+                    *(args + ('--ndjson', '--log-json', '-L', 'DEBUG')))
+                lines = [json.loads(line) for line in stdout.splitlines()]
+
+        result_lines = [line for line in lines if 'result' in line]
+        # The results are from different runs
+        del result_lines[0]['result']['id'], results['cli'][0]['id']
+        self.assertEqual(result_lines,
+                         [{'section': 'cli', 'result': results['cli'][0]}])
+        log_lines = [line for line in lines if 'level' in line]
+        self.assertTrue(log_lines)
+        self.assertEqual(len(log_lines) + 1, len(lines))
+        self.assertNotEqual(retval, 0,
+                            'coala must return nonzero when results found')
+        self.assertFalse(stderr)
+
+    def test_ndjson_output_file(self):
+        with bear_test_module():
+            with prepare_file(['#fixme'], None) as (lines, filename):
+                retval, stdout, stderr = execute_coala(
+                    coala.main, 'coala', '--json', '--ndjson', '-c',
+                    os.devnull, '-b', 'LineCountTestBear', '-f', filename,
+                    '-o', 'file.json')
+
+        with open('file.json') as fp:
+            lines = [json.loads(line) for line in fp]
+        os.remove('file.json')
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['result']['message'],
+                         'This file has 1 lines.')
+        self.assertEqual(retval, 1)
+        self.assertFalse(stdout)
+
     def test_fail_acquire_settings(self):
         with bear_test_module():
             retval, stdout, stderr = execute_coala(coala.main, 'coala',
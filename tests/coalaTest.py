@@ -327,6 +327,37 @@ class coalaTest(unittest.TestCase):
     def test_run_coala_no_autoapply_debug(self):
         self.test_run_coala_no_autoapply(debug=True)
 
+    def test_run_coala_one_snapshot(self):
+        from coalib.processes import Processing
+        with bear_test_module(), \
+                prepare_file(['#fixme\n'], None) as (lines, filename), \
+                make_temp() as coafile:
+            with open(coafile, 'w') as file:
+                file.write('[a]\n'
+                           'files = {0}\n'
+                           'bears = LineCountTestBear\n'
+                           '[b]\n'
+                           'files = {0}\n'
+                           'bears = LineCountTestBear\n'.format(filename))
+
+            for concurrent in ((), ('--concurrent-sections',)):
+                with unittest.mock.patch.object(
+                        Processing, 'collect_section_files',
+                        wraps=Processing.collect_section_files) as collect:
+                    run_coala(
+                        console_printer=ConsolePrinter(),
+                        log_printer=LogPrinter(),
+                        arg_list=('-c', coafile, '--disable-caching') +
+                        concurrent,
+                        autoapply=False)
+
+                # The directories are read once for all sections
+                snapshots = {id(call[0][1])
+                             for call in collect.call_args_list}
+                self.assertGreaterEqual(len(collect.call_args_list), 2)
+                self.assertIsNotNone(collect.call_args_list[0][0][1])
+                self.assertEqual(len(snapshots), 1)
+
     def test_logged_error_causes_non_zero_exitcode(self):
         configure_logging()
         with bear_test_module():
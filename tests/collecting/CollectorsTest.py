@@ -1,7 +1,9 @@
 import logging
 import os
 import pkg_resources
+import tempfile
 import unittest
+import unittest.mock
 
 from functools import partial
 from pyprint.ConsolePrinter import ConsolePrinter
@@ -17,6 +19,7 @@ from coalib.collecting.Collectors import (
     get_all_bears, get_all_bears_names, collect_bears_by_aspects,
     get_all_languages,
     )
+from coalib.collecting.FileSystemSnapshot import FileSystemSnapshot
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.output.printers.ListLogPrinter import ListLogPrinter
 from coalib.settings.Section import Section
@@ -116,6 +119,73 @@ class CollectFilesTest(unittest.TestCase):
                 ignored_file_paths=[dir_base('py_files', '*')]),
             [dir_base('c_files', 'file1.c')])
 
+    def test_ignored_dirs_pruned(self):
+        def dir_base(*args):
+            return os.path.normcase(os.path.join(self.collectors_test_dir,
+                                                 'others', *args))
+
+        listed = []
+        listdir = os.listdir
+
+        def listdir_logged(path):
+            listed.append(path)
+            return listdir(path)
+
+        with unittest.mock.patch('os.listdir', listdir_logged):
+            self.assertEqual(
+                sorted(collect_files(
+                    [dir_base('**', '*.c')],
+                    ignored_file_paths=[dir_base('py_files')])),
+                [dir_base('c_files', 'file1.c'),
+                 dir_base('c_files', 'file2.c')])
+        self.assertIn(dir_base('c_files'), listed)
+        self.assertNotIn(dir_base('py_files'), listed)
+
+    def test_snapshot(self):
+        snapshot = FileSystemSnapshot()
+        others = os.path.join(self.collectors_test_dir, 'others')
+        c_files = [os.path.join(others, 'c_files', 'file1.c'),
+                   os.path.join(others, 'c_files', 'file2.c')]
+        self.assertEqual(
+            sorted(collect_files([os.path.join(others, '**', '*.c')],
+                                 snapshot=snapshot)),
+            c_files)
+        self.assertIn(os.path.join(others, 'c_files'), snapshot.directories)
+
+        with unittest.mock.patch('os.scandir') as scandir:
+            self.assertEqual(
+                sorted(collect_files([os.path.join(others, '*', '*.c')],
+                                     snapshot=snapshot)),
+                c_files)
+            self.assertFalse(scandir.called)
+
+    def test_use_gitignore(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for names in (('.git',), ('build',), ('src',)):
+                os.makedirs(os.path.join(directory, *names))
+            for names, contents in ((('.gitignore',), 'build/\n*.pyc\n'),
+                                    (('build', 'a.py'), ''),
+                                    (('src', 'a.py'), ''),
+                                    (('src', 'a.pyc'), '')):
+                with open(os.path.join(directory, *names), 'w') as file:
+                    file.write(contents)
+
+            snapshot = FileSystemSnapshot()
+            self.assertEqual(
+                sorted(collect_files([os.path.join(directory, '**')],
+                                     snapshot=snapshot,
+                                     use_gitignore=True)),
+                [os.path.join(directory, '.gitignore'),
+                 os.path.join(directory, 'src', 'a.py')])
+            # Ignored directories aren't read
+            self.assertNotIn(os.path.join(directory, 'build'),
+                             snapshot.directories)
+            self.assertNotIn(os.path.join(directory, '.git'),
+                             snapshot.directories)
+
+            self.assertEqual(
+                len(collect_files([os.path.join(directory, '**')])), 4)
+
     def test_trailing_globstar(self):
         ignore_path1 = os.path.join(self.collectors_test_dir,
                                     'others',
@@ -0,0 +1,134 @@
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock
+
+from coalib.collecting.FileSystemSnapshot import (
+    DIRECTORY, FILE, FileSystemSnapshot)
+from coalib.parsing.Globbing import glob
+
+
+class FileSystemSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        os.makedirs(os.path.join(self.root, 'sub', 'subsub'))
+        for name in ('a.py', os.path.join('sub', 'b.py'),
+                     os.path.join('sub', 'subsub', 'c.py')):
+            with open(os.path.join(self.root, name), 'w'):
+                pass
+        self.uut = FileSystemSnapshot()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, *names):
+        return os.path.join(self.root, *names)
+
+    def test_listdir(self):
+        self.assertEqual(sorted(self.uut.listdir(self.root)),
+                         ['a.py', 'sub'])
+        self.assertEqual(sorted(self.uut.list_entries(self.path('sub'))),
+                         [('b.py', False), ('subsub', True)])
+        self.assertRaises(OSError, self.uut.listdir, self.path('missing'))
+        self.assertRaises(NotADirectoryError,
+                          self.uut.listdir, self.path('a.py'))
+
+    def test_kinds(self):
+        self.assertEqual(self.uut.get_kind(self.path('a.py')), FILE)
+        self.assertEqual(self.uut.get_kind(self.path('sub', '')), DIRECTORY)
+        self.assertEqual(self.uut.get_kind(self.root), DIRECTORY)
+        self.assertIsNone(self.uut.get_kind(self.path('a.py', 'x')))
+
+        self.assertTrue(self.uut.isfile(self.path('sub', 'b.py')))
+        self.assertFalse(self.uut.isfile(self.path('sub')))
+        self.assertTrue(self.uut.isdir(self.path('sub', 'subsub')))
+        self.assertFalse(self.uut.isdir(self.path('a.py')))
+        self.assertTrue(self.uut.exists(self.path('sub', '..', 'a.py')))
+        self.assertFalse(self.uut.exists(self.path('missing')))
+        self.assertFalse(self.uut.exists(self.path('missing', 'a.py')))
+
+    def test_directories_read_once(self):
+        scandir = os.scandir
+        scanned = []
+
+        def scandir_logged(path):
+            scanned.append(path)
+            return scandir(path)
+
+        with unittest.mock.patch('os.scandir', scandir_logged):
+            for _ in range(2):
+                self.assertEqual(
+                    sorted(glob(self.path('**', '*.py'),
+                                snapshot=self.uut)),
+                    [self.path('a.py'),
+                     self.path('sub', 'b.py'),
+                     self.path('sub', 'subsub', 'c.py')])
+                self.assertTrue(self.uut.isfile(self.path('sub', 'b.py')))
+
+        # Files aren't read as directories either
+        self.assertEqual(sorted(scanned),
+                         [self.root,
+                          self.path('sub'),
+                          self.path('sub', 'subsub')])
+
+    def test_changes_not_seen(self):
+        self.assertFalse(self.uut.exists(self.path('new.py')))
+        with open(self.path('new.py'), 'w'):
+            pass
+        self.assertFalse(self.uut.exists(self.path('new.py')))
+        self.assertTrue(FileSystemSnapshot().exists(self.path('new.py')))
+
+    def set_modified(self, *names, age=60):
+        modified = time.time() - age
+        os.utime(self.path(*names), (modified, modified))
+
+    def test_previous_listings(self):
+        for names in ((), ('sub',), ('sub', 'subsub')):
+            self.set_modified(*names)
+        listings = {}
+        self.assertEqual(
+            sorted(glob(self.path('**', '*.py'),
+                        snapshot=FileSystemSnapshot(listings))),
+            [self.path('a.py'),
+             self.path('sub', 'b.py'),
+             self.path('sub', 'subsub', 'c.py')])
+        self.assertEqual(len(listings), 3)
+
+        os.remove(self.path('sub', 'b.py'))
+        modified = os.stat(self.path('sub', 'subsub')).st_mtime_ns
+        with open(self.path('sub', 'subsub', 'd.py'), 'w'):
+            pass
+        # Only the modification times tell of changes
+        os.utime(self.path('sub', 'subsub'), ns=(modified, modified))
+
+        scandir = os.scandir
+        scanned = []
+
+        def scandir_logged(path):
+            scanned.append(path)
+            return scandir(path)
+
+        new_listings = {}
+        with unittest.mock.patch('os.scandir', scandir_logged):
+            self.assertEqual(
+                sorted(glob(self.path('**', '*.py'),
+                            snapshot=FileSystemSnapshot(new_listings,
+                                                        listings))),
+                [self.path('a.py'),
+                 self.path('sub', 'subsub', 'c.py')])
+        self.assertEqual(scanned, [self.path('sub')])
+        self.assertEqual(new_listings.keys(), listings.keys())
+
+    def test_racy_listings(self):
+        listings = {}
+        FileSystemSnapshot(listings).listdir(self.root)
+        with open(self.path('new.py'), 'w'):
+            pass
+        # Modified right after it was read, likely with the same
+        # modification time on coarse filesystems
+        self.set_modified(age=0)
+        self.assertIn('new.py',
+                      FileSystemSnapshot({}, listings).listdir(self.root))
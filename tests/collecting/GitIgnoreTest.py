@@ -0,0 +1,148 @@
+import os
+import re
+import tempfile
+import unittest
+
+from coalib.collecting.FileSystemSnapshot import FileSystemSnapshot
+from coalib.collecting.GitIgnore import (
+    GitIgnore, GitIgnoreRules, translate_gitignore_pattern)
+
+
+class TranslateGitIgnorePatternTest(unittest.TestCase):
+
+    def _test_pattern(self, pattern, matches, non_matches):
+        regex = re.compile(translate_gitignore_pattern(pattern))
+        for path in matches:
+            self.assertTrue(regex.match(path), (pattern, path))
+        for path in non_matches:
+            self.assertFalse(regex.match(path), (pattern, path))
+
+    def test_names(self):
+        self._test_pattern('*.py', ['a.py', 'a/b.py', '.py'],
+                           ['a.pyc', 'a.py/b'])
+        self._test_pattern('a?c', ['abc', 'x/abc'], ['a/c', 'ac'])
+        self._test_pattern('[ab].c', ['a.c', 'b.c'], ['c.c', '[.c'])
+        self._test_pattern('[!ab].c', ['c.c'], ['a.c', '/.c'])
+        self._test_pattern('[ab', ['[ab', 'x/[ab'], ['a'])
+
+    def test_anchored(self):
+        self._test_pattern('/a.py', ['a.py'], ['b/a.py'])
+        self._test_pattern('a/*.py', ['a/b.py'], ['b/a/b.py', 'a/b/c.py'])
+
+    def test_globstar(self):
+        self._test_pattern('**/a', ['a', 'b/a', 'b/c/a'], ['ba'])
+        self._test_pattern('a/**', ['a/b', 'a/b/c'], ['a', 'b/a/c'])
+        self._test_pattern('a/**/b', ['a/b', 'a/x/b', 'a/x/y/b'], ['a/xb'])
+        self._test_pattern('a**b', ['ab', 'axb'], ['a/b'])
+
+    def test_escapes(self):
+        self._test_pattern('\\*', ['*'], ['a'])
+        self._test_pattern('\\#a', ['#a'], ['a'])
+
+
+class GitIgnoreRulesTest(unittest.TestCase):
+
+    def test_last_rule_decides(self):
+        uut = GitIgnoreRules(['*.log', '!keep.log', 'keep.log\n'])
+        self.assertTrue(uut.match('keep.log', lambda: False))
+        uut = GitIgnoreRules(['*.log', '!keep.log'])
+        self.assertFalse(uut.match('keep.log', lambda: False))
+        self.assertTrue(uut.match('other.log', lambda: False))
+        self.assertIsNone(uut.match('a.py', lambda: False))
+
+    def test_directory_only(self):
+        uut = GitIgnoreRules(['*', '!build/', 'build/'])
+
+        def fail():
+            raise AssertionError('The kind of the path is not needed')
+        self.assertTrue(uut.match('a', fail))
+        self.assertTrue(uut.match('build', lambda: True))
+        self.assertTrue(uut.match('build', lambda: False))
+        self.assertIsNone(GitIgnoreRules(['a/']).match('a', lambda: False))
+
+    def test_comments_and_spaces(self):
+        uut = GitIgnoreRules(['# a', '', 'b  ', 'c\\ ', '\\#d', '/'])
+        self.assertEqual(len(uut.rules), 3)
+        self.assertTrue(uut.match('b', lambda: False))
+        self.assertTrue(uut.match('c ', lambda: False))
+        self.assertTrue(uut.match('#d', lambda: False))
+        self.assertIsNone(uut.match('# a', lambda: False))
+        self.assertIsNone(GitIgnoreRules([]).match('a', lambda: False))
+
+
+class GitIgnoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, 'repo')
+        os.makedirs(self.path('.git', 'info'))
+        os.makedirs(self.path('sub', 'build'))
+        os.makedirs(self.path('out'))
+        self.write(['*.log', '!important.log', 'build/', '/out'],
+                   '.gitignore')
+        self.write(['*.tmp'], '.git', 'info', 'exclude')
+        self.write(['!*.tmp', 'local.py'], 'sub', '.gitignore')
+        self.uut = GitIgnore(FileSystemSnapshot())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, *names):
+        return os.path.join(self.root, *names)
+
+    def write(self, lines, *names):
+        with open(self.path(*names), 'w') as file:
+            file.writelines(line + '\n' for line in lines)
+
+    def test_ignores(self):
+        for names in (('a.log',),
+                      ('sub', 'a.log'),
+                      ('a.tmp',),
+                      ('sub', 'build'),
+                      ('sub', 'local.py'),
+                      ('out',),
+                      ('.git',),
+                      ('.git', 'config')):
+            self.assertTrue(self.uut.ignores(self.path(*names)), names)
+
+        for names in (('a.py',),
+                      ('important.log',),
+                      ('sub', 'a.tmp'),
+                      ('local.py',),
+                      ('sub', 'out'),
+                      ('sub',),
+                      ()):
+            self.assertFalse(self.uut.ignores(self.path(*names)), names)
+
+    def test_ignored_directories(self):
+        self.write(['!important.log'], 'sub', 'build', '.gitignore')
+        self.write([], 'build')
+        # Files in ignored directories can't be included again
+        self.assertTrue(self.uut.ignores(
+            self.path('sub', 'build', 'important.log')))
+        self.assertTrue(self.uut.ignores(self.path('out', 'a', 'b.py')))
+        # Files named like ignored directories aren't ignored
+        self.assertFalse(self.uut.ignores(self.path('build')))
+        self.assertTrue(self.uut.ignores(self.path('sub', 'build')))
+
+    def test_outside_repository(self):
+        path = os.path.join(self.directory.name, 'a.log')
+        self.write(['*.log'], '..', '.gitignore')
+        self.assertFalse(self.uut.ignores(path))
+        self.assertIsNone(self.uut.get_levels(self.directory.name))
+
+    def test_git_file(self):
+        # Submodules and worktrees refer to their git directory
+        git_dir = os.path.join(self.directory.name, 'gitdir')
+        os.makedirs(os.path.join(git_dir, 'info'))
+        with open(os.path.join(git_dir, 'info', 'exclude'), 'w') as file:
+            file.write('*.c\n')
+        module = self.path('module')
+        os.makedirs(module)
+        with open(os.path.join(module, '.git'), 'w') as file:
+            file.write('gitdir: ../../gitdir\n')
+
+        self.assertTrue(self.uut.ignores(os.path.join(module, 'a.c')))
+        # The rules of the outer repository don't apply
+        self.assertFalse(self.uut.ignores(os.path.join(module, 'a.log')))
+        self.assertTrue(self.uut.ignores(self.path('a.log')))
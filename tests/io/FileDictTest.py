@@ -0,0 +1,120 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from testfixtures import LogCapture, StringComparison
+
+from coalib.io.File import File
+from coalib.io.FileDict import FileDict
+
+
+class FileDictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.text = self.create_file('text', b'a\nb\n')
+        self.binary = self.create_file('binary', b'\xff\n')
+        self.uut = FileDict({filename: File(filename)
+                             for filename in (self.text, self.binary)})
+
+    def create_file(self, name, contents):
+        filename = os.path.join(self.directory, name)
+        with open(filename, 'wb') as file:
+            file.write(contents)
+        return filename
+
+    def test_lazy(self):
+        with open(self.text, 'w') as file:
+            file.write('changed\n')
+
+        # The file is read once it's accessed
+        self.assertEqual(self.uut[self.text], ('changed\n',))
+
+    def test_left_out(self):
+        with LogCapture() as capture:
+            self.assertRaises(KeyError, self.uut.__getitem__, self.binary)
+        capture.check(
+            ('root', 'WARNING',
+             f"Failed to read file '{self.binary}'. It seems to contain "
+             'non-unicode characters. Leaving it out.'))
+        # Reading a file doesn't remove it, loading the dictionary does
+        self.assertIn(self.binary, self.uut)
+        with LogCapture():
+            self.uut.load()
+        self.assertNotIn(self.binary, self.uut)
+
+    def test_removed_file(self):
+        os.remove(self.text)
+        with LogCapture() as capture:
+            self.assertRaises(KeyError, self.uut.__getitem__, self.text)
+        capture.check(
+            ('root', 'WARNING', StringComparison(
+                f".*Failed to read file '{self.text}' because of an unknown "
+                'error.*')),
+            ('root', 'INFO', StringComparison(r'.*Exception was:.*')))
+        self.assertIn(self.text, self.uut)
+        with LogCapture():
+            self.uut.load()
+        self.assertNotIn(self.text, self.uut)
+
+    def test_iterate(self):
+        # Indexing while iterating doesn't change the dictionary
+        with LogCapture():
+            contents = {}
+            for filename in self.uut:
+                try:
+                    contents[filename] = self.uut[filename]
+                except KeyError:
+                    pass
+        self.assertEqual(contents, {self.text: ('a\n', 'b\n')})
+        self.assertEqual(len(self.uut), 2)
+
+        with LogCapture():
+            self.uut.load()
+        self.assertEqual(len(self.uut), 1)
+        self.assertEqual(list(self.uut.keys()), [self.text])
+        self.assertEqual({filename: self.uut[filename]
+                          for filename in self.uut},
+                         {self.text: ('a\n', 'b\n')})
+
+    def test_raw_files(self):
+        uut = FileDict(self.uut, allow_raw_files=True)
+        self.assertIsNone(uut[self.binary])
+        self.assertIn(self.binary, uut)
+
+    def test_load(self):
+        nul = self.create_file('nul', b'a\0b\n')
+        self.uut[nul] = File(nul)
+        with LogCapture() as capture:
+            self.uut.load(thread_count=2)
+        self.assertEqual(dict((filename, self.uut[filename])
+                              for filename in self.uut),
+                         {self.text: ('a\n', 'b\n')})
+        self.assertIn(('root', 'DEBUG', StringComparison(
+                           r'Read 3 files in .*s, decoded them in .*s\.')),
+                      capture.actual())
+
+        # Files are loaded only once
+        with LogCapture() as capture:
+            self.uut.load()
+        capture.check()
+
+    def test_subset(self):
+        subset = self.uut.subset([self.text, 'non_existent_file'])
+        self.assertIsInstance(subset, FileDict)
+        self.assertEqual(list(subset), [self.text])
+        self.assertIs(dict.__getitem__(subset, self.text),
+                      dict.__getitem__(self.uut, self.text))
+
+        raw_subset = FileDict(allow_raw_files=True).subset([])
+        self.assertTrue(raw_subset.allow_raw_files)
+
+    def test_pickle(self):
+        uut = pickle.loads(pickle.dumps(FileDict(self.uut,
+                                                 allow_raw_files=True)))
+        self.assertIsInstance(uut, FileDict)
+        self.assertTrue(uut.allow_raw_files)
+        self.assertEqual(uut[self.text], ('a\n', 'b\n'))
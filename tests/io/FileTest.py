@@ -1,7 +1,9 @@
 import os
+import pickle
+import tempfile
 import unittest
 
-from coalib.io.File import File
+from coalib.io.File import BINARY_SNIFF_SIZE, File
 
 TEST_FILE_DIR = os.path.join(os.path.split(__file__)[0],
                              'file_test_files')
@@ -56,3 +58,38 @@ class FileTest(unittest.TestCase):
     def test_name(self):
         self.assertEqual(get_path_components(self.uut.name)[-4:],
                          ['tests', 'io', 'file_test_files', 'test1.txt'])
+
+    def test_pickle(self):
+        self.uut.lines
+        unpickled = pickle.loads(pickle.dumps(self.uut))
+        self.assertEqual(unpickled, self.uut)
+        # The contents are read again
+        self.assertNotIn('lines', vars(unpickled))
+        self.assertEqual(unpickled.lines, self.uut.lines)
+
+    def test_binary(self):
+        self.assertFalse(self.uut.binary)
+
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            file.write(b'a' * (BINARY_SNIFF_SIZE - 1) + b'\0')
+        self.addCleanup(os.remove, file.name)
+        binary = File(file.name)
+        self.assertTrue(binary.binary)
+        self.assertNotIn('raw', vars(binary))
+        self.assertEqual(len(binary.raw), BINARY_SNIFF_SIZE)
+
+        with open(file.name, 'ab') as fp:
+            fp.write(b'\0')
+        read_file = File(file.name)
+        read_file.raw
+        self.assertTrue(read_file.binary)
+
+    def test_nul_byte_decoded(self):
+        # Files with NUL bytes are valid UTF-8, only loaders leave them out
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            file.write(b'a\0b\n\xc3\xa4\n')
+        self.addCleanup(os.remove, file.name)
+        uut = File(file.name)
+        self.assertTrue(uut.binary)
+        self.assertEqual(uut.string, 'a\0b\n\xe4\n')
+        self.assertEqual(uut.lines, ('a\0b\n', '\xe4\n'))
@@ -1,16 +1,23 @@
-import unittest
+import hashlib
 import os
-from unittest.mock import patch
+import time
+import unittest
+import unittest.mock
 
 from pyprint.NullPrinter import NullPrinter
 from pyprint.ConsolePrinter import ConsolePrinter
 
+from coalib.bears.LocalBear import LocalBear
 from coalib.misc.Caching import (
-    FileCache, FileDictFileCache, ProxyMapFileCache)
+    FileCache, FileDictFileCache, ProxyMapFileCache, ResultCache)
 from coalib.processes.Processing import get_file_dict
 from coalib.io.FileProxy import (FileProxy, FileProxyMap)
 from coalib.misc.CachingUtilities import pickle_load, pickle_dump
 from coalib.output.printers.LogPrinter import LogPrinter
+from coalib.results.Diff import Diff
+from coalib.results.Result import Result
+from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
 from coalib import coala
 from coalib.coala_main import run_coala
 from coala_utils.ContextManagers import make_temp, prepare_file
@@ -50,33 +57,127 @@ class CachingTest(unittest.TestCase):
         self.cache.write()
         self.assertNotEqual(self.cache.data['test2.c'], -1)
 
-    @patch('coalib.misc.Caching.os')
-    def test_get_uncached_files(self, mock_os):
-        file_path = os.path.join(self.caching_test_dir, 'test.c')
-        cache = FileCache(self.log_printer, 'coala_test3', flush_cache=True)
-
-        # Since this is a new FileCache object, the return must be the full set
-        cache.current_time = 0
-        mock_os.path.getmtime.return_value = 0
-        self.assertEqual(cache.get_uncached_files({file_path}), {file_path})
-
-        cache.track_files({file_path})
-        self.assertEqual(cache.get_uncached_files({file_path}), {file_path})
-
-        cache.write()
-        self.assertEqual(cache.get_uncached_files({file_path}), set())
-
-        # Simulate changing the file and then getting uncached files
-        # Since the file has been edited since the last run it's returned
-        cache.current_time = 1
-        mock_os.path.getmtime.return_value = 1
-        cache.track_files({file_path})
-        self.assertEqual(cache.get_uncached_files({file_path}), {file_path})
-        cache.write()
-
-        # Not changing the file should NOT return it the next time
-        cache.current_time = 2
-        self.assertEqual(cache.get_uncached_files({file_path}), set())
+    def test_get_uncached_files(self):
+        with prepare_file(['a\n'], None) as (_, file_path):
+            cache = FileCache(self.log_printer, 'coala_test3',
+                              flush_cache=True)
+
+            # Since this is a new FileCache object, the return must be the full
+            # set
+            self.assertEqual(cache.get_uncached_files({file_path}),
+                             {file_path})
+
+            cache.track_files({file_path})
+            self.assertEqual(cache.get_uncached_files({file_path}),
+                             {file_path})
+
+            cache.write()
+            self.assertEqual(cache.get_uncached_files({file_path}), set())
+
+            # Simulate changing the file and then getting uncached files
+            # Since the file has been edited since the last run it's returned
+            with open(file_path, 'w') as file:
+                file.write('b\nc\n')
+            self.assertEqual(cache.get_uncached_files({file_path}),
+                             {file_path})
+            cache.write()
+
+            # Not changing the file should NOT return it the next time
+            cache = FileCache(self.log_printer, 'coala_test3')
+            self.assertEqual(cache.get_uncached_files({file_path}), set())
+
+    def test_get_uncached_files_same_size_edit(self):
+        with prepare_file(['a\n'], None) as (_, file_path):
+            cache = FileCache(self.log_printer, 'coala_test3',
+                              flush_cache=True)
+            cache.track_files({file_path})
+            cache.get_uncached_files({file_path})
+            cache.write()
+
+            # An edit within the same timestamp granularity that keeps the
+            # size of the file is detected through the content digest
+            stat = os.stat(file_path)
+            with open(file_path, 'w') as file:
+                file.write('b\n')
+            os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+            cache = FileCache(self.log_printer, 'coala_test3')
+            self.assertEqual(cache.get_uncached_files({file_path}),
+                             {file_path})
+
+    def test_get_uncached_files_touched(self):
+        with prepare_file(['a\n'], None) as (_, file_path):
+            cache = FileCache(self.log_printer, 'coala_test3',
+                              flush_cache=True)
+            cache.track_files({file_path})
+            cache.get_uncached_files({file_path})
+            cache.write()
+
+            # Touching the file (e.g. through a checkout) doesn't change it
+            stat = os.stat(file_path)
+            os.utime(file_path, ns=(stat.st_atime_ns,
+                                    stat.st_mtime_ns + 10**10))
+
+            cache = FileCache(self.log_printer, 'coala_test3')
+            self.assertEqual(cache.get_uncached_files({file_path}), set())
+            cache.write()
+            self.assertEqual(cache.stats[file_path][1],
+                             stat.st_mtime_ns + 10**10)
+
+    def test_file_modified_during_run(self):
+        with prepare_file(['a\n'], None) as (_, file_path):
+            cache = FileCache(self.log_printer, 'coala_test3',
+                              flush_cache=True)
+            cache.track_files({file_path})
+            cache.get_uncached_files({file_path})
+
+            with open(file_path, 'w') as file:
+                file.write('b\nc\n')
+            cache.write()
+
+            cache = FileCache(self.log_printer, 'coala_test3')
+            self.assertEqual(cache.get_uncached_files({file_path}),
+                             {file_path})
+
+    def test_get_digests(self):
+        with prepare_file(['a\n'], None) as (_, file_path):
+            cache = FileCache(self.log_printer, 'coala_test3',
+                              flush_cache=True)
+            cache.track_files({file_path})
+            cache.get_uncached_files({file_path})
+            with unittest.mock.patch.object(
+                    FileCache, '_get_digest',
+                    wraps=FileCache._get_digest) as get_digest:
+                digests = cache.get_digests([file_path, 'missing.py'])
+                self.assertEqual(cache.get_digests([file_path]), digests)
+                cache.write()
+                # Files are hashed once per run
+                self.assertEqual(get_digest.call_count, 1)
+            stat = os.stat(file_path)
+            self.assertEqual(digests, {file_path: cache.stats[file_path]})
+            self.assertEqual(cache.stats[file_path][:2],
+                             (stat.st_size, stat.st_mtime_ns))
+
+            # The digests of unchanged files are known from the last run
+            cache = FileCache(self.log_printer, 'coala_test3')
+            with unittest.mock.patch.object(FileCache,
+                                            '_get_digest') as get_digest:
+                self.assertEqual(cache.get_digests([file_path]), digests)
+                get_digest.assert_not_called()
+
+        proxy_cache = ProxyMapFileCache(self.log_printer, 'coala_test3')
+        self.assertEqual(proxy_cache.get_digests([__file__]), {})
+
+    def test_get_uncached_files_legacy_data(self):
+        with prepare_file(['a\n'], None) as (_, file_path):
+            pickle_dump(self.log_printer, 'coala_test4',
+                        {'time': int(os.path.getmtime(file_path)),
+                         'files': {file_path: int(os.path.getmtime(file_path)),
+                                   'deleted.c': 0}})
+            cache = FileCache(self.log_printer, 'coala_test4')
+            self.assertEqual(cache.get_uncached_files({file_path}), set())
+            self.assertEqual(cache.get_uncached_files({'deleted.c'}),
+                             {'deleted.c'})
 
     def test_persistence(self):
         with FileCache(self.log_printer, 'test3', flush_cache=True) as cache:
@@ -86,6 +187,55 @@ class CachingTest(unittest.TestCase):
         with FileCache(self.log_printer, 'test3', flush_cache=False) as cache:
             self.assertTrue('file.c' in cache.data)
 
+    def test_timings(self):
+        cache = FileCache(self.log_printer, 'coala_test_timings',
+                          flush_cache=True)
+        cache.track_files({'a.c', 'b.c'})
+        cache.record_timings('a.c', {'ABear': 1.5, 'BBear': 0.5}, 10)
+        cache.record_timings('a.c', {'ABear': 2}, 20)
+        cache.record_timings('b.c', {'ABear': 1}, 5)
+        cache.record_timings('c.c', {'ABear': 1}, 5)
+        cache.untrack_files({'b.c'})
+        cache.write()
+
+        expected = {'a.c': {'ABear': (2, 20), 'BBear': (0.5, 10)},
+                    'b.c': {'ABear': (1, 5)}}
+        self.assertEqual(cache.timings, expected)
+        cache = FileCache(self.log_printer, 'coala_test_timings',
+                          flush_cache=False)
+        self.assertEqual(cache.timings, expected)
+
+        cache.flush_cache()
+        self.assertEqual(cache.timings, {})
+
+    def test_directory_listings(self):
+        directory = os.path.abspath(os.path.join(self.caching_test_dir, '..'))
+        cache = FileCache(self.log_printer, 'coala_test_directories',
+                          flush_cache=True)
+        self.assertIn('CachingTest.py', cache.get_snapshot().listdir(directory))
+        cache.write()
+
+        cache = FileCache(self.log_printer, 'coala_test_directories',
+                          flush_cache=False)
+        self.assertIn(os.path.normcase(directory), cache.directories)
+        self.assertIn('CachingTest.py', cache.get_snapshot().listdir(directory))
+
+        cache.flush_cache()
+        self.assertEqual(cache.directories, {})
+
+    def test_pruned_on_write(self):
+        cache = FileCache(self.log_printer, 'coala_test_prune',
+                          flush_cache=True)
+        with unittest.mock.patch.object(ResultCache, 'prune') as prune:
+            cache.write()
+            cache.write()
+            self.assertEqual(prune.call_count, 1)
+
+        cache = FileCache(self.log_printer, 'coala_test_prune')
+        with unittest.mock.patch.object(ResultCache, 'prune') as prune:
+            cache.write()
+            self.assertFalse(prune.called)
+
     def test_time_travel(self):
         cache = FileCache(self.log_printer, 'coala_test2', flush_cache=True)
         cache.track_files({'file.c'})
@@ -184,6 +334,138 @@ class CachingTest(unittest.TestCase):
                 stderr)
 
 
+class CachedTestBear(LocalBear):
+
+    def run(self, filename, file, max_line_length: int = 80):
+        return []
+
+
+class DependentCachedTestBear(LocalBear):
+
+    BEAR_DEPS = {CachedTestBear}
+
+    def run(self, filename, file, dependency_results=None):
+        return []
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.section = Section('test')
+        self.cache = ResultCache('coala_test', flush_cache=True)
+        self.bear = CachedTestBear(self.section, None)
+        self.results = [Result.from_values('CachedTestBear', 'msg', 'a.py')]
+
+    def test_store_and_get_results(self):
+        self.assertIsNone(self.cache.get_results('a.py', ('a\n',), self.bear))
+
+        self.cache.store_results('a.py', ('a\n',), self.bear, self.results)
+        self.assertEqual(self.cache.get_results('a.py', ('a\n',), self.bear),
+                         self.results)
+        self.assertIsNone(self.cache.get_results('b.py', ('a\n',), self.bear))
+        self.assertIsNone(self.cache.get_results('a.py', ('b\n',), self.bear))
+
+        # Results persist across instances
+        cache = ResultCache('coala_test')
+        self.assertEqual(cache.get_results('a.py', ('a\n',), self.bear),
+                         self.results)
+
+    def test_results_with_diffs(self):
+        file = ('a\n', 'b\n')
+        diff = Diff(file)
+        diff.modify_line(2, 'c\n')
+        self.cache.store_results('a.py', file, self.bear,
+                                 [Result('CachedTestBear', 'msg',
+                                         diffs={'a.py': diff})])
+
+        # The diffs can be used right away
+        result, = self.cache.get_results('a.py', file, self.bear)
+        self.assertEqual(result.diffs['a.py'].modified, ['a\n', 'c\n'])
+
+    def test_prune(self):
+        self.cache.store_results('a.py', ('a\n',), self.bear, self.results)
+        self.cache.store_results('b.py', ('b\n',), self.bear, self.results)
+        old = time.time() - ResultCache.MAX_AGE - 60
+        for path in (self.cache._get_path('a.py', ('a\n',), self.bear),
+                     self.cache._get_path('b.py', ('b\n',), self.bear)):
+            os.utime(path, (old, old))
+
+        # Using results keeps them
+        self.assertEqual(self.cache.get_results('a.py', ('a\n',), self.bear),
+                         self.results)
+        self.cache.prune()
+        self.assertEqual(self.cache.get_results('a.py', ('a\n',), self.bear),
+                         self.results)
+        self.assertIsNone(self.cache.get_results('b.py', ('b\n',), self.bear))
+
+    def test_digests(self):
+        with prepare_file(['a\n'], None) as (lines, filename):
+            stat = os.stat(filename)
+            self.cache.add_digests(
+                {filename: (stat.st_size, stat.st_mtime_ns, 'digest')})
+            self.cache.store_results(filename, tuple(lines), self.bear,
+                                     self.results)
+            # The lines aren't hashed while the file is unchanged
+            with unittest.mock.patch('coalib.misc.Caching.hashlib') as hash:
+                self.assertEqual(
+                    self.cache.get_results(filename, ('b\n',), self.bear),
+                    self.results)
+                hash.md5.assert_not_called()
+
+            with open(filename, 'w') as file:
+                file.write('ab\n')
+            self.assertIsNone(
+                self.cache.get_results(filename, ('ab\n',), self.bear))
+
+    def test_lines_hashed_once(self):
+        file = ('a\n',)
+        dependent_bear = DependentCachedTestBear(self.section, None)
+        with unittest.mock.patch('coalib.misc.Caching.hashlib',
+                                 wraps=hashlib) as hash:
+            for bear in (self.bear, dependent_bear, self.bear):
+                self.cache.store_results('a.py', file, bear, self.results)
+                self.cache.get_results('a.py', file, bear)
+            self.assertEqual(hash.md5.call_count, 1)
+
+    def test_flush_cache(self):
+        self.cache.store_results('a.py', ('a\n',), self.bear, self.results)
+
+        cache = ResultCache('coala_test', flush_cache=True)
+        self.assertIsNone(cache.get_results('a.py', ('a\n',), self.bear))
+
+        self.cache.store_results('a.py', ('a\n',), self.bear, self.results)
+        FileCache(None, 'coala_test', flush_cache=True)
+        self.assertIsNone(cache.get_results('a.py', ('a\n',), self.bear))
+
+    def test_bear_key(self):
+        key = self.cache.get_bear_key(CachedTestBear, self.section)
+        dependent_key = self.cache.get_bear_key(DependentCachedTestBear,
+                                                self.section)
+        self.assertNotEqual(key, dependent_key)
+
+        section = Section('test')
+        section.append(Setting('max_line_length', '100'))
+        self.assertNotEqual(self.cache.get_bear_key(CachedTestBear, section),
+                            key)
+        # Dependencies settings are taken into account
+        self.assertNotEqual(
+            self.cache.get_bear_key(DependentCachedTestBear, section),
+            dependent_key)
+
+        # Unrelated settings don't affect the key
+        section = Section('test')
+        section.append(Setting('unrelated', 'value'))
+        self.assertEqual(self.cache.get_bear_key(CachedTestBear, section),
+                         key)
+
+    def test_unpicklable_results(self):
+        results = [Result.from_values('CachedTestBear', 'msg', 'a.py',
+                                      debug_msg=lambda: None)]
+        with self.assertLogs(level='DEBUG'):
+            self.cache.store_results('a.py', ('a\n',), self.bear, results)
+        self.assertIsNone(self.cache.get_results('a.py', ('a\n',), self.bear))
+
+
 class FileDictFileCacheTest(unittest.TestCase):
 
     def setUp(self):
@@ -197,7 +197,8 @@ class ConsoleInteractionTest(unittest.TestCase):
 
     def tearDown(self):
         OpenEditorAction.is_applicable = self.old_open_editor_applicable
-        ApplyPatchAction.is_applicable = self.old_apply_patch_applicable
+        ApplyPatchAction.is_applicable = staticmethod(
+            self.old_apply_patch_applicable)
 
     def test_color_letter(self):
         line1 = '[  ] 1. (A)pply Patch'
@@ -473,7 +474,8 @@ class ConsoleInteractionTest(unittest.TestCase):
                     apply_path_desc = ApplyPatchAction().get_metadata().desc
                     self.assertEqual(sio.getvalue().count(apply_path_desc), 3)
 
-            ApplyPatchAction.is_applicable = old_applypatch_is_applicable
+            ApplyPatchAction.is_applicable = staticmethod(
+                old_applypatch_is_applicable)
 
     def test_acquire_actions_and_apply_single(self):
         with make_temp() as testfile_path:
@@ -528,7 +530,8 @@ class ConsoleInteractionTest(unittest.TestCase):
                     apply_path_desc = ApplyPatchAction().get_metadata().desc
                     self.assertEqual(sio.getvalue().count(apply_path_desc), 0)
 
-            ApplyPatchAction.is_applicable = old_applypatch_is_applicable
+            ApplyPatchAction.is_applicable = staticmethod(
+                old_applypatch_is_applicable)
 
     def test_acquire_action_and_apply_bear_actions(self):
         with make_temp() as testfile_path:
@@ -1,8 +1,9 @@
+import io
 import json
 import logging
 import unittest
 
-from coalib.output.Logging import configure_json_logging
+from coalib.output.Logging import JSONLinesWriter, configure_json_logging
 
 
 class LoggingTest(unittest.TestCase):
@@ -30,3 +31,21 @@ class LoggingTest(unittest.TestCase):
         self.assertEqual(logs_list[2]['level'], 'WARNING')
         self.assertEqual(logs_list[3]['message'], 'This is error log.')
         self.assertEqual(logs_list[3]['level'], 'ERROR')
+
+    def test_json_lines_logging(self):
+        stream = io.StringIO()
+        writer = JSONLinesWriter(stream)
+        self.assertIsNone(configure_json_logging(writer))
+
+        logging.info('This is info log.')
+        writer.write({'result': 'This is a result.'})
+        logging.error('This is error log.\n This is continued')
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]['message'], 'This is info log.')
+        self.assertEqual(lines[0]['level'], 'INFO')
+        self.assertEqual(lines[1], {'result': 'This is a result.'})
+        self.assertEqual(lines[2]['message'],
+                         'This is error log.\n This is continued')
+        self.assertEqual(lines[2]['level'], 'ERROR')
@@ -19,8 +19,8 @@ import re
 import unittest
 
 from coalib.parsing.Globbing import (
-    _iter_alternatives, _iter_choices, _position_is_bracketed, fnmatch, glob,
-    glob_escape)
+    _iter_alternatives, _iter_choices, _position_is_bracketed,
+    GlobSet, compile_ignore_globs, fnmatch, glob, glob_escape)
 
 
 class TestFiles:
@@ -230,6 +230,73 @@ class FnmatchTest(unittest.TestCase):
         self._test_fnmatch(pattern, matches, non_matches)
 
 
+class CompileIgnoreGlobsTest(unittest.TestCase):
+
+    def _test_ignored(self, globs, ignored, not_ignored):
+        pattern = compile_ignore_globs(tuple(globs))
+        for path in ignored:
+            self.assertTrue(pattern.match(os.path.normcase(path)), path)
+        for path in not_ignored:
+            self.assertFalse(pattern.match(os.path.normcase(path)), path)
+
+    def test_files(self):
+        self._test_ignored([os.path.join('a', '*.py'), 'b.c'],
+                           [os.path.join('a', 'b.py'), 'b.c'],
+                           ['a.py', os.path.join('a', 'b.c'), 'b.cc'])
+
+    def test_dirs(self):
+        vendor = os.path.join('a', 'vendor')
+        for ignored_glob in (vendor,
+                             vendor + os.sep,
+                             os.path.join(vendor, '**'),
+                             os.path.join('**', 'vendor', '**')):
+            self._test_ignored([ignored_glob],
+                               [os.path.join(vendor, 'b.py'),
+                                os.path.join(vendor, 'b', 'c')],
+                               [vendor + '2', os.path.join(vendor + '2', 'b'),
+                                os.path.join('a', 'b.py')])
+
+    def test_alternatives(self):
+        self._test_ignored(['(a|b)'],
+                           ['a', os.path.join('b', 'c')],
+                           ['c', 'ab'])
+
+    def test_empty(self):
+        self.assertIsNone(compile_ignore_globs(()))
+        self.assertIsNone(compile_ignore_globs(('',)))
+
+
+class GlobSetTest(unittest.TestCase):
+
+    def test_first_match(self):
+        uut = GlobSet(['*.py', 'a.(py|c)', 'b.c', '**', ''])
+        self.assertEqual(uut.match('a.py'), '*.py')
+        self.assertEqual(uut.match('a.c'), 'a.(py|c)')
+        self.assertEqual(uut.match('b.c'), 'b.c')
+        self.assertEqual(uut.match(os.path.join('b', 'c')), '**')
+        self.assertEqual(uut.match(''), '**')
+
+        # Names without wildcards are looked up first, but still give the
+        # first matching glob
+        uut = GlobSet(['*.c', 'b.c'])
+        self.assertEqual(uut.match('b.c'), '*.c')
+        uut = GlobSet(['b.c', '*.c'])
+        self.assertEqual(uut.match('b.c'), 'b.c')
+
+    def test_no_match(self):
+        uut = GlobSet([os.path.join('a', '*.py'), 'b'])
+        self.assertIsNone(uut.match(os.path.join('a', 'b', 'c.py')))
+        self.assertIsNone(uut.match('bb'))
+        self.assertIsNone(GlobSet([]).match('a'))
+
+    def test_many_globs(self):
+        globs = ['bear{}.*'.format(index) for index in range(1000)]
+        uut = GlobSet(globs + ['*bear'])
+        self.assertEqual(uut.match('bear999.x'), 'bear999.*')
+        self.assertEqual(uut.match('xbear'), '*bear')
+        self.assertIsNone(uut.match('xbear1'))
+
+
 class GlobTest(unittest.TestCase):
 
     def setUp(self):
@@ -331,6 +398,27 @@ class GlobTest(unittest.TestCase):
                      TestFiles.dir2]
         self._test_glob(pattern, file_list)
 
+    def test_collect_recursive_pruned(self):
+        pruned = []
+
+        def prune(path):
+            pruned.append(path)
+            return path == TestFiles.dir1
+
+        pattern = os.path.join(TestFiles.glob_test_dir, '**', '*')
+        results = [result for result in glob(pattern, prune)
+                   if re.search(r'(__pycache__|\.pyc)', result) is None]
+        self.assertEqual(sorted(results),
+                         sorted([TestFiles.file1,
+                                 TestFiles.file2,
+                                 TestFiles.file3,
+                                 TestFiles.file_paren,
+                                 TestFiles.file_brack,
+                                 TestFiles.dir1,
+                                 TestFiles.dir2]))
+        self.assertIn(TestFiles.dir2, pruned)
+        self.assertNotIn(TestFiles.file11, pruned)
+
     def test_collect_recursive_part_of_basename(self):
         pattern = os.path.join(TestFiles.glob_test_dir, '**.(py|[xy])')
         file_list = [TestFiles.file11,
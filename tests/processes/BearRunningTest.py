@@ -1,12 +1,15 @@
 import multiprocessing
+import os
 import queue
 import unittest
 
 from coalib.bears.GlobalBear import GlobalBear
 from coalib.bears.LocalBear import LocalBear
+from coalib.misc.Caching import ResultCache
 from coalib.processes.BearRunning import (
-    LOG_LEVEL, LogMessage, run, send_msg, task_done)
+    LOG_LEVEL, LogMessage, run, run_global_bears, send_msg, task_done)
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.ResultFilter import ResultFilter
 from coalib.results.Result import RESULT_SEVERITY, Result
 from coalib.settings.Section import Section
 from coalib.settings.Setting import Setting
@@ -92,6 +95,17 @@ class GlobalTestBear(GlobalBear):
         return result
 
 
+class CountingBear(LocalBear):
+
+    runs = 0
+
+    def run(self, filename, file):
+        CountingBear.runs += 1
+        return [Result.from_values('CountingBear',
+                                   'something went wrong',
+                                   filename)]
+
+
 class UnexpectedBear1(LocalBear):
 
     def run(self, filename, file):
@@ -114,6 +128,8 @@ class BearRunningUnitTest(unittest.TestCase):
         self.local_bear_list = []
         self.global_bear_list = []
         self.global_bear_queue = queue.Queue()
+        # No global bears are released
+        self.global_bear_queue.put(None)
         self.file_dict = {}
         manager = multiprocessing.Manager()
         self.local_result_dict = manager.dict()
@@ -151,8 +167,10 @@ class BearRunningUnitTest(unittest.TestCase):
         self.global_bear_list.append(DependentGlobalBear({},
                                                          self.settings,
                                                          self.message_queue))
-        self.global_bear_queue.put(1)
+        self.global_bear_queue = queue.Queue()
         self.global_bear_queue.put(0)
+        self.global_bear_queue.put(1)
+        self.global_bear_queue.put(None)
         self.file_name_queue.put('t')
         self.file_dict['t'] = []
 
@@ -173,6 +191,34 @@ class BearRunningUnitTest(unittest.TestCase):
         except queue.Empty:
             pass
 
+    def test_global_bears_not_released(self):
+        self.global_bear_list.append(SimpleGlobalBear({},
+                                                      self.settings,
+                                                      self.message_queue))
+        self.global_bear_queue = queue.Queue()
+
+        self.assertFalse(run_global_bears(self.message_queue,
+                                          0,
+                                          self.global_bear_queue,
+                                          self.global_bear_list,
+                                          self.global_result_dict,
+                                          self.control_queue,
+                                          wait=False))
+        self.assertTrue(self.control_queue.empty())
+
+        self.global_bear_queue.put(0)
+        self.global_bear_queue.put(None)
+        self.assertTrue(run_global_bears(self.message_queue,
+                                         0,
+                                         self.global_bear_queue,
+                                         self.global_bear_list,
+                                         self.global_result_dict,
+                                         self.control_queue))
+        self.assertEqual(self.control_queue.get(timeout=0),
+                         (CONTROL_ELEMENT.GLOBAL, 'SimpleGlobalBear'))
+        # The stop signal is left for other processes
+        self.assertIsNone(self.global_bear_queue.get(timeout=0))
+
     def test_evil_bear(self):
         self.settings.append(Setting('cls', 'NotImplementedError'))
 
@@ -265,6 +311,156 @@ class BearRunningUnitTest(unittest.TestCase):
             debug=False,
             )
 
+    def test_result_cache(self):
+        result_cache = ResultCache('coala_test_bear_running',
+                                   flush_cache=True)
+        self.local_bear_list.append(CountingBear(self.settings,
+                                                 self.message_queue))
+        self.file_dict['t'] = ('a\n',)
+        CountingBear.runs = 0
+
+        for _ in range(2):
+            self.file_name_queue.put('t')
+            run(self.file_name_queue,
+                self.local_bear_list,
+                self.global_bear_list,
+                self.global_bear_queue,
+                self.file_dict,
+                self.local_result_dict,
+                self.global_result_dict,
+                self.message_queue,
+                self.control_queue,
+                result_cache=result_cache)
+
+            self.assertEqual(self.local_result_dict['t'],
+                             [Result.from_values('CountingBear',
+                                                 'something went wrong',
+                                                 't')])
+        self.assertEqual(CountingBear.runs, 1)
+
+        # Changed contents invalidate the stored results
+        self.file_dict['t'] = ('b\n',)
+        self.file_name_queue.put('t')
+        run(self.file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.global_bear_queue,
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue,
+            result_cache=result_cache)
+        self.assertEqual(CountingBear.runs, 2)
+
+    def test_timings(self):
+        result_cache = ResultCache('coala_test_bear_running_timings',
+                                   flush_cache=True)
+        self.local_bear_list.append(CountingBear(self.settings,
+                                                 self.message_queue))
+        self.file_dict['t'] = ('a\n',)
+        timing_dict = {}
+
+        self.file_name_queue.put('t')
+        run(self.file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.global_bear_queue,
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue,
+            result_cache=result_cache,
+            timing_dict=timing_dict)
+        self.assertEqual(list(timing_dict['t']), ['CountingBear'])
+        self.assertGreaterEqual(timing_dict['t']['CountingBear'], 0)
+
+        # Cached results don't take any time to be worth recording
+        self.file_name_queue.put('t')
+        run(self.file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.global_bear_queue,
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue,
+            result_cache=result_cache,
+            timing_dict=timing_dict)
+        self.assertEqual(timing_dict['t'], {})
+
+    def test_bear_group_units(self):
+        self.local_bear_list.append(CountingBear(self.settings,
+                                                 self.message_queue))
+        self.local_bear_list.append(UnexpectedBear1(self.settings,
+                                                    self.message_queue))
+        self.file_dict['t'] = ('a\n',)
+        CountingBear.runs = 0
+
+        self.file_name_queue.put(('t', (0,)))
+        run(self.file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.global_bear_queue,
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue)
+
+        self.assertEqual(CountingBear.runs, 1)
+        self.assertEqual(self.control_queue.get(timeout=0),
+                         (CONTROL_ELEMENT.LOCAL, ('t', (0,))))
+        self.assertEqual(self.local_result_dict[('t', (0,))],
+                         [Result.from_values('CountingBear',
+                                             'something went wrong',
+                                             't')])
+        self.assertNotIn('t', self.local_result_dict)
+
+    def test_result_filter(self):
+        filename = os.path.abspath('t')
+        self.file_dict[filename] = ('a = 1  # Ignore FakeBear\n',)
+        self.local_bear_list.append(SimpleBear(self.settings,
+                                               self.message_queue))
+        self.local_bear_list.append(DependentBear(self.settings,
+                                                  self.message_queue))
+        self.global_bear_list.append(SimpleGlobalBear(self.file_dict,
+                                                      self.settings,
+                                                      self.message_queue))
+        self.global_bear_list.append(DependentGlobalBear(self.file_dict,
+                                                         self.settings,
+                                                         self.message_queue))
+        self.global_bear_list.append(GlobalTestBear(self.file_dict,
+                                                    self.settings,
+                                                    self.message_queue))
+        self.global_bear_queue = queue.Queue()
+        for bear_id in (0, 1, 2, None):
+            self.global_bear_queue.put(bear_id)
+        self.file_name_queue.put(filename)
+
+        run(self.file_name_queue,
+            self.local_bear_list,
+            self.global_bear_list,
+            self.global_bear_queue,
+            self.file_dict,
+            self.local_result_dict,
+            self.global_result_dict,
+            self.message_queue,
+            self.control_queue,
+            result_filter=ResultFilter(RESULT_SEVERITY.NORMAL,
+                                       {'SimpleGlobalBear'}))
+
+        # The result of FakeBear is ignored, DependentBear still got it
+        self.assertEqual([result.origin
+                          for result in self.local_result_dict[filename]],
+                         ['SimpleBear', 'SimpleBear'])
+        # Results of dependencies are kept for the depending bears
+        self.assertEqual(len(self.global_result_dict['SimpleGlobalBear']), 3)
+        # Only INFO results
+        self.assertIsNone(self.global_result_dict['GlobalTestBear'])
+
     def test_strange_bear(self):
         self.local_bear_list.append(UnexpectedBear1(self.settings,
                                                     self.message_queue))
@@ -331,6 +527,7 @@ d
         self.global_bear_list.append('not a valid bear')
         self.global_bear_queue.put(0)
         self.global_bear_queue.put(1)
+        self.global_bear_queue.put(None)
 
     def test_run(self):
         run(self.file_name_queue,
@@ -343,30 +540,20 @@ d
             self.message_queue,
             self.control_queue)
 
+        # Global bears released from the start are run first
         expected_messages = [LOG_LEVEL.DEBUG,
+                             LOG_LEVEL.WARNING,
+                             LOG_LEVEL.DEBUG,
                              LOG_LEVEL.ERROR,
                              LOG_LEVEL.DEBUG,
                              LOG_LEVEL.WARNING,
                              LOG_LEVEL.DEBUG,
                              LOG_LEVEL.WARNING,
                              LOG_LEVEL.ERROR,
-                             LOG_LEVEL.DEBUG,
-                             LOG_LEVEL.DEBUG,
-                             LOG_LEVEL.WARNING]
+                             LOG_LEVEL.DEBUG]
         for msg in expected_messages:
             self.assertEqual(msg, self.message_queue.get(timeout=0).log_level)
 
-        local_result_expected = [[],
-                                 [Result.from_values('LocalTestBear',
-                                                     'something went wrong',
-                                                     'arbitrary')]
-                                 ]
-        for expected in local_result_expected:
-            control_elem, index = self.control_queue.get()
-            self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
-            real = self.local_result_dict[index]
-            self.assertEqual(real, expected)
-
         global_results_expected = [Result.from_values(
                                        'GlobalTestBear',
                                        'Files are bad in general!',
@@ -378,18 +565,34 @@ d
                                        'arbitrary',
                                        severity=RESULT_SEVERITY.INFO)]
 
-        control_elem, index = self.control_queue.get()
-        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FINISHED)
         control_elem, index = self.control_queue.get()
         self.assertEqual(control_elem, CONTROL_ELEMENT.GLOBAL)
         real = self.global_result_dict[index]
         self.assertEqual(sorted(global_results_expected), sorted(real))
 
+        # Bears without results are reported as well, so the bears depending
+        # on them can be released.
+        self.assertEqual(self.control_queue.get(),
+                         (CONTROL_ELEMENT.GLOBAL, 'str'))
+        self.assertIsNone(self.global_result_dict['str'])
+
+        local_result_expected = [[],
+                                 [Result.from_values('LocalTestBear',
+                                                     'something went wrong',
+                                                     'arbitrary')]
+                                 ]
+        for expected in local_result_expected:
+            control_elem, index = self.control_queue.get()
+            self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL)
+            real = self.local_result_dict[index]
+            self.assertEqual(real, expected)
+
+        control_elem, index = self.control_queue.get()
+        self.assertEqual(control_elem, CONTROL_ELEMENT.LOCAL_FINISHED)
         control_elem, none = self.control_queue.get(timeout=0)
         self.assertEqual(control_elem, CONTROL_ELEMENT.GLOBAL_FINISHED)
         self.assertEqual(none, None)
 
-        # The invalid bear gets a None in that dict for dependency resolution
         self.assertEqual(len(self.global_result_dict), 2)
         self.assertEqual(len(self.local_result_dict),
                          len(local_result_expected))
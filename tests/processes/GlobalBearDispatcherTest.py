@@ -0,0 +1,92 @@
+import queue
+import unittest
+
+from testfixtures import LogCapture
+
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.processes.GlobalBearDispatcher import GlobalBearDispatcher
+from coalib.settings.Section import Section
+
+
+class ABear(GlobalBear):
+    pass
+
+
+class BBear(GlobalBear):
+    BEAR_DEPS = {ABear}
+
+
+class CBear(GlobalBear):
+    BEAR_DEPS = {ABear, BBear}
+
+
+class DBear(GlobalBear):
+    pass
+
+
+class GlobalBearDispatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = queue.Queue()
+
+    def get_released(self):
+        released = []
+        while not self.queue.empty():
+            released.append(self.queue.get())
+        return released
+
+    def instantiate(self, *bears):
+        return [bear({}, Section(''), queue.Queue()) for bear in bears]
+
+    def test_dependency_chain(self):
+        uut = GlobalBearDispatcher(
+            self.instantiate(CBear, BBear, ABear, DBear), self.queue)
+
+        uut.dispatch()
+        self.assertEqual(self.get_released(), [2, 3])
+
+        uut.finish('DBear')
+        self.assertEqual(self.get_released(), [])
+        uut.finish('ABear')
+        self.assertEqual(self.get_released(), [1])
+        uut.finish('BBear')
+        self.assertEqual(self.get_released(), [0])
+        uut.finish('CBear')
+        self.assertEqual(self.get_released(), [None])
+
+    def test_sequential(self):
+        uut = GlobalBearDispatcher(
+            self.instantiate(CBear, BBear, ABear), self.queue, sequential=True)
+        uut.dispatch()
+        self.assertEqual(self.get_released(), [2, 1, 0, None])
+
+    def test_no_global_bears(self):
+        uut = GlobalBearDispatcher([], self.queue)
+        uut.dispatch()
+        self.assertEqual(self.get_released(), [None])
+
+        # Processes are only stopped once
+        uut.stop()
+        self.assertEqual(self.get_released(), [])
+
+    def test_missing_dependency(self):
+        uut = GlobalBearDispatcher(self.instantiate(CBear, BBear, DBear),
+                                   self.queue)
+        with LogCapture() as capture:
+            uut.dispatch()
+        capture.check(
+            ('root', 'WARNING', 'CBear cannot be run because it depends on '
+                                'ABear which is not run.'),
+            ('root', 'WARNING', 'BBear cannot be run because it depends on '
+                                'ABear which is not run.'))
+
+        self.assertEqual(self.get_released(), [2])
+        uut.finish('DBear')
+        self.assertEqual(self.get_released(), [None])
+
+    def test_invalid_bear(self):
+        uut = GlobalBearDispatcher(['not a valid bear'], self.queue)
+        uut.dispatch()
+        self.assertEqual(self.get_released(), [0])
+        uut.finish('str')
+        self.assertEqual(self.get_released(), [None])
@@ -0,0 +1,76 @@
+import random
+import unittest
+
+from coalib.parsing.Globbing import fnmatch
+from coalib.processes.IgnoreRangeIndex import IgnoreRangeIndex
+from coalib.results.Result import Result
+from coalib.results.SourceRange import SourceRange
+
+
+def linear_check(result, ignore_ranges):
+    for bears, range in ignore_ranges:
+        orig = result.origin.lower().split(' ')[0]
+        if (result.overlaps(range) and
+                (len(bears) == 0 or orig in bears or fnmatch(orig, bears))):
+            return True
+
+    return False
+
+
+class IgnoreRangeIndexTest(unittest.TestCase):
+
+    def test_ignores(self):
+        uut = IgnoreRangeIndex([
+            (['pep8bear'], SourceRange.from_values('a.py', 5, 1, 6, 10)),
+            (['py*bear', 'c(lang|pp)bear'],
+             SourceRange.from_values('a.py', 20, 1, 30, 1))])
+        uut.extend([([], SourceRange.from_values('a.py', 1, 1, 2, 10))])
+
+        def ignores(origin, *args, **kwargs):
+            return uut.ignores(Result.from_values(origin, 'msg', 'a.py',
+                                                  *args, **kwargs))
+
+        self.assertTrue(ignores('AnyBear', 1))
+        self.assertTrue(ignores('AnyBear', 2, 5))
+        self.assertFalse(ignores('AnyBear', 3))
+        self.assertTrue(ignores('PEP8Bear (E501)', 6))
+        self.assertFalse(ignores('PEP8Bear', 6, 11))
+        self.assertFalse(ignores('PEP8Bear', 7))
+        self.assertTrue(ignores('PEP8Bear', 3, 1, 5, 1))
+        self.assertTrue(ignores('PyLintBear', 25))
+        self.assertTrue(ignores('CLangBear', 25))
+        self.assertFalse(ignores('CBear', 25))
+        self.assertFalse(ignores('PyLintBear', 30, 2))
+        # Results without line cover the whole file
+        self.assertTrue(ignores('PyLintBear'))
+        self.assertFalse(uut.ignores(Result('AnyBear', 'msg')))
+        self.assertFalse(uut.ignores(
+            Result.from_values('AnyBear', 'msg', 'b.py', 1)))
+
+    def test_same_as_linear_check(self):
+        rand = random.Random(4)
+        bear_lists = [[], ['abear'], ['bbear', 'c*'], ['(a|b)bear']]
+        ignore_ranges = []
+        for _ in range(300):
+            start = rand.randint(1, 200)
+            end = start + rand.choice([0, 1, 1, 1, 5, 50])
+            ignore_ranges.append((
+                rand.choice(bear_lists),
+                SourceRange.from_values(rand.choice(['a.py', 'b.py']),
+                                        start, 1, end, rand.randint(1, 80))))
+        uut = IgnoreRangeIndex(ignore_ranges)
+
+        for _ in range(1000):
+            line = rand.randint(1, 260)
+            position = rand.choice([(),
+                                    (line,),
+                                    (line, rand.randint(1, 80)),
+                                    (line, 1, line + rand.randint(0, 10), 80)])
+            result = Result.from_values(
+                rand.choice(['ABear', 'BBear', 'CBear', 'DBear']),
+                'msg',
+                rand.choice(['a.py', 'b.py', 'c.py']),
+                *position)
+            self.assertEqual(uut.ignores(result),
+                             linear_check(result, ignore_ranges),
+                             result.affected_code)
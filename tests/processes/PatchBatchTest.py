@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+from testfixtures import LogCapture
+
+from coalib.processes.PatchBatch import PatchBatch
+from coalib.results.Diff import ConflictError, Diff
+from coalib.results.Result import Result
+
+
+class PatchBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'f')
+        self.file = ['{}\n'.format(line_nr) for line_nr in range(1, 6)]
+        with open(self.filename, 'w') as file:
+            file.writelines(self.file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def result(self, line_nr, replacement, **kwargs):
+        diff = Diff(self.file, **kwargs)
+        diff.modify_line(line_nr, replacement)
+        return Result('Bear', 'msg', diffs={self.filename: diff})
+
+    def read(self, filename):
+        with open(filename) as file:
+            return file.readlines()
+
+    def test_add_and_write(self):
+        uut = PatchBatch()
+        file_diff_dict = {}
+        first = self.result(1, 'a\n')
+        uut.add(first, file_diff_dict)
+        uut.add(self.result(3, 'c\n'), file_diff_dict)
+
+        # Files are only written at the end, the diffs of the results aren't
+        # changed.
+        self.assertEqual(self.read(self.filename), self.file)
+        self.assertEqual(first.diffs[self.filename].modified,
+                         ['a\n', '2\n', '3\n', '4\n', '5\n'])
+        self.assertEqual(self.read(self.filename + '.orig'), self.file)
+
+        self.assertRaises(ConflictError,
+                          uut.add,
+                          self.result(1, 'b\n'),
+                          file_diff_dict)
+
+        uut.write(file_diff_dict)
+        self.assertEqual(self.read(self.filename),
+                         ['a\n', '2\n', 'c\n', '4\n', '5\n'])
+        self.assertEqual(sorted(os.listdir(self.directory.name)),
+                         ['f', 'f.orig'])
+
+    def test_rename(self):
+        uut = PatchBatch(no_orig=True)
+        file_diff_dict = {}
+        renamed = os.path.join(self.directory.name, 'g')
+        uut.add(self.result(1, 'a\n', rename=renamed), file_diff_dict)
+        uut.add(self.result(2, 'b\n'), file_diff_dict)
+        uut.write(file_diff_dict)
+
+        self.assertEqual(os.listdir(self.directory.name), ['g'])
+        self.assertEqual(self.read(renamed),
+                         ['a\n', 'b\n', '3\n', '4\n', '5\n'])
+
+    def test_patched_before(self):
+        previous = self.result(1, 'a\n')
+        file_diff_dict = {self.filename: previous.diffs[self.filename]}
+        uut = PatchBatch()
+        uut.add(self.result(2, 'b\n'), file_diff_dict)
+        uut.write(file_diff_dict)
+
+        # The file was backed up when it was patched first
+        self.assertFalse(os.path.exists(self.filename + '.orig'))
+        self.assertEqual(self.read(self.filename),
+                         ['a\n', 'b\n', '3\n', '4\n', '5\n'])
+        self.assertEqual(previous.diffs[self.filename].modified,
+                         ['a\n', '2\n', '3\n', '4\n', '5\n'])
+
+    def test_write_error(self):
+        uut = PatchBatch(no_orig=True)
+        file_diff_dict = {}
+        uut.add(self.result(1, 'a\n'), file_diff_dict)
+        self.directory.cleanup()
+
+        with LogCapture() as capture:
+            uut.write(file_diff_dict)
+        self.assertEqual(capture.records[0].levelname, 'ERROR')
+        self.assertIn('Failed to write the patched file',
+                      capture.records[0].getMessage())
+
+    def test_many_patches(self):
+        # Each patch is merged and written at once, not applied to all
+        # patches before.
+        self.file = ['line {} \n'.format(line_nr)
+                     for line_nr in range(1, 2001)]
+        with open(self.filename, 'w') as file:
+            file.writelines(self.file)
+
+        uut = PatchBatch(no_orig=True)
+        file_diff_dict = {}
+        for line_nr in range(1, 2001):
+            uut.add(self.result(line_nr, 'line {}\n'.format(line_nr)),
+                    file_diff_dict)
+        uut.write(file_diff_dict)
+
+        self.assertEqual(self.read(self.filename),
+                         ['line {}\n'.format(line_nr)
+                          for line_nr in range(1, 2001)])
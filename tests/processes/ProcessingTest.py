@@ -4,23 +4,35 @@ import multiprocessing
 import os
 import platform
 import queue
+import shutil
 import subprocess
 import sys
+import tempfile
 import unittest
+import unittest.mock
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
 from testfixtures import LogCapture, StringComparison
 
 from coalib.bears.Bear import Bear
+from coalib.io.FileDict import FileDict
 from coalib.output.printers.LogPrinter import LogPrinter
 from coalib.output.printers.ListLogPrinter import ListLogPrinter
+from coalib.bears.GlobalBear import GlobalBear
 from coalib.processes.CONTROL_ELEMENT import CONTROL_ELEMENT
+from coalib.processes.GlobalBearDispatcher import GlobalBearDispatcher
+from coalib.processes.PatchBatch import PatchBatch
 from coalib.processes.Processing import (
     ACTIONS, autoapply_actions, check_result_ignore, create_process_group,
-    execute_section, get_default_actions, get_file_dict, print_result,
-    process_queues, simplify_section_result, yield_ignore_ranges,
-    instantiate_bears)
+    estimate_file_size, estimate_unit_costs, execute_section,
+    execute_sections, get_default_actions, get_file_dict,
+    get_local_bear_groups, get_section_batches, LINE_WEIGHT, may_modify_files,
+    merge_local_results, order_units, print_result, process_queues,
+    simplify_section_result, yield_ignore_ranges, instantiate_bears)
+from coalib.processes.WorkerPool import WorkerPool
+from coalib.processes.communication.SharedFileDict import SharedFileDict
+from coalib.results.Diff import Diff
 from coalib.results.HiddenResult import HiddenResult
 from coalib.results.Result import RESULT_SEVERITY, Result
 from coalib.results.result_actions.ApplyPatchAction import ApplyPatchAction
@@ -170,6 +182,146 @@ class ProcessingTest(unittest.TestCase):
                          'aspect=NoneType, applied_actions=\\{\\}\\'
                          ') at 0x[0-9a-fA-F]+>')
 
+    def test_run_on_worker_pool(self):
+        self.sections['cli'].append(Setting('jobs', '2'))
+        worker_pool = WorkerPool()
+        try:
+            for _ in range(2):
+                # The bear lists are replaced by instances
+                results = execute_section(
+                    self.sections['cli'],
+                    list(self.global_bears['cli']),
+                    list(self.local_bears['cli']),
+                    lambda *args: self.result_queue.put(args[2]),
+                    None,
+                    self.log_printer,
+                    console_printer=self.console_printer,
+                    worker_pool=worker_pool)
+                self.assertTrue(results[0])
+
+                local_results = self.result_queue.get(timeout=0)
+                global_results = self.result_queue.get(timeout=0)
+                self.assertTrue(self.result_queue.empty())
+                self.assertEqual([result.origin for result in local_results],
+                                 ['LocalTestBear'])
+                self.assertEqual([result.origin for result in global_results],
+                                 ['GlobalTestBear'])
+                self.assertEqual(len(results[1]), 1)
+                self.assertEqual(results[2],
+                                 {'ProcessingGlobalTestBear': global_results})
+        finally:
+            worker_pool.close()
+
+    def test_run_on_worker_pool_shared_files(self):
+        self.sections['cli'].append(Setting('jobs', '2'))
+        worker_pool = WorkerPool()
+        self.addCleanup(worker_pool.close)
+        with unittest.mock.patch(
+                'coalib.processes.WorkerPool.SharedFileDict',
+                wraps=SharedFileDict) as shared_file_dict:
+            results = execute_section(
+                self.sections['cli'],
+                list(self.global_bears['cli']),
+                list(self.local_bears['cli']),
+                lambda *args: self.result_queue.put(args[2]),
+                None,
+                self.log_printer,
+                console_printer=self.console_printer,
+                worker_pool=worker_pool)
+        self.assertTrue(results[0])
+
+        # The files read by this process are shared with the pool
+        shared_file_dict.assert_called_once_with(results[3])
+        self.assertIsInstance(results[3], FileDict)
+        self.assertIn(self.testcode_c_path, results[3])
+
+    def test_execute_sections(self):
+        sections = [(self.sections[name],
+                     self.global_bears[name],
+                     self.local_bears[name])
+                    for name in ('cli', 'mixed', 'raw')]
+        for section, _, _ in sections:
+            section.append(Setting('jobs', '2'))
+        beginnings = []
+
+        with LogCapture() as capture:
+            results = execute_sections(
+                sections,
+                lambda *args: self.result_queue.put((args[1].name, args[2])),
+                None,
+                self.console_printer,
+                print_section_beginning=lambda section: beginnings.append(
+                    (section.name, self.result_queue.qsize())))
+
+        self.assertIn(('root', 'ERROR', StringComparison(
+                           "Bears that uses raw files can't be mixed.*")),
+                      capture.actual())
+        # Results are processed one section after another
+        self.assertEqual(beginnings, [('cli', 0), ('mixed', 2), ('raw', 2)])
+        printed = [self.result_queue.get(timeout=0) for _ in range(4)]
+        self.assertEqual([name for name, _ in printed],
+                         ['cli', 'cli', 'raw', 'raw'])
+        self.assertTrue(self.result_queue.empty())
+
+        self.assertEqual(len(results), 3)
+        self.assertTrue(results[0][0])
+        self.assertEqual(len(results[0][1]), 1)
+        self.assertEqual(len(results[0][2]), 1)
+        self.assertEqual(results[1], ((), {}, {}, {}))
+        self.assertEqual(len(results[2][1]), 1)
+
+    def test_get_section_batches(self):
+        def section(name, files, default_actions=''):
+            section = Section(name)
+            section.append(Setting('files', files))
+            section.append(Setting('default_actions', default_actions))
+            return section, [], []
+
+        factory_test_path = os.path.dirname(self.factory_test_file)
+        a_bear = section('a', self.a_bear_test_path, 'ABear: ApplyPatchAction')
+        b_bear = section('b', self.b_bear_test_path, 'BBear: ApplyPatchAction')
+        all_files = section(
+            'all', os.path.join(factory_test_path, '*.txt'),
+            'ABear: ShowPatchAction')
+        other_all_files = section(
+            'other', os.path.join(factory_test_path, '*.txt'))
+
+        def names(batches):
+            return [[section.name for section, _, _, _ in batch]
+                    for batch in batches]
+
+        batches = get_section_batches([a_bear, b_bear, all_files])
+        self.assertEqual(names(batches), [['a', 'b'], ['all']])
+        self.assertEqual(batches[0][0][3], [self.a_bear_test_path])
+
+        # Sections that only read the files are executed together
+        self.assertEqual(
+            names(get_section_batches([all_files, other_all_files, a_bear])),
+            [['all', 'other'], ['a']])
+        self.assertEqual(
+            names(get_section_batches([all_files, other_all_files],
+                                      interactive=True)),
+            [['all'], ['other']])
+
+    def test_may_modify_files(self):
+        section = Section('name')
+        self.assertFalse(may_modify_files(section))
+        self.assertTrue(may_modify_files(section, interactive=True))
+
+        section.append(Setting('default_actions',
+                               'ABear: ShowPatchAction, '
+                               'BBear: PrintDebugMessageAction'))
+        self.assertFalse(may_modify_files(section))
+
+        section.append(Setting('default_actions',
+                               'ABear: ShowPatchAction, '
+                               'BBear: ApplyPatchAction'))
+        self.assertTrue(may_modify_files(section))
+
+        # Actions defined by bears may modify files as well
+        section.append(Setting('default_actions', 'ABear: SomeBearAction'))
+        self.assertTrue(may_modify_files(section))
+
     def test_empty_run(self):
         execute_section(self.sections['cli'],
                         [],
@@ -236,11 +388,11 @@ class ProcessingTest(unittest.TestCase):
         #       is the same as expected will fail on Windows
         #       due to a problem with how coala handles path.
         self.assertEqual(self.unreadable_path.lower(),
-                         results[1].keys()[0].lower())
+                         list(results[1].keys())[0].lower())
 
         # HACK: This is due to the problem with how coala handles paths
         #       that makes it problematic for Windows compatibility
-        self.unreadable_path = results[1].keys()[0]
+        self.unreadable_path = list(results[1].keys())[0]
 
         self.assertEqual([bear.name for bear in self.global_bears['raw']],
                          results[2].keys())
@@ -306,7 +458,7 @@ class ProcessingTest(unittest.TestCase):
                  Result.from_values('ABear', 'u', 'f', 5, 1),
                  Result.from_values('ABear', 'u', 'f', 6, 1)]},
             {1: [first_global]},
-            {'f': self.file_dict[self.factory_test_file]},
+            {os.path.abspath('f'): self.file_dict[self.factory_test_file]},
             lambda *args: self.queue.put(args[2]),
             section,
             None,
@@ -319,6 +471,93 @@ class ProcessingTest(unittest.TestCase):
         self.assertEqual(self.queue.get(timeout=0), ([first_global]))
         self.assertEqual(self.queue.get(timeout=0), ([first_global]))
 
+    def test_process_queues_without_keeping_results(self):
+        ctrlq = queue.Queue()
+        ctrlq.put((CONTROL_ELEMENT.LOCAL, 1))
+        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL, 1))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+
+        local_result = Result('ABear', 'A result.')
+        global_result = Result('o', 'The one and only global result.')
+        local_result_dict = {1: [local_result]}
+        global_result_dict = {1: [global_result]}
+        yielded_results = process_queues(
+            [DummyProcess(control_queue=ctrlq) for i in range(2)],
+            ctrlq,
+            local_result_dict,
+            global_result_dict,
+            {os.path.abspath('f'): self.file_dict[self.factory_test_file]},
+            lambda *args: self.queue.put(args[2]),
+            Section(''),
+            None,
+            self.log_printer,
+            self.console_printer,
+            keep_results=False)
+
+        self.assertTrue(yielded_results)
+        self.assertEqual(self.queue.get(timeout=0), [local_result])
+        self.assertEqual(self.queue.get(timeout=0), [global_result])
+        self.assertEqual(local_result_dict, {1: []})
+        self.assertEqual(global_result_dict, {1: []})
+
+    def test_dependent_global_bear_without_keeping_results(self):
+        class DependencyBear(GlobalBear):
+            pass
+
+        class DependentBear(GlobalBear):
+            BEAR_DEPS = {DependencyBear}
+
+        dependency_result = Result('DependencyBear', 'A result.')
+        dependent_result = Result('DependentBear', 'Another result.')
+        global_result_dict = {'DependencyBear': [dependency_result]}
+        read_results = []
+
+        class ControlQueue(queue.Queue):
+
+            def get(self, *args, **kwargs):
+                item = queue.Queue.get(self, *args, **kwargs)
+                if item == (CONTROL_ELEMENT.GLOBAL, 'DependentBear'):
+                    # The dependent bear may read the results of its
+                    # dependency until it's done
+                    read_results.append(global_result_dict['DependencyBear'])
+                    global_result_dict['DependentBear'] = [dependent_result]
+                return item
+
+        ctrlq = ControlQueue()
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL, 'DependencyBear'))
+        ctrlq.put((CONTROL_ELEMENT.LOCAL_FINISHED, None))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL, 'DependentBear'))
+        ctrlq.put((CONTROL_ELEMENT.GLOBAL_FINISHED, None))
+
+        section = Section('')
+        global_bear_queue = queue.Queue()
+        dispatcher = GlobalBearDispatcher(
+            [DependentBear({}, section, queue.Queue()),
+             DependencyBear({}, section, queue.Queue())],
+            global_bear_queue)
+        dispatcher.dispatch()
+        process_queues(
+            [DummyProcess(control_queue=ctrlq) for i in range(2)],
+            ctrlq,
+            {},
+            global_result_dict,
+            {},
+            lambda *args: self.queue.put(args[2]),
+            section,
+            None,
+            self.log_printer,
+            self.console_printer,
+            global_bear_dispatcher=dispatcher,
+            keep_results=False)
+
+        self.assertEqual(list(global_bear_queue.queue), [1, 0, None])
+        self.assertEqual(read_results, [[dependency_result]])
+        self.assertEqual(self.queue.get(timeout=0), [dependency_result])
+        self.assertEqual(self.queue.get(timeout=0), [dependent_result])
+        self.assertEqual(global_result_dict,
+                         {'DependencyBear': [], 'DependentBear': []})
+
     def test_dead_processes(self):
         ctrlq = queue.Queue()
         # Not enough FINISH elements in the queue, processes start already dead
@@ -398,15 +637,22 @@ class ProcessingTest(unittest.TestCase):
 
     def test_get_file_dict_forbid_raw_file(self):
         log_printer = ListLogPrinter()
+        file_dict = get_file_dict([self.unreadable_path], log_printer, False)
+        self.assertIn(self.unreadable_path, file_dict)
         with LogCapture() as capture:
-            file_dict = get_file_dict([self.unreadable_path], log_printer,
-                                      False)
-        self.assertEqual(file_dict, {})
+            self.assertRaises(KeyError,
+                              file_dict.__getitem__,
+                              self.unreadable_path)
         capture.check(
             ('root', 'WARNING', f"Failed to read file '{self.unreadable_path}'."
              ' It seems to contain '
              'non-unicode characters. Leaving it out.')
         )
+        # The file is left out once the dictionary is loaded
+        self.assertIn(self.unreadable_path, file_dict)
+        with LogCapture():
+            file_dict.load()
+        self.assertEqual(file_dict, {})
 
     def test_simplify_section_result(self):
         results = (True,
@@ -600,6 +846,124 @@ class ProcessingTest(unittest.TestCase):
                                   console_printer=self.console_printer)
         self.assertGreater(len(cache.data), 0)
 
+    def test_record_timings(self):
+        cache = FileCache(self.log_printer,
+                          'coala_test_timings',
+                          flush_cache=True)
+        execute_section(self.sections['cli'],
+                        [],
+                        self.local_bears['cli'],
+                        lambda *args: self.result_queue.put(args[2]),
+                        cache,
+                        self.log_printer,
+                        console_printer=self.console_printer)
+        self.assertEqual(len(cache.timings), 1)
+        filename, timings = next(iter(cache.timings.items()))
+        self.assertEqual(list(timings), ['ProcessingLocalTestBear'])
+        # The lines of the analyzed file count into its size
+        _, size = timings['ProcessingLocalTestBear']
+        self.assertGreater(size, os.path.getsize(filename))
+
+    def test_result_cache_all_files(self):
+        cache = FileCache(self.log_printer,
+                          'coala_test_result_cache',
+                          flush_cache=True)
+        with unittest.mock.patch.object(
+                cache, 'get_uncached_files') as get_uncached_files, \
+                LogCapture() as capture:
+            execute_section(self.sections['cli'],
+                            [],
+                            self.local_bears['cli'],
+                            lambda *args: self.result_queue.put(args[2]),
+                            cache,
+                            self.log_printer,
+                            console_printer=self.console_printer)
+
+        # All files are run on, the results of unchanged ones are cached
+        get_uncached_files.assert_not_called()
+        self.assertFalse(any('only on changed files' in record.getMessage()
+                             for record in capture.records))
+        self.assertEqual(len(self.result_queue.get(timeout=0)), 1)
+        cache.write()
+        self.assertIn(self.testcode_c_path, cache.stats)
+
+    def test_estimate_unit_costs(self):
+        class ABear(Bear):
+            pass
+
+        class BBear(Bear):
+            pass
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        small, large, new = (os.path.join(directory, name)
+                             for name in ('small', 'large', 'new'))
+        for filename, lines in ((small, 1), (large, 10), (new, 20)):
+            with open(filename, 'w') as file:
+                file.write('a\n' * lines)
+        file_dict = {filename: ('a\n',) * lines
+                     for filename, lines in ((small, 1),
+                                             (large, 10),
+                                             (new, 20))}
+        units = [(small, (0, 1)), (large, (0,)), (large, (1,))]
+
+        # Without timings the file size is used, every line counts extra
+        size = estimate_file_size(small, file_dict[small])
+        self.assertEqual(size, 2 + LINE_WEIGHT)
+        self.assertEqual(estimate_file_size(small), 2)
+        self.assertEqual(estimate_file_size(small, None), 2)
+        self.assertEqual(estimate_file_size('non_existent_file', ('a\n',)),
+                         0)
+        self.assertEqual(estimate_unit_costs(units, file_dict,
+                                             [ABear, BBear]),
+                         {(small, (0, 1)): 2 * size,
+                          (large, (0,)): 10 * size,
+                          (large, (1,)): 10 * size})
+
+        # Files the file dict doesn't contain only count by their size
+        self.assertEqual(estimate_unit_costs(units, {}, [ABear, BBear]),
+                         {(small, (0, 1)): 4,
+                          (large, (0,)): 20,
+                          (large, (1,)): 20})
+
+        timings = {small: {'ABear': (5, size)},
+                   large: {'ABear': (1, 5 * size)}}
+        costs = estimate_unit_costs(units + [(new, (0,))],
+                                    file_dict,
+                                    [ABear, BBear],
+                                    timings)
+        # Recorded timings are scaled by the change of size, unknown bears
+        # are estimated by the average rate of the known ones.
+        rate = 6 / (6 * size)
+        self.assertEqual(costs, {(small, (0, 1)): 5 + rate * size,
+                                 (large, (0,)): 2,
+                                 (large, (1,)): rate * 10 * size,
+                                 (new, (0,)): rate * 20 * size})
+
+    def test_order_units(self):
+        class ABear(Bear):
+            pass
+
+        units = [('a', (0,)), ('b', (0,)), ('c', (0,))]
+        costs = {('a', (0,)): 1, ('b', (0,)): 3, ('c', (0,)): 2}
+        with LogCapture() as capture:
+            self.assertEqual(order_units(units, costs, [ABear], 2),
+                             [('b', (0,)), ('c', (0,)), ('a', (0,))])
+        capture.check(
+            ('root', 'DEBUG', 'Local bears will process the files in this '
+                              'order (estimated costs, expected makespan '
+                              '3.000 for 2 processes):\n'
+                              '3.000 b (ABear)\n'
+                              '2.000 c (ABear)\n'
+                              '1.000 a (ABear)'))
+
+        # The message isn't built unless it's logged, the bears aren't
+        # looked at
+        with LogCapture(level=logging.INFO) as capture:
+            self.assertEqual(order_units(units, costs, [], 2),
+                             [('b', (0,)), ('c', (0,)), ('a', (0,))])
+        capture.check()
+
     def test_global_instantiation(self):
         class TestOneBear(Bear):
 
@@ -634,6 +998,40 @@ class ProcessingTest(unittest.TestCase):
                               self.queue, console_printer=self.console_printer,
                               debug=True)
 
+    def test_get_local_bear_groups(self):
+        class TestOneBear(Bear):
+            pass
+
+        class TestTwoBear(Bear):
+            BEAR_DEPS = {TestOneBear}
+
+        class TestThreeBear(Bear):
+            pass
+
+        class TestFourBear(Bear):
+            BEAR_DEPS = {TestThreeBear, TestTwoBear}
+
+        self.assertEqual(get_local_bear_groups([]), [])
+        self.assertEqual(get_local_bear_groups([TestOneBear, TestThreeBear]),
+                         [(0,), (1,)])
+        self.assertEqual(get_local_bear_groups([TestOneBear, TestThreeBear,
+                                                TestTwoBear]),
+                         [(0, 2), (1,)])
+        self.assertEqual(get_local_bear_groups([TestOneBear, TestThreeBear,
+                                                TestTwoBear, TestFourBear]),
+                         [(0, 1, 2, 3)])
+        # Dependencies that aren't run as local bears don't group anything
+        self.assertEqual(get_local_bear_groups([TestThreeBear, TestTwoBear]),
+                         [(0,), (1,)])
+
+    def test_merge_local_results(self):
+        self.assertEqual(merge_local_results({('a', (10,)): [3],
+                                              ('a', (2,)): [2],
+                                              ('a', (0,)): [1],
+                                              ('b', (0,)): None,
+                                              'c': [3]}),
+                         {'a': [1, 2, 3], 'b': [], 'c': [3]})
+
 
 class MyBearAction(ResultAction):
 
@@ -867,6 +1265,43 @@ class ProcessingTest_AutoapplyActions(unittest.TestCase):
         )
         ACTIONS.pop()
 
+    def test_apply_patches_in_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'f')
+            file = ['1\n', '2\n']
+            with open(filename, 'w') as f:
+                f.writelines(file)
+
+            results = []
+            for line_nr in (1, 2, 2):
+                diff = Diff(file)
+                diff.modify_line(line_nr, str(line_nr * 10) + '\n')
+                results.append(Result('YBear', 'msg', diffs={filename: diff}))
+            self.section.append(Setting('default_actions',
+                                        'YBear: ApplyPatchAction'))
+            batch = PatchBatch()
+            file_diff_dict = {}
+
+            with LogCapture() as capture:
+                ret = autoapply_actions(results,
+                                        {filename: file},
+                                        file_diff_dict,
+                                        self.section,
+                                        patch_batch=batch)
+            # The same patch can't be applied twice
+            self.assertEqual(ret, results[2:])
+            self.assertEqual(capture.records[-1].levelname, 'WARNING')
+            self.assertEqual(file_diff_dict[filename].modified,
+                             ['10\n', '20\n'])
+            with open(filename) as f:
+                self.assertEqual(f.readlines(), file)
+
+            batch.write(file_diff_dict)
+            with open(filename) as f:
+                self.assertEqual(f.readlines(), ['10\n', '20\n'])
+            with open(filename + '.orig') as f:
+                self.assertEqual(f.readlines(), file)
+
 
 class ProcessingTest_PrintResult(unittest.TestCase):
 
@@ -0,0 +1,58 @@
+import os
+import pickle
+import unittest
+
+from coalib.processes.ResultFilter import ResultFilter
+from coalib.results.HiddenResult import HiddenResult
+from coalib.results.Result import Result
+from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
+
+
+class ResultFilterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = os.path.abspath('a.py')
+        self.file_dict = {self.filename: ('a = 1\n',
+                                          'b = 2  # noqa PEP8Bear\n',
+                                          'c = 3\n')}
+        self.results = [
+            Result.from_values('PEP8Bear', 'shown', self.filename, 1),
+            Result.from_values('PEP8Bear', 'ignored', self.filename, 2),
+            Result.from_values('PyLintBear', 'shown', self.filename, 2),
+            Result.from_values('PEP8Bear', 'info', self.filename, 1,
+                               severity=RESULT_SEVERITY.INFO),
+            Result.from_values('PEP8Bear', 'unknown file', 'b.py', 2),
+            HiddenResult('PEP8Bear', 'hidden')]
+
+    def test_filter(self):
+        uut = ResultFilter(RESULT_SEVERITY.NORMAL)
+        self.assertEqual(uut.filter(self.results, self.file_dict),
+                         [self.results[0], self.results[2], self.results[4]])
+
+        uut = ResultFilter()
+        self.assertEqual(uut.filter(self.results, self.file_dict),
+                         [self.results[0], self.results[2], self.results[3],
+                          self.results[4]])
+
+    def test_dependencies(self):
+        uut = ResultFilter(RESULT_SEVERITY.MAJOR, {'PEP8Bear'})
+        self.assertIs(uut.filter(self.results, self.file_dict, 'PEP8Bear'),
+                      self.results)
+        self.assertEqual(uut.filter(self.results, self.file_dict, 'ABear'),
+                         [])
+
+    def test_files_scanned_once(self):
+        uut = ResultFilter()
+        uut.filter(self.results, self.file_dict)
+        # Changed files aren't looked at again
+        self.file_dict[self.filename] = ('# noqa\n',)
+        self.assertEqual(uut.filter(self.results[:1], self.file_dict),
+                         self.results[:1])
+
+    def test_pickle(self):
+        uut = ResultFilter(RESULT_SEVERITY.MAJOR, {'PEP8Bear'})
+        uut.filter(self.results, self.file_dict)
+        uut = pickle.loads(pickle.dumps(uut))
+        self.assertEqual(uut.min_severity, RESULT_SEVERITY.MAJOR)
+        self.assertEqual(uut.dependencies, {'PEP8Bear'})
+        self.assertEqual(uut.scanned_files, set())
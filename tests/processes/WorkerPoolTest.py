@@ -0,0 +1,209 @@
+import os
+import pickle
+import queue
+import sys
+import tempfile
+import unittest
+
+from testfixtures import LogCapture, StringComparison
+
+from coalib.bears.LocalBear import LocalBear
+from coalib.io.FileProxy import FileProxy, FileProxyMap
+from coalib.misc.Caching import ProxyMapFileCache
+from coalib.processes.Processing import execute_section
+from coalib.processes.WorkerPool import (
+    BearDescriptor, WorkerJob, WorkerPool, describe_bear, instantiate_bear)
+from coalib.results.Result import Result
+from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
+
+
+class InstantiationCountingBear(LocalBear):
+    instantiations = 0
+
+    def __init__(self, *args, **kwargs):
+        LocalBear.__init__(self, *args, **kwargs)
+        type(self).instantiations += 1
+        self.prefix = 'pid'
+
+    def run(self, filename, file):
+        yield Result(self, f'{self.prefix} {os.getpid()}')
+
+
+class FileTypeBear(LocalBear):
+
+    def run(self, filename, file):
+        yield Result(self, type(file).__name__)
+
+
+class BearDescriptorTest(unittest.TestCase):
+
+    def setUp(self):
+        InstantiationCountingBear.instantiations = 0
+        self.message_queue = queue.Queue()
+        self.bear = InstantiationCountingBear(Section('section'),
+                                              self.message_queue)
+
+    def test_pickle(self):
+        descriptor = pickle.loads(pickle.dumps(BearDescriptor(self.bear)))
+        message_queue = queue.Queue()
+
+        bear = descriptor.instantiate(message_queue)
+        self.assertIsInstance(bear, InstantiationCountingBear)
+        self.assertIsNot(bear, self.bear)
+        self.assertEqual(bear.prefix, 'pid')
+        self.assertEqual(bear.section.name, 'section')
+        self.assertIs(bear.message_queue, message_queue)
+        # The bear was not constructed again
+        self.assertEqual(InstantiationCountingBear.instantiations, 1)
+
+    def test_describe_bear(self):
+        self.assertIsInstance(describe_bear(self.bear), BearDescriptor)
+        self.assertEqual(describe_bear('not a bear'), 'not a bear')
+        self.assertEqual(instantiate_bear('not a bear', self.message_queue),
+                         'not a bear')
+        self.assertIs(instantiate_bear(describe_bear(self.bear),
+                                       self.message_queue),
+                      self.bear)
+
+    def test_is_valid(self):
+        class LocalClassBear(LocalBear):
+            pass
+
+        self.assertTrue(BearDescriptor(self.bear).is_valid())
+        self.assertFalse(BearDescriptor(
+            LocalClassBear(Section('section'), self.message_queue)).is_valid())
+
+    def test_import_from_path(self):
+        descriptor = BearDescriptor(self.bear)
+        with tempfile.TemporaryDirectory() as directory:
+            descriptor.path = os.path.join(directory, 'PoolImportTestBear.py')
+            descriptor.module = 'PoolImportTestBear'
+            descriptor.qualname = 'PoolImportTestBear'
+            with open(descriptor.path, 'w') as file:
+                file.write('class PoolImportTestBear:\n    pass\n')
+
+            try:
+                self.assertEqual(descriptor.get_class().__name__,
+                                 'PoolImportTestBear')
+                # The directory is added to the import path once
+                sys.modules.pop('PoolImportTestBear')
+                descriptor.get_class()
+                self.assertEqual(sys.path.count(directory), 1)
+            finally:
+                sys.modules.pop('PoolImportTestBear', None)
+                sys.path.remove(directory)
+
+
+class WorkerJobTest(unittest.TestCase):
+
+    def test_collecting_process_ended(self):
+        queues = {'units': queue.Queue(), 'global_bears': queue.Queue()}
+        uut = WorkerJob(1, os.getpid(), [], queues)
+        queues['units'].put((1, 0, 'unit'))
+        self.assertEqual(uut.get_unit(0), 'unit')
+
+        # Nothing is queued anymore once the process collecting the results
+        # ended, so it's not waited for
+        uut.pid = -1
+        self.assertRaises(queue.Empty, uut.get_unit, 0)
+        self.assertTrue(uut.units_done)
+        uut.run_global_bears(wait=True)
+        self.assertTrue(uut.global_bears_done)
+
+
+class WorkerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.uut = WorkerPool()
+        self.section = Section('section')
+        self.section.append(Setting('files', __file__))
+        self.section.append(Setting('jobs', '2'))
+        self.results = []
+
+    def tearDown(self):
+        self.uut.close()
+
+    def execute(self, bear, cache=None):
+        self.assertTrue(execute_section(
+            self.section,
+            [],
+            [bear],
+            lambda *args: self.results.extend(args[2]),
+            cache,
+            None,
+            None,
+            worker_pool=self.uut)[0])
+        return self.results.pop().message
+
+    def test_reuse(self):
+        first = self.execute(InstantiationCountingBear)
+        self.assertEqual(len(self.uut.workers), 2)
+        second = self.execute(InstantiationCountingBear)
+        self.assertEqual(len(self.uut.workers), 2)
+
+        worker_pids = {f'pid {process.pid}'
+                       for process, _ in self.uut.workers}
+        self.assertIn(first, worker_pids)
+        self.assertIn(second, worker_pids)
+        self.assertEqual(self.results, [])
+
+        # More processes are started if needed
+        self.section.append(Setting('jobs', '3'))
+        self.assertIn(self.execute(InstantiationCountingBear),
+                      {f'pid {process.pid}'
+                       for process, _ in self.uut.workers})
+        self.assertEqual(len(self.uut.workers), 3)
+
+    def test_local_bear_class(self):
+        class LocalClassBear(InstantiationCountingBear):
+            pass
+
+        with LogCapture() as capture:
+            message = self.execute(LocalClassBear)
+
+        # The bear can't be recreated by the pool processes
+        self.assertNotIn(message, {f'pid {process.pid}'
+                                   for process, _ in self.uut.workers})
+        self.assertIn(('root', 'DEBUG', StringComparison(
+                           '.*LocalClassBear are not defined on module level.*'
+                       )),
+                      capture.actual())
+
+    def test_file_dict(self):
+        # The files are read once and shared with the processes
+        self.assertEqual(self.execute(FileTypeBear), 'SharedLines')
+
+        # Also the file contents that were in memory already
+        cache = ProxyMapFileCache(None, 'coala_test_pool', flush_cache=True)
+        cache.set_proxymap(FileProxyMap([FileProxy.from_file(__file__,
+                                                             None)]))
+        self.assertEqual(self.execute(FileTypeBear, cache), 'SharedLines')
+
+    def test_aborted_job(self):
+        job = self.uut.create_job(2)
+        queues = job.add_section(global_bears=False, timings=False)
+        queues['file_name_queue'].put(__file__)
+        job.start([{'local_bear_list': [],
+                    'global_bear_list': [],
+                    'file_dict': {},
+                    'global_result_dict': {},
+                    'timeout': 0.1,
+                    'result_cache': None,
+                    'timing_dict': None}])
+        # The messages of the job are never processed
+        queues['global_bear_queue'].put(None)
+        job.close()
+
+        self.execute(InstantiationCountingBear)
+        self.assertEqual(self.results, [])
+
+    def test_close(self):
+        self.execute(InstantiationCountingBear)
+        processes = [process for process, _ in self.uut.workers]
+        self.uut.close()
+
+        self.assertEqual(self.uut.workers, [])
+        self.assertFalse(any(process.is_alive() for process in processes))
+        # Closing twice doesn't do anything
+        self.uut.close()
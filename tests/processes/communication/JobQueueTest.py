@@ -0,0 +1,42 @@
+import queue
+import unittest
+
+from coalib.processes.communication.JobQueue import JobQueue
+
+
+class JobQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.queue = queue.Queue()
+        self.buffers = {}
+        self.uut = JobQueue(self.queue, 2, 0, self.buffers)
+        self.other_section = JobQueue(self.queue, 2, 1, self.buffers)
+
+    def test_put(self):
+        self.uut.put('item')
+        self.assertEqual(self.queue.get(timeout=0), (2, 0, 'item'))
+
+    def test_sections(self):
+        self.other_section.put('b1')
+        self.other_section.put('b2')
+        self.uut.put('a')
+
+        self.assertEqual(self.uut.get(), 'a')
+        self.assertEqual(list(self.buffers[1]), ['b1', 'b2'])
+        self.assertEqual(self.other_section.get(), 'b1')
+        self.assertEqual(self.other_section.get(timeout=0), 'b2')
+        self.assertRaises(queue.Empty, self.other_section.get, timeout=0)
+
+    def test_other_jobs(self):
+        JobQueue(self.queue, 1, 0).put('stale')
+        JobQueue(self.queue, 3, 0).put('newer')
+        self.uut.put('a')
+
+        self.assertEqual(self.uut.get(timeout=0), 'a')
+        self.assertTrue(self.queue.empty())
+        self.assertEqual(self.buffers, {})
+
+    def test_timeout(self):
+        JobQueue(self.queue, 1, 0).put('stale')
+        self.assertRaises(queue.Empty, self.uut.get, timeout=0.01)
+        self.assertRaises(queue.Empty, self.uut.get, block=False)
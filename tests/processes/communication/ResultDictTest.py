@@ -0,0 +1,75 @@
+import multiprocessing
+import pickle
+import queue
+import unittest
+
+from coalib.processes.communication.ResultDict import ResultDict
+from coalib.results.Result import Result
+
+
+def send_results(result_dict):
+    result_dict['file'] = [Result('origin', 'message')]
+
+
+def send_nothing(result_dict):
+    pass
+
+
+class ResultDictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.uut = ResultDict(multiprocessing.Queue())
+
+    def test_local_assignment(self):
+        self.uut['file'] = []
+        self.assertEqual(self.uut['file'], [])
+        self.assertEqual(dict(self.uut), {'file': []})
+        self.assertTrue(self.uut.queue.empty())
+
+    def test_child_process(self):
+        process = multiprocessing.Process(target=send_results,
+                                          args=(self.uut,))
+        process.start()
+
+        self.assertEqual(self.uut['file'], [Result('origin', 'message')])
+        self.assertEqual(len(self.uut), 1)
+        process.join()
+
+        # Writing back in the parent doesn't send anything
+        self.uut['file'] = []
+        self.assertEqual(self.uut['file'], [])
+        self.assertTrue(self.uut.queue.empty())
+
+    def test_ended_process(self):
+        process = multiprocessing.Process(target=send_results,
+                                          args=(self.uut,))
+        self.uut.is_alive = process.is_alive
+        process.start()
+        process.join()
+
+        # Values sent before the process ended are received
+        self.assertEqual(self.uut['file'], [Result('origin', 'message')])
+        self.assertRaises(KeyError, self.uut.__getitem__, 'other_file')
+
+    def test_dead_process(self):
+        process = multiprocessing.Process(target=send_nothing,
+                                          args=(self.uut,))
+        self.uut.is_alive = process.is_alive
+        process.start()
+
+        self.assertRaises(KeyError, self.uut.__getitem__, 'file')
+        process.join()
+
+    def test_pickle(self):
+        uut = ResultDict(multiprocessing.Manager().Queue())
+        uut['file'] = []
+        unpickled = pickle.loads(pickle.dumps(uut))
+        self.assertEqual(dict(unpickled), {})
+        self.assertEqual(unpickled.pid, uut.pid)
+
+    def test_pid(self):
+        # Results are sent if the dictionary is owned by another process
+        uut = ResultDict(queue.Queue(), pid=0)
+        uut['file'] = []
+        self.assertEqual(dict(uut), {})
+        self.assertEqual(uut.queue.get(timeout=0), ('file', []))
@@ -0,0 +1,83 @@
+import os
+import pickle
+import unittest
+
+from coalib.processes.communication.SharedFileDict import (
+    SharedFileDict, SharedLines)
+
+
+class SharedFileDictTest(unittest.TestCase):
+
+    def setUp(self):
+        self.file_dict = {'a.py': ('a = 1\n', 'b = 2\n', 'c = "\xe4"\n'),
+                          'b.py': (),
+                          'c.bin': None}
+        self.uut = SharedFileDict(self.file_dict)
+
+    def tearDown(self):
+        self.uut.close()
+
+    def test_contents(self):
+        copy = pickle.loads(pickle.dumps(self.uut))
+        self.assertEqual(sorted(copy), ['a.py', 'b.py', 'c.bin'])
+        self.assertEqual(len(copy), 3)
+        self.assertEqual(dict(copy), self.file_dict)
+        self.assertIsNone(copy['c.bin'])
+        self.assertRaises(KeyError, copy.__getitem__, 'd.py')
+
+    def test_lines(self):
+        lines = pickle.loads(pickle.dumps(self.uut))['a.py']
+        self.assertIsInstance(lines, SharedLines)
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2], 'c = "\xe4"\n')
+        self.assertEqual(lines[-3], 'a = 1\n')
+        self.assertEqual(lines[1:], ('b = 2\n', 'c = "\xe4"\n'))
+        self.assertEqual(list(lines), list(self.file_dict['a.py']))
+        self.assertEqual(''.join(lines), ''.join(self.file_dict['a.py']))
+        self.assertRaises(IndexError, lines.__getitem__, 3)
+        self.assertRaises(IndexError, lines.__getitem__, -4)
+
+    def test_lines_as_tuple(self):
+        lines = self.uut['a.py']
+        self.assertEqual(lines, self.file_dict['a.py'])
+        self.assertNotEqual(lines, list(self.file_dict['a.py']))
+        self.assertEqual(hash(lines), hash(self.file_dict['a.py']))
+        self.assertEqual(lines + ('d\n',), self.file_dict['a.py'] + ('d\n',))
+        self.assertEqual(('d\n',) + lines, ('d\n',) + self.file_dict['a.py'])
+        self.assertEqual(repr(lines), repr(self.file_dict['a.py']))
+        self.assertIn('b = 2\n', lines)
+        self.assertEqual(lines.index('b = 2\n'), 1)
+
+        unpickled = pickle.loads(pickle.dumps(lines))
+        self.assertIs(type(unpickled), tuple)
+        self.assertEqual(unpickled, self.file_dict['a.py'])
+
+    def test_sequence_methods(self):
+        lines = pickle.loads(pickle.dumps(self.uut))['a.py']
+        file = self.file_dict['a.py']
+        self.assertEqual(lines.count('b = 2\n'), 1)
+        self.assertEqual(lines.count('d\n'), 0)
+        self.assertEqual(lines.index('b = 2\n'), 1)
+        self.assertRaises(ValueError, lines.index, 'd\n')
+        self.assertEqual(lines + ['d\n'], file + ('d\n',))
+        self.assertEqual(['d\n'] + lines, ('d\n',) + file)
+        self.assertEqual(lines + lines, file + file)
+        self.assertRaises(TypeError, lambda: lines + 'd\n')
+
+    def test_subset(self):
+        subset = pickle.loads(pickle.dumps(self.uut.subset(['a.py'])))
+        self.assertEqual(dict(subset), {'a.py': self.file_dict['a.py']})
+
+        # Only the dictionary that wrote the file removes it
+        subset.close()
+        self.assertTrue(os.path.exists(self.uut.path))
+
+    def test_close(self):
+        self.uut.close()
+        self.assertFalse(os.path.exists(self.uut.path))
+        self.uut.close()
+
+    def test_empty(self):
+        empty = SharedFileDict({})
+        self.addCleanup(empty.close)
+        self.assertEqual(dict(pickle.loads(pickle.dumps(empty))), {})
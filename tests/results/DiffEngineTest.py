@@ -0,0 +1,98 @@
+import difflib
+import random
+import unittest
+
+from coalib.results.Diff import Diff
+from coalib.results.DiffEngine import (
+    DIFF_ENGINES, get_opcodes, longest_increasing_subsequence)
+
+
+def apply_opcodes(a, b, opcodes):
+    result = []
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        # The opcodes cover both sequences without gaps
+        assert (i1, j1) == (i, j)
+        if tag == 'equal':
+            assert a[i1:i2] == b[j1:j2]
+            result += a[i1:i2]
+        else:
+            result += b[j1:j2]
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+    return result
+
+
+def edit_cost(opcodes):
+    return sum(i2 - i1 + j2 - j1
+               for tag, i1, i2, j1, j2 in opcodes
+               if tag != 'equal')
+
+
+class DiffEngineTest(unittest.TestCase):
+
+    def test_random_sequences(self):
+        rand = random.Random(1)
+        for _ in range(1000):
+            alphabet = range(rand.randint(1, 6))
+            a = [rand.choice(alphabet) for _ in range(rand.randint(0, 30))]
+            if rand.random() < 0.5:
+                b = [rand.choice(alphabet)
+                     for _ in range(rand.randint(0, 30))]
+            else:
+                b = list(a)
+                for _ in range(rand.randint(0, 5)):
+                    position = rand.randint(0, len(b))
+                    b.insert(position, rand.choice(alphabet))
+                    del b[rand.randint(0, len(b) - 1)]
+
+            for engine in DIFF_ENGINES:
+                self.assertEqual(
+                    apply_opcodes(a, b, get_opcodes(a, b, engine)), b)
+            # Myers' algorithm finds a shortest edit script
+            matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+            self.assertLessEqual(edit_cost(get_opcodes(a, b, 'myers')),
+                                 edit_cost(matcher.get_opcodes()))
+
+    def test_difflib(self):
+        a = ['a', 'b', 'c', 'a', 'b', 'b', 'a']
+        b = ['c', 'b', 'a', 'b', 'a', 'c']
+        self.assertEqual(get_opcodes(a, b, 'difflib'),
+                         difflib.SequenceMatcher(None, a, b).get_opcodes())
+
+    def test_patience(self):
+        a = ['def a():\n', '    pass\n', '\n', 'def b():\n', '    pass\n']
+        b = ['def b():\n', '    pass\n', '\n', 'def a():\n', '    pass\n']
+        # Lines occurring once in both are matched first
+        self.assertEqual(get_opcodes(a, b, 'patience'),
+                         [('replace', 0, 1, 0, 1),
+                          ('equal', 1, 3, 1, 3),
+                          ('replace', 3, 4, 3, 4),
+                          ('equal', 4, 5, 4, 5)])
+
+    def test_unknown_engine(self):
+        with self.assertRaisesRegex(ValueError, 'Unknown diff engine'):
+            get_opcodes([], [], 'nonsense')
+
+    def test_longest_increasing_subsequence(self):
+        self.assertEqual(longest_increasing_subsequence([]), [])
+        self.assertEqual(
+            longest_increasing_subsequence([(0, 3), (1, 1), (2, 4), (3, 2),
+                                            (4, 3), (5, 0)]),
+            [(1, 1), (3, 2), (4, 3)])
+
+    def test_from_string_arrays(self):
+        a = ['{\n', '}\n'] * 50
+        b = a[:40] + ['x\n'] + a[41:]
+        for engine in DIFF_ENGINES:
+            self.assertEqual(
+                Diff.from_string_arrays(a, b, engine=engine).modified, b)
+
+        # difflib matches the longest blocks first, even if more lines have
+        # to be changed then.
+        self.assertEqual(
+            Diff.from_string_arrays(a, b, engine='difflib').stats(), (40, 40))
+        self.assertEqual(
+            Diff.from_string_arrays(a, b, engine='patience').stats(), (1, 1))
+        # difflib stays the default, other engines are opted into
+        self.assertEqual(Diff.from_string_arrays(a, b).stats(), (40, 40))
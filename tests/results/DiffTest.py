@@ -1,5 +1,7 @@
+import copy
 import json
 import logging
+import pickle
 import unittest
 
 from unidiff.errors import UnidiffParseError
@@ -202,6 +204,140 @@ class DiffTest(unittest.TestCase):
         uut.rename = 'other.py'
         self.assertRaises(ConflictError, other.__add__, uut)
 
+    def test_merge(self):
+        self.assertRaises(TypeError, self.uut.merge, 5)
+
+        other = Diff(self.file, rename='some.py')
+        other.delete_line(1)
+        other.modify_line(2, '2_changed')
+        other.add_lines(0, ['0'])
+        self.uut.delete_line(1)
+        self.uut.modify_line(3, '3_changed')
+
+        self.uut.merge(other)
+        self.assertEqual(self.uut.modified,
+                         ['0\n', '2_changed\n', '3_changed\n', '4'])
+        self.assertEqual(self.uut.rename, 'some.py')
+        # The other diff stays as it is
+        self.assertEqual(other.modified, ['0\n', '2_changed\n', '3\n', '4'])
+
+        conflicting = Diff(self.file, rename='other.py')
+        self.assertRaises(ConflictError, self.uut.merge, conflicting)
+        conflicting = Diff(self.file)
+        conflicting.modify_line(4, '4_changed')
+        conflicting.add_lines(0, ['1'])
+        self.assertRaises(ConflictError, self.uut.merge, conflicting)
+        # Nothing was merged
+        self.assertEqual(self.uut.modified,
+                         ['0\n', '2_changed\n', '3_changed\n', '4'])
+
+    def test_is_changed_by(self):
+        self.uut.delete_line(1)
+        self.uut.modify_line(2, '2_changed')
+
+        other = Diff(self.file)
+        self.assertFalse(self.uut.is_changed_by(other))
+        other.delete_line(1)
+        self.assertFalse(self.uut.is_changed_by(other))
+        other.modify_line(2, '2_changed')
+        self.assertFalse(self.uut.is_changed_by(other))
+        other.add_lines(4, ['5'])
+        self.assertTrue(self.uut.is_changed_by(other))
+        self.assertFalse(self.uut.is_changed_by(Diff(self.file, delete=False)))
+        self.assertTrue(self.uut.is_changed_by(Diff(self.file, delete=True)))
+        self.assertTrue(self.uut.is_changed_by(Diff(self.file,
+                                                    rename='some.py')))
+
+        other = Diff(self.file)
+        other.modify_line(2, '2_other')
+        self.assertRaises(ConflictError, self.uut.is_changed_by, other)
+
+    def test_bool_changed_lines(self):
+        self.uut.modify_line(2, '2')
+        self.assertFalse(self.uut)
+        # All lines but the last one get linebreaks
+        self.uut.modify_line(3, '3\n')
+        self.assertFalse(self.uut)
+        self.uut.modify_line(4, '4\n')
+        self.assertTrue(self.uut)
+
+        uut = Diff(self.file)
+        uut.delete_line(2)
+        uut.add_lines(2, ['2'])
+        self.assertFalse(uut)
+
+    def test_pickle(self):
+        file = tuple('line {}\n'.format(line_nr) for line_nr in range(1000))
+        self.uut = Diff(file)
+        self.uut.modify_line(10, 'changed\n')
+        # Diffs are sent with their file unless it's shared
+        self.assertTrue(pickle.loads(pickle.dumps(self.uut)).resolved)
+        self.assertTrue(self.uut.share_file(list(file)))
+        data = pickle.dumps(self.uut)
+        # Only the change is sent, not the file
+        self.assertLess(len(data), 1000)
+
+        uut = pickle.loads(data)
+        self.assertFalse(uut.resolved)
+        self.assertRaises(LookupError, lambda: uut.modified)
+        self.assertEqual(uut.stats(), (1, 1))
+        # Pickling an unresolved diff keeps its digest
+        uut = pickle.loads(pickle.dumps(uut))
+
+        self.assertFalse(uut.resolve(file[:-1] + ('changed\n',)))
+        self.assertTrue(uut.resolve(list(file)))
+        self.assertEqual(uut, self.uut)
+        self.assertTrue(uut.resolve(()))
+
+    def test_unresolved(self):
+        file = ('1\n', '2\n')
+        diff = Diff(file)
+        diff.modify_line(1, '1_changed\n')
+        diff.share_file(file)
+        uut = pickle.loads(pickle.dumps(diff))
+
+        # Neither comparing nor exporting needs the file
+        self.assertNotEqual(uut, diff)
+        self.assertEqual(uut, pickle.loads(pickle.dumps(diff)))
+        self.assertIsNone(uut.__json__())
+        self.assertTrue(uut)
+        self.assertFalse(pickle.loads(pickle.dumps(Diff(file))))
+        self.assertEqual(len(uut), 2)
+
+    def test_share_normalized_file(self):
+        # The bear made the diff for other lines than the file has
+        file = ('a\r\n', 'b\r\n')
+        diff = Diff([line.rstrip('\r\n') + '\n' for line in file])
+        diff.modify_line(2, 'c\n')
+        self.assertFalse(diff.share_file(file))
+
+        uut = pickle.loads(pickle.dumps(diff))
+        self.assertTrue(uut.resolved)
+        self.assertEqual(uut, diff)
+        self.assertEqual(uut.modified, ['a\n', 'c\n'])
+        self.assertEqual(uut.__json__(), diff.unified_diff)
+
+    def test_shared_file(self):
+        file = ('1\n', '2\n')
+        self.assertIs(Diff(file)._file, file)
+
+        self.uut.modify_line(1, '1_changed')
+        uut = copy.deepcopy(self.uut)
+        self.assertIs(uut._file, self.uut._file)
+        uut.modify_line(2, '2_changed')
+        self.assertEqual(self.uut.modified, ['1_changed\n', '2\n', '3\n', '4'])
+
+    def test_old_pickle(self):
+        self.uut.modify_line(1, '1_changed')
+        state = self.uut.__getstate__()
+        del state['_lines']
+        del state['_line_count']
+        state['_file'] = ['1', '2', '3', '4']
+        state['_original'] = ['1\n', '2\n', '3\n', '4']
+        uut = Diff.__new__(Diff)
+        uut.__setstate__(state)
+        self.assertEqual(uut, self.uut)
+
     def test_from_string_arrays(self):
         a = ['q\n', 'a\n', 'b\n', 'x\n', 'c\n', 'd\n']
         b = ['a\n', 'b\n', 'y\n', 'c\n', 'd\n', 'f\n']
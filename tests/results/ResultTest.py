@@ -1,13 +1,20 @@
+import copy
 import unittest
 import json
+import pickle
 from os.path import abspath
 
 from coalib.results.Diff import Diff
+from coalib.results.HiddenResult import HiddenResult
 from coalib.results.Result import RESULT_SEVERITY, Result
 from coalib.results.SourceRange import SourceRange
 from coalib.output.JSONEncoder import create_json_encoder
 
 
+class SubResult(Result):
+    pass
+
+
 class ResultTest(unittest.TestCase):
 
     def test_origin(self):
@@ -78,6 +85,68 @@ class ResultTest(unittest.TestCase):
         output = uut.to_string_dict()
         self.assertEqual(output['line_nr'], '5')
 
+    def test_pickle(self):
+        uut = Result.from_values('origin', 'msg', 'file', 1, 2, 3, 4,
+                                 severity=RESULT_SEVERITY.MAJOR,
+                                 diffs={'file': Diff(['1\n'])})
+        # Attributes that aren't slots are pickled as well
+        with_file = copy.copy(uut)
+        with_file.file = 'file'
+
+        sub_result = SubResult('origin', 'msg')
+        sub_result.extra = 'extra'
+        for uut in (uut, with_file,
+                    HiddenResult('origin', {'contents': 1}), sub_result):
+            result = pickle.loads(pickle.dumps(uut))
+            result.resolve_diffs({'file': ['1\n']})
+            self.assertIs(type(result), type(uut))
+            self.assertEqual(result, uut)
+            self.assertEqual(result.id, uut.id)
+            self.assertEqual(vars(result), vars(uut))
+        self.assertEqual(result.extra, 'extra')
+
+    def test_id(self):
+        ids = {Result('origin', 'msg').id for _ in range(100)}
+        self.assertEqual(len(ids), 100)
+
+    def test_resolve_diffs(self):
+        file = ('a\n', 'b\n')
+        diff = Diff(file)
+        diff.delete_line(1)
+        alternate_diff = Diff(file)
+        alternate_diff.delete_line(2)
+        result = Result('origin', 'msg',
+                        diffs={'f_a': diff, 'f_b': Diff(file)},
+                        alternate_diffs=[{'f_a': alternate_diff}])
+        result.share_diffs({'f_a': file, 'f_b': file})
+        uut = pickle.loads(pickle.dumps(result))
+
+        uut.resolve_diffs({'f_a': file})
+        self.assertEqual(uut.diffs['f_a'].modified, ['b\n'])
+        self.assertEqual(uut.alternate_diffs[0]['f_a'].modified, ['a\n'])
+        self.assertFalse(uut.diffs['f_b'].resolved)
+
+    def test_share_diffs(self):
+        file = ('a\n', 'b\n')
+        diff = Diff(file)
+        diff.delete_line(1)
+        normalized_diff = Diff(['a\n', 'c\n'])
+        normalized_diff.delete_line(1)
+        result = Result('origin', 'msg',
+                        diffs={'f_a': diff,
+                               'f_b': normalized_diff,
+                               'f_c': Diff(file)})
+        result.share_diffs({'f_a': file, 'f_b': file})
+        uut = pickle.loads(pickle.dumps(result))
+
+        self.assertFalse(uut.diffs['f_a'].resolved)
+        # Diffs of other lines or of files the receiver doesn't have are
+        # sent with their files
+        self.assertEqual(uut.diffs['f_b'], normalized_diff)
+        self.assertEqual(uut.diffs['f_c'], Diff(file))
+        self.assertEqual(uut.diffs['f_b'].__json__(),
+                         normalized_diff.unified_diff)
+
     def test_apply(self):
         file_dict = {
             'f_a': ['1', '2', '3'],
@@ -1,5 +1,6 @@
+import pickle
 import unittest
-from os.path import relpath
+from os.path import abspath, relpath
 
 from coalib.results.SourcePosition import SourcePosition
 from coala_utils.ContextManagers import prepare_file
@@ -37,6 +38,22 @@ class SourcePositionTest(unittest.TestCase):
         uut = SourcePosition('filename', 3, 2)
         self.assertEqual(str(uut), 'filename:3:2')
 
+    def test_shared_file(self):
+        file = abspath('filename')
+        uut = SourcePosition(file, 1)
+        self.assertIs(uut.filename, uut.file)
+        self.assertIs(SourcePosition(file + '/../filename', 2).file, uut.file)
+
+        uut = SourcePosition('filename', 1)
+        self.assertEqual(uut.filename, 'filename')
+        self.assertEqual(uut.file, file)
+
+    def test_pickle(self):
+        uut = SourcePosition('filename', 3, 2)
+        result = pickle.loads(pickle.dumps(uut))
+        self.assertEqual(result, uut)
+        self.assertEqual(str(result), 'filename:3:2')
+
     def test_json(self):
         with prepare_file([''], None) as (_, filename):
             uut = SourcePosition(filename, 1)
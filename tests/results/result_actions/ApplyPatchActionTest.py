@@ -1,11 +1,13 @@
 import unittest
 import os
+import stat
 from os.path import isfile
 
 from coala_utils.ContextManagers import make_temp
 from coalib.results.Diff import Diff
 from coalib.results.Result import Result
-from coalib.results.result_actions.ApplyPatchAction import ApplyPatchAction
+from coalib.results.result_actions.ApplyPatchAction import (
+    ApplyPatchAction, write_file_atomically)
 from coalib.settings.Section import Section
 
 
@@ -92,6 +94,63 @@ class ApplyPatchActionTest(unittest.TestCase):
 
             self.assertEqual(file_dict, expected_file_dict)
 
+    def test_write_file_atomically(self):
+        with make_temp() as filename:
+            os.chmod(filename, 0o640)
+            write_file_atomically(filename, ['1\n', 'ä\n'], 'utf-16')
+
+            with open(filename, encoding='utf-16') as file:
+                self.assertEqual(file.readlines(), ['1\n', 'ä\n'])
+            self.assertEqual(stat.S_IMODE(os.stat(filename).st_mode), 0o640)
+            # No temporary files are left
+            self.assertEqual([name
+                              for name in os.listdir(os.path.dirname(filename))
+                              if name.startswith('.' +
+                                                 os.path.basename(filename))],
+                             [])
+
+            self.assertRaises(TypeError,
+                              write_file_atomically,
+                              filename, ['1\n', 2], 'utf-8')
+            with open(filename, encoding='utf-16') as file:
+                self.assertEqual(file.readlines(), ['1\n', 'ä\n'])
+
+    def test_write_file_atomically_symlink(self):
+        with make_temp() as filename:
+            link = filename + '.link'
+            os.symlink(filename, link)
+            try:
+                write_file_atomically(link, ['1\n'], 'utf-8')
+
+                # The link is kept and the file it points to is written
+                self.assertTrue(os.path.islink(link))
+                with open(filename) as file:
+                    self.assertEqual(file.readlines(), ['1\n'])
+            finally:
+                os.remove(link)
+
+    def test_write_file_atomically_new_file(self):
+        with make_temp() as filename:
+            os.chmod(filename, 0o750)
+            new_filename = filename + '.new'
+            try:
+                write_file_atomically(new_filename, ['1\n'], 'utf-8',
+                                      mode_filename=filename)
+                self.assertEqual(
+                    stat.S_IMODE(os.stat(new_filename).st_mode), 0o750)
+                os.remove(new_filename)
+
+                umask = os.umask(0o022)
+                try:
+                    write_file_atomically(new_filename, ['1\n'], 'utf-8')
+                finally:
+                    os.umask(umask)
+                self.assertEqual(
+                    stat.S_IMODE(os.stat(new_filename).st_mode), 0o644)
+            finally:
+                if isfile(new_filename):
+                    os.remove(new_filename)
+
     def test_apply_rename(self):
         uut = ApplyPatchAction()
         with make_temp() as f_a:
@@ -177,6 +177,113 @@ class SectionTest(unittest.TestCase):
         self.assertEqual(str(section),
                          "section {key2 : 'value12', key4 : 'value14'}")
 
+    def test_version(self):
+        defaults = Section('defaults')
+        uut = Section('section', defaults)
+        versions = [uut.version]
+
+        def changed():
+            self.assertNotIn(uut.version, versions)
+            versions.append(uut.version)
+
+        uut.append(Setting('key', 'value'))
+        changed()
+        uut['key'] = 'other value'
+        changed()
+        uut.update_setting('key', new_value='value')
+        changed()
+        uut.update(Section('other'))
+        changed()
+        uut.delete_setting('key')
+        changed()
+        defaults.append(Setting('key', 'value'))
+        changed()
+        uut.defaults = Section('defaults')
+        changed()
+        uut.contents['key'] = Setting('key', 'value')
+        uut.mark_changed()
+        changed()
+        uut.contents['key'] = Setting('key', 'other value')
+        changed()
+        uut.contents.pop('key')
+        changed()
+        uut.contents = {'key': Setting('key', 'value')}
+        changed()
+
+        uut.get('key')
+        self.assertEqual(uut.version, versions[-1])
+
+    def test_resolve(self):
+        defaults = Section('defaults')
+        defaults.append(Setting('key', 'value'))
+        defaults.append(Setting('default_key', 'default value'))
+        uut = Section('section', defaults)
+        uut.append(Setting('key', 'other value', to_append=True))
+        uut.append(Setting('new_key', 'new value', to_append=True))
+
+        resolved = uut.resolve()
+        self.assertIs(uut.resolve(), resolved)
+        self.assertEqual(list(resolved), ['key', 'new_key', 'default_key'])
+        self.assertEqual(len(resolved), 3)
+        for key in resolved:
+            self.assertEqual(resolved[key], uut[key])
+        self.assertEqual(resolved['key'].value, 'value, other value')
+        self.assertEqual(resolved['new_key'].value, 'new value')
+        self.assertIs(resolved['default_key'],
+                      defaults.resolve()['default_key'])
+        self.assertIn(' KEY ', resolved)
+        self.assertNotIn('', resolved)
+        self.assertRaises(IndexError, resolved.__getitem__, '')
+        self.assertRaises(IndexError, resolved.__getitem__, 'unknown')
+        self.assertEqual(resolved.get('unknown', 5).value, '5')
+
+        # Settings are only resolved again once the section changes
+        defaults['key'] = 'changed value'
+        self.assertIsNot(uut.resolve(), resolved)
+        self.assertEqual(uut.resolve()['key'].value,
+                         'changed value, other value')
+        self.assertEqual(resolved['key'].value, 'value, other value')
+
+    def test_contains(self):
+        defaults = Section('defaults')
+        defaults.append(Setting('default_key', 'value'))
+        uut = Section('section', defaults)
+        uut.append(Setting('key', 'value'))
+        self.assertIn('KEY', uut)
+        self.assertIn('default_key', uut)
+        self.assertNotIn('', uut)
+        self.assertNotIn('unknown', uut)
+        self.assertTrue(uut.__contains__('key', ignore_defaults=True))
+        self.assertFalse(uut.__contains__('default_key',
+                                          ignore_defaults=True))
+        self.assertFalse(uut.__contains__('', ignore_defaults=True))
+
+    def test_contents_changed(self):
+        defaults = Section('defaults')
+        uut = Section('section', defaults)
+        uut.append(Setting('key', 'value'))
+        self.assertIn('key', uut)
+
+        uut.contents.pop('key')
+        self.assertNotIn('key', uut)
+        self.assertRaises(IndexError, uut.__getitem__, 'key')
+        defaults.contents['key'] = Setting('key', 'default value')
+        self.assertIn('key', uut)
+        self.assertEqual(uut['key'].value, 'default value')
+        self.assertEqual(uut.resolve()['key'].value, 'default value')
+
+        del defaults.contents['key']
+        uut.contents.update(key=Setting('key', 'other value'))
+        self.assertEqual(uut['key'].value, 'other value')
+        self.assertEqual(uut.resolve()['key'].value, 'other value')
+        uut.contents.clear()
+        self.assertNotIn('key', uut)
+
+        copy = uut.copy()
+        copy['key'] = 'value'
+        self.assertIn('key', copy)
+        self.assertNotIn('key', uut)
+
     def test_bear_dirs(self):
         section = Section('section', None)
         empty_bear_dirs_len = len(section.bear_dirs())
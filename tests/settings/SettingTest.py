@@ -1,10 +1,12 @@
 import os
 import unittest
 from collections import OrderedDict
+from copy import deepcopy
 
 from coalib.bearlib.languages import Language
 from coalib.settings.Setting import (
-    Setting, path, path_list, url, typed_dict, typed_list, typed_ordered_dict,
+    FrozenSetting, Setting, path, path_list, url, typed_dict, typed_list,
+    typed_ordered_dict,
     glob, glob_list,
     language,
     float_list, bool_list, int_list, str_list,
@@ -231,3 +233,29 @@ class SettingTest(unittest.TestCase):
                                     'Use SourcePosition for line numbers.'):
             self.uut = Setting('key', '22\n', origin='filename')
             self.uut.end_line_number
+
+    def test_frozen_setting(self):
+        setting = Setting('key', 'a, b', origin='filename', to_append=True)
+        uut = FrozenSetting(setting)
+        self.assertEqual(list(uut), ['a', 'b'])
+        self.assertEqual(uut.origin, 'filename')
+        self.assertFalse(uut.to_append)
+        self.assertTrue(setting.to_append)
+
+        with self.assertRaises(AttributeError):
+            uut.value = 'c'
+        with self.assertRaises(AttributeError):
+            uut.key = 'other'
+
+        setting.value = 'c'
+        self.assertEqual(uut.value, 'a, b')
+
+        uut = FrozenSetting(setting, 'd')
+        self.assertEqual(uut.value, 'd')
+        self.assertEqual(uut.key, 'key')
+
+        thawed = deepcopy(uut)
+        self.assertIs(type(thawed), Setting)
+        thawed.value = 'e'
+        self.assertEqual(list(thawed), ['e'])
+        self.assertEqual(uut.value, 'd')